@@ -1,4 +1,4 @@
 from django.contrib import admin
-from .models import ModelType, ModelCategory, Tag, FolderEntry
+from .models import ModelType, ModelCategory, Tag, FolderEntry, LibraryRoot, SyncJob
 # Register your models here.
-admin.site.register([ModelType, ModelCategory, Tag, FolderEntry])
\ No newline at end of file
+admin.site.register([ModelType, ModelCategory, Tag, FolderEntry, LibraryRoot, SyncJob])
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Blocking file work for the async (ASGI) views.
+
+Under ASGI a sync `FileResponse` is read completely into memory by
+`sync_to_async(list)` on the single thread-sensitive worker, and every sync
+view queues on that thread as well. The async views avoid both:
+
+    run_io(fn, …)     runs one blocking call (stat, open, read, Pillow …) on
+                      a bounded pool of `LIBRARY_ASYNC_IO_THREADS` threads
+                      shared by all requests, never on the event loop
+    read_chunks(…)    async iterator over a byte range; each chunk is a
+                      single pool call, so a slow client holds no thread
+                      between chunks — hundreds of concurrent downloads
+                      share the pool
+    gather_limited(…) awaits coroutines concurrently, at most `limit` at a
+                      time (per-texture analysis fan-out)
+
+Nothing here touches the database; ORM work stays on `sync_to_async`.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+
+_pool      = None
+_pool_lock = threading.Lock()
+
+
+def io_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=getattr(settings, "LIBRARY_ASYNC_IO_THREADS", 32),
+                                           thread_name_prefix="library-io")
+    return _pool
+
+
+async def run_io(fn, *args, **kwargs):
+    """`fn(*args, **kwargs)` on the I/O pool."""
+    return await asyncio.get_running_loop().run_in_executor(io_pool(), partial(fn, *args, **kwargs))
+
+
+async def read_chunks(path, start: int, end: int, chunk_size: int):
+    """Bytes `start`…`end` (inclusive) of `path`, read on the I/O pool chunk by chunk."""
+    fh = await run_io(open, path, "rb")
+    try:
+        await run_io(fh.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            data = await run_io(fh.read, min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+    finally:
+        await run_io(fh.close)
+
+
+async def gather_limited(coros, limit: int) -> list:
+    """Results of `coros` in order, with at most `limit` running at once."""
+    gate = asyncio.Semaphore(max(1, limit))
+
+    async def gated(coro):
+        async with gate:
+            return await coro
+
+    return await asyncio.gather(*(gated(c) for c in coros))
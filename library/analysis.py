@@ -0,0 +1,216 @@
+"""
+glTF / texture analysis shown on the detail page, with a persisted cache.
+
+`analyze_gltf_and_textures` is expensive (glTF JSON parse + one header
+probe per texture), so results are stored in `AssetAnalysis` keyed by a stat
+fingerprint of the .gltf and the texture files. `get_analysis` only
+re-runs the analysis when that fingerprint changes (`aget_analysis` does the
+same for async views, probing the textures concurrently); `refresh_analyses`
+precomputes it for many entries on a thread pool.
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf  import settings
+from django.db    import transaction
+from django.utils import timezone
+
+from .           import aio, facets, search, stats
+from .gltf       import GltfError, inspect_gltf
+from .imageprobe import probe_image
+from .models     import AssetAnalysis
+
+# Bump when the shape / meaning of the analysis dict changes → all cached rows go stale.
+ANALYSIS_VERSION = 3
+
+# Files in textures/ that count as textures.
+TEXTURE_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+TEX_MAP_TYPES = {
+    "diffuse": "Diffuse", "albedo": "Albedo", "basecolor": "Base Color",
+    "normal": "Normal", "bump": "Bump", "roughness": "Roughness",
+    "metallic": "Metallic", "glossiness": "Glossiness", "specular": "Specular",
+    "opacity": "Opacity", "emissive": "Emissive", "ao": "Ambient Occlusion",
+    "occlusion": "Ambient Occlusion"
+}
+
+
+# ────────────────────────────────────────────────
+# Analysis
+# ────────────────────────────────────────────────
+def analyze_gltf_and_textures(entry):
+    info = gltf_info(entry)
+    info['textures'] = [t for t in map(texture_info, texture_files(entry)) if t is not None]
+    info['texture_count'] = len(info['textures'])
+    return info
+
+
+async def aanalyze_gltf_and_textures(entry, *, limit: int | None = None):
+    """
+    `analyze_gltf_and_textures` on the `aio` pool: the glTF and every texture
+    probe run concurrently, at most `limit` (LIBRARY_ANALYSIS_CONCURRENCY)
+    at a time per call.
+    """
+    limit    = limit or getattr(settings, "LIBRARY_ANALYSIS_CONCURRENCY", 8)
+    textures = await aio.run_io(texture_files, entry)
+    info, *probed = await aio.gather_limited(
+        [aio.run_io(gltf_info, entry), *(aio.run_io(texture_info, tex) for tex in textures)], limit)
+    info['textures'] = [t for t in probed if t is not None]
+    info['texture_count'] = len(info['textures'])
+    return info
+
+
+def gltf_info(entry) -> dict:
+    info = {'file_size':None,'mesh_count':0,'vertex_count':0,'triangle_count':0,
+            'material_count':0,'buffer_bytes':0,'external':[],
+            'textures':[],'texture_count':0}
+    try:
+        if entry.gltf_path and Path(entry.gltf_path).exists():
+            stats = inspect_gltf(Path(entry.gltf_path))
+            info.update(stats)
+            info['file_size'] = round(stats['file_size']/1048576,2)
+            info['buffer_mb'] = round(stats['buffer_bytes']/1048576,2)
+    except (OSError, GltfError) as exc:
+        info['error'] = str(exc)
+    return info
+
+
+def texture_files(entry) -> list:
+    try:
+        listing = sorted((Path(entry.path)/'textures').iterdir())
+    except OSError:                               # no textures/ folder, or unreadable
+        return []
+    return [tex for tex in listing if tex.suffix.lower() in TEXTURE_SUFFIXES]
+
+
+def texture_info(tex: Path) -> dict | None:
+    """Name, map type, size and header facts of one texture; None if it vanished / can't be stat-ed."""
+    try:
+        size = tex.stat().st_size
+    except OSError:
+        return None
+    kind  = next((v for k,v in TEX_MAP_TYPES.items() if k in tex.name.lower()),'unknown')
+    probe = probe_image(tex)                      # header bytes only, handle closed
+    return {
+        'name':tex.name, 'type':kind,
+        'size':round(size/1048576,2),
+        'dimensions':probe.dimensions if probe else '?×?',
+        'bit_depth':probe.bit_depth if probe else None,
+        'channels':probe.channels if probe else None,
+    }
+
+
+def analysis_fingerprint(entry) -> str:
+    """sha1 over the size/mtime of the .gltf and every file in textures/."""
+    parts = [f"v{ANALYSIS_VERSION}"]
+    try:
+        st = os.stat(entry.gltf_path)
+        parts.append(f"gltf:{st.st_size}:{st.st_mtime_ns}")
+    except (OSError, TypeError):
+        parts.append("gltf:-")
+    try:
+        with os.scandir(Path(entry.path) / "textures") as it:
+            files = sorted((f.name, f.stat()) for f in it if f.is_file())
+        parts.extend(f"{name}:{st.st_size}:{st.st_mtime_ns}" for name, st in files)
+    except OSError:
+        parts.append("textures:-")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+# ────────────────────────────────────────────────
+# Cache
+# ────────────────────────────────────────────────
+def cached_analysis(entry):
+    """The stored AssetAnalysis row (uses select_related data when present)."""
+    try:
+        return entry.analysis
+    except AssetAnalysis.DoesNotExist:
+        return None
+
+
+def get_analysis(entry) -> dict:
+    """
+    Analysis for `entry`, from the cache when the files are unchanged.
+
+    Load the entry with `select_related("analysis")` and an unchanged asset
+    costs no extra query — only the stat calls for the fingerprint.
+    """
+    fp  = analysis_fingerprint(entry)
+    rec = cached_analysis(entry)
+    if rec is not None and rec.fingerprint == fp:
+        return rec.data
+
+    data = analyze_gltf_and_textures(entry)
+    # two first views of one entry may race here — upsert instead of insert
+    AssetAnalysis.objects.update_or_create(entry=entry, defaults={"fingerprint": fp, "data": data})
+    return data
+
+
+async def aget_analysis(entry) -> dict:
+    """
+    `get_analysis` for async views. `entry` must be loaded with
+    `select_related("analysis")`; the stat calls and a stale analysis run
+    on the `aio` pool, the cache row is upserted through the async ORM.
+    """
+    fp  = await aio.run_io(analysis_fingerprint, entry)
+    rec = cached_analysis(entry)
+    if rec is not None and rec.fingerprint == fp:
+        return rec.data
+
+    data = await aanalyze_gltf_and_textures(entry)
+    await AssetAnalysis.objects.aupdate_or_create(entry=entry, defaults={"fingerprint": fp, "data": data})
+    return data
+
+
+def refresh_analyses(entries, *, workers: int | None = None, force: bool = False) -> dict:
+    """
+    Brings the cached analysis of `entries` up to date.
+
+    Fingerprinting and analysis run on a thread pool (both are file I/O
+    bound); pass entries loaded with `select_related("analysis")` to avoid
+    a query per entry. Rows are written afterwards with bulk_create / bulk_update.
+    Returns counters: {"fresh", "analyzed", "errors"}.
+    """
+    workers    = workers or getattr(settings, "LIBRARY_SYNC_WORKERS", 8)
+    batch_size = getattr(settings, "LIBRARY_SYNC_BATCH_SIZE", 500)
+    entries    = list(entries)
+    counts     = {"fresh": 0, "analyzed": 0, "errors": 0}
+
+    def work(job):
+        entry, rec = job
+        try:
+            fp  = analysis_fingerprint(entry)
+            if not force and rec is not None and rec.fingerprint == fp:
+                return entry, rec, None, None
+            return entry, rec, fp, analyze_gltf_and_textures(entry)
+        except Exception as exc:
+            print(f"  ! analysis failed: {entry.name} ({exc})")
+            return entry, None, None, exc
+
+    to_create, to_update = [], []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="library-analyze") as pool:
+        # Cached rows are resolved here so worker threads never touch the DB
+        jobs = [(entry, cached_analysis(entry)) for entry in entries]
+        for entry, rec, fp, data in pool.map(work, jobs):
+            if isinstance(data, Exception):
+                counts["errors"] += 1
+            elif fp is None:
+                counts["fresh"] += 1
+            else:
+                counts["analyzed"] += 1
+                if rec is None:
+                    to_create.append(AssetAnalysis(entry=entry, fingerprint=fp, data=data))
+                else:
+                    rec.fingerprint, rec.data, rec.analyzed_at = fp, data, timezone.now()
+                    to_update.append(rec)
+
+    with transaction.atomic():
+        AssetAnalysis.objects.bulk_create(to_create, batch_size=batch_size)
+        AssetAnalysis.objects.bulk_update(to_update, ["fingerprint", "data", "analyzed_at"], batch_size=batch_size)
+        search.reindex([r.entry_id for r in to_create + to_update])   # texture types are searchable
+        if to_create or to_update:
+            facets.bump_analysis_version()                             # API ETags embed analyses
+    stats.refresh_entries([r.entry_id for r in to_create + to_update])
+    return counts
@@ -0,0 +1,241 @@
+"""
+JSON API for pipeline tools.
+
+    GET /api/entries/                 filters as on the index (see queries.py)
+        ?cursor=…                     next page (from the previous "next")
+        ?limit=N                      page size, 1–200 (default 50)
+        ?sort=newest                  newest first instead of by name
+        ?fields=id,name,thumb         sparse fieldset
+        ?embed=analysis               include the cached glTF/texture analysis
+    GET /api/entries/<id>/
+    GET /api/types/   /api/categories/   /api/tags/   /api/roots/
+    POST /api/entries/bulk/           batch tag / categorise (see bulk.py);
+                                      "Authorization: Bearer <LIBRARY_API_TOKEN>",
+                                      or the browser session's CSRF token
+
+Every GET response carries a weak ETag built from the library and analysis
+version counters (library/facets.py, kept in the cache) and the request's
+query string, so a poller that sends If-None-Match gets a 304 without
+touching the database.
+"""
+import hashlib
+import json
+import os
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponseNotModified, JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.http import QueryDict
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from . import facets, search
+from .analysis import cached_analysis
+from .bulk import KEEP, BulkEditError, apply_bulk
+from .models import FolderEntry, LibraryRoot, ModelCategory, ModelType, Tag
+from .pagination import InvalidCursor, keyset_page
+from .queries import filter_entries, sort_key
+
+DEFAULT_LIMIT, MAX_LIMIT = 50, 200
+
+ENTRY_FIELDS = ("id", "name", "root", "rel_path", "path", "thumb", "detail", "gltf", "url",
+                "obtained_on", "type", "category", "tags")
+
+
+# ────────────────────────────────────────────────
+# Conditional GET
+# ────────────────────────────────────────────────
+def _etag(request) -> str:
+    digest = hashlib.sha1(request.get_full_path().encode("utf-8")).hexdigest()[:16]
+    return f'W/"{facets.library_version()}.{facets.analysis_version()}-{digest}"'
+
+
+def _not_modified(request, etag) -> bool:
+    header = request.headers.get("If-None-Match", "")
+    return any(tag.strip() in (etag, "*") for tag in header.split(","))
+
+
+def conditional_json(view):
+    """Short-circuits with 304 when the client's ETag matches, else tags the response."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        etag = _etag(request)
+        if _not_modified(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            response = view(request, *args, **kwargs)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+    return require_GET(wrapper)
+
+
+# ────────────────────────────────────────────────
+# Write access
+# ────────────────────────────────────────────────
+def token_or_csrf(view):
+    """
+    Lets a write through with the API bearer token (pipeline tools) or,
+    without an Authorization header, a passing CSRF check (the index page).
+    With LIBRARY_API_TOKEN unset only the browser UI can write.
+    """
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        header = request.headers.get("Authorization", "")
+        if header:
+            token = getattr(settings, "LIBRARY_API_TOKEN", "")
+            if not (token and constant_time_compare(header, f"Bearer {token}")):
+                return JsonResponse({"error": "Invalid API token"}, status=403)
+        elif CsrfViewMiddleware(lambda r: None).process_view(request, None, (), {}) is not None:
+            return JsonResponse({"error": "CSRF check failed"}, status=403)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+# ────────────────────────────────────────────────
+# Serialising
+# ────────────────────────────────────────────────
+def _fields(request) -> tuple:
+    wanted = [f.strip() for f in request.GET.get("fields", "").split(",") if f.strip()]
+    return tuple(f for f in wanted if f in ENTRY_FIELDS) or ENTRY_FIELDS
+
+
+def _rel(path, root) -> str:
+    return os.path.relpath(path, root).replace("\\", "/")
+
+
+def entry_dict(request, entry, fields, embed_analysis=False) -> dict:
+    getters = {
+        "id":          lambda: entry.id,
+        "name":        lambda: entry.name,
+        "root":        lambda: entry.root_id,
+        "rel_path":    lambda: entry.rel_path,
+        "path":        lambda: entry.path,
+        "thumb":       lambda: request.build_absolute_uri(reverse("entry_thumb", args=[entry.id])),
+        "detail":      lambda: request.build_absolute_uri(reverse("detail", args=[entry.id])),
+        "gltf":        lambda: request.build_absolute_uri(reverse(
+                           "serve_file_direct", args=[entry.id, _rel(entry.gltf_path, entry.path)])) if entry.gltf_path else None,
+        "url":         lambda: entry.lnk_path,
+        "obtained_on": lambda: entry.obtained_on.isoformat() if entry.obtained_on else None,
+        "type":        lambda: entry.type.slug if entry.type else None,
+        "category":    lambda: entry.category.slug if entry.category else None,
+        "tags":        lambda: [t.name for t in entry.tags.all()],
+    }
+    data = {f: getters[f]() for f in fields}
+    if embed_analysis:
+        rec = cached_analysis(entry)                 # cached only — never analysed on demand
+        data["analysis"] = rec.data if rec is not None else None
+    return data
+
+
+# ────────────────────────────────────────────────
+# Endpoints
+# ────────────────────────────────────────────────
+@conditional_json
+def entries(request):
+    """Filtered, cursor-paginated entry list."""
+    try:
+        limit = max(1, min(MAX_LIMIT, int(request.GET.get("limit", DEFAULT_LIMIT))))
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    fields = _fields(request)
+    embed  = "analysis" in request.GET.get("embed", "").split(",")
+
+    qs = FolderEntry.objects.select_related("type", "category")
+    if "tags" in fields:
+        qs = qs.prefetch_related("tags")
+    if embed:
+        qs = qs.select_related("analysis")
+    qs, ranked = filter_entries(qs, request.GET)
+    listing = search.order_by_rank(qs, request.GET.get("q", "")) if ranked else qs
+
+    try:
+        rows, cursor = keyset_page(listing, request.GET.get("cursor"), ranked=ranked, size=limit,
+                                   sort=sort_key(request.GET))
+    except InvalidCursor:
+        return JsonResponse({"error": "Invalid cursor"}, status=400)
+
+    next_url = None
+    if cursor:
+        params = request.GET.copy()
+        params["cursor"] = cursor
+        next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+    return JsonResponse({
+        "results": [entry_dict(request, e, fields, embed) for e in rows],
+        "next":    next_url,
+        "cursor":  cursor,
+    })
+
+
+@conditional_json
+def entry_detail(request, entry_id):
+    qs = FolderEntry.objects.select_related("type", "category", "analysis").prefetch_related("tags")
+    entry = get_object_or_404(qs, id=entry_id)
+    embed = "analysis" in request.GET.get("embed", "").split(",")
+    return JsonResponse(entry_dict(request, entry, _fields(request), embed))
+
+
+@conditional_json
+def library_roots(request):
+    return JsonResponse({"results": list(LibraryRoot.objects.values(
+        "id", "name", "path", "enabled", "sync_interval", "last_synced_at"))})
+
+
+@conditional_json
+def types(request):
+    return JsonResponse({"results": list(ModelType.objects.values("id", "code", "slug", "name"))})
+
+
+@conditional_json
+def categories(request):
+    return JsonResponse({"results": list(ModelCategory.objects.values("id", "slug", "name", "type__slug"))})
+
+
+@conditional_json
+def tags(request):
+    return JsonResponse({"results": list(Tag.objects.values("id", "slug", "name"))})
+
+
+@token_or_csrf
+@require_POST
+def bulk_edit(request):
+    """
+    Batch edit over a selection or a whole filter result. JSON body:
+
+        {"ids": [1, 2, …]}  or  {"filter": "q=chair&type=furniture"}
+        "add_tags":     ["Wood", …]       created when missing
+        "remove_tags":  ["Old", …]
+        "set_category": "chairs" | 12 | null     (omit to leave as-is)
+    """
+    try:
+        body = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Body must be JSON"}, status=400)
+    if not isinstance(body, dict):
+        return JsonResponse({"error": "Body must be a JSON object"}, status=400)
+
+    if isinstance(body.get("ids"), list):
+        ids = [i for i in body["ids"] if isinstance(i, int)]
+        qs  = FolderEntry.objects.filter(id__in=ids)
+    elif isinstance(body.get("filter"), str):
+        qs, _ = filter_entries(FolderEntry.objects.all(), QueryDict(body["filter"]))
+    else:
+        return JsonResponse({"error": "Give either 'ids' or 'filter'"}, status=400)
+
+    add_tags    = body.get("add_tags") or []
+    remove_tags = body.get("remove_tags") or []
+    if not all(isinstance(t, str) for t in [*add_tags, *remove_tags]):
+        return JsonResponse({"error": "Tag names must be strings"}, status=400)
+
+    try:
+        result = apply_bulk(qs, add_tags=add_tags, remove_tags=remove_tags,
+                            set_category=body.get("set_category", KEEP))
+    except BulkEditError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse(result)
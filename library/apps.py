@@ -1,150 +1,350 @@
 import os
 import re
 import shutil
+import time
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
-from django.apps        import AppConfig, apps
+from django.apps        import AppConfig
 from django.conf        import settings
-from django.core.management import call_command
-from django.db          import connections
-from django.db.utils    import OperationalError
+from django.db          import transaction
 from django.utils.timezone import make_aware
 from dotenv             import load_dotenv
 
+from .                   import dedupe, facets, metrics, precompress, roots, search, startup, stats
+from .derivatives       import build_derivatives
+from .scanner           import parse_url, scan_folder, scan_root
+
+# FolderEntry columns sync is allowed to overwrite on existing rows.
+SYNC_UPDATE_FIELDS = ["path", "jpeg_path", "gltf_path", "lnk_path", "obtained_on", "type", "disk_bytes",
+                      "fingerprint"]
+
+# Columns the sync snapshot loads — what it compares, plus the keys.
+SYNC_LOAD_FIELDS = ["id", "rel_path", *SYNC_UPDATE_FIELDS]
+
+
+@dataclass
+class SyncReport:
+    """ Counters collected by one `sync_folders` run. """
+    scanned:   int   = 0     # folders looked at
+    errors:    int   = 0     # folders / thumbnails that failed on I/O
+    skipped:   int   = 0     # fingerprint unchanged → untouched
+    added:     int   = 0
+    changed:   int   = 0     # fingerprint differed → row re-checked
+    removed:   int   = 0
+    elapsed:   float = 0.0   # seconds, whole run
+    scan_time: float = 0.0   # seconds spent in the parallel scan stage
+
+    @property
+    def throughput(self) -> float:
+        """Folders scanned per second."""
+        return self.scanned / self.scan_time if self.scan_time else 0.0
+
+    def __str__(self) -> str:
+        return (f"scanned {self.scanned}, skipped {self.skipped}, added {self.added}, "
+                f"changed {self.changed}, removed {self.removed}, errors {self.errors} "
+                f"in {self.elapsed:.2f}s ({self.throughput:.0f} folders/s)")
+
+
+class SyncCancelled(Exception):
+    """ Raised from a `sync_folders` progress callback to abort the run. """
+
 
 class LibraryConfig(AppConfig):
-    """ Registers the “library” Django app and kicks off a one-time folder sync. """
+    """ Registers the “library” Django app; owns the folder sync. """
     name = "library"
 
     # ────────────────────────────────────────────────
     # Django calls this once the registry is built
     # ────────────────────────────────────────────────
     def ready(self):
-        # ▸ When runserver’s autoreloader forks a child it sets RUN_MAIN=’true’.
-        if os.environ.get("RUN_MAIN") != "true":
-            return
-
-        # 1️⃣  Make sure the DB is actually up.
-        try:
-            connections["default"].ensure_connection()
-        except OperationalError:
-            print("[Library] DB not ready — skipping sync.")
-            return
-
-        # 2️⃣  Run migrations silently (handy in dev / fresh clones).
-        try:
-            call_command("makemigrations", "library", interactive=False, verbosity=0)
-            call_command("migrate",        interactive=False, verbosity=0)
-        except Exception as exc:
-            print(f"[Library] Migration error: {exc}")
-            return
+        # Keep this cheap — it runs in every process, before any request is
+        # served. Migrations, seeding and the folder sync are the deferred
+        # warm-up (library/startup.py), started from the WSGI / ASGI module.
+        with startup.phase("library.ready"):
+            # ▸ Signal handlers (search index upkeep) are needed in every process.
+            from . import signals  # noqa: F401
 
-        # 3️⃣  Load .env for VERSION & default root path.
-        load_dotenv()
-        settings.APP_VERSION = os.getenv("APP_VERSION", "dev")
+            # ▸ .env carries APP_VERSION (footer, deployment id) and DEFAULT_ROOT_DIR.
+            load_dotenv()
+            settings.APP_VERSION = os.getenv("APP_VERSION", "dev")
 
-        # 4️⃣  Grab our models *after* the registry is ready.
-        ModelType    = apps.get_model("library", "ModelType")
-        AppSetting   = apps.get_model("library", "AppSetting")
-        FolderEntry  = apps.get_model("library", "FolderEntry")
+    # ────────────────────────────────────────────────
+    # Sync helper
+    # ────────────────────────────────────────────────
+    def sync_folders(self, *, entry_cls, type_gltf,
+                     root=None,
+                     root_dir: Path | None = None,
+                     batch_size: int | None = None,
+                     workers: int | None = None,
+                     names=None,
+                     progress=None) -> "SyncReport | None":
+        """
+        Scans one library root, (re-)creates its FolderEntry rows and copies
+        thumbnails. Pass the `LibraryRoot` as `root`, or a bare `root_dir`
+        (looked up / registered via `roots.root_for_dir`). Entries of other
+        roots are never read or touched.
 
-        # 5️⃣  Ensure we have a ROOT_DIR setting.
-        default_root = os.getenv("DEFAULT_ROOT_DIR", r"C:\Fallback\Downloads")
-        AppSetting.objects.get_or_create(key="ROOT_DIR", defaults={"value": default_root})
+        The filesystem walk runs on a thread pool (see `library.scanner`);
+        each folder is reduced to a stat fingerprint and folders whose
+        fingerprint matches the stored one are skipped without touching the
+        DB or the thumbnail cache. All row changes are collected first and
+        written in one transaction with batched bulk_create / bulk_update /
+        delete.
 
-        # 6️⃣  Ensure the “glTF” type exists (others can be added later).
-        gltf_type, _ = ModelType.objects.get_or_create(code="gltf", defaults={"name": "glTF"})
+        Passing `names` limits the run to those top-level folders: only they
+        are scanned, and only their rows can be added, updated or removed —
+        the rest of the library is left alone (used by the watcher).
 
-        # 7️⃣  Do the folder synchronisation.
-        try:
-            self.sync_folders(
-                root_dir   = Path(AppSetting.objects.get(key="ROOT_DIR").value).expanduser(),
-                entry_cls  = FolderEntry,
-                type_gltf  = gltf_type
-            )
-        except Exception as exc:
-            print(f"[Library] Folder sync failed: {exc}")
+        `progress(phase, done, total, report)` is invoked as work advances;
+        raising `SyncCancelled` from it aborts the run before anything is
+        written. Once the write has committed the run can no longer be
+        cancelled — a late `SyncCancelled` is ignored so the hashes, stats
+        and last-synced time still catch up with the rows.
+        """
+        from .models import fold_name
 
-    # ────────────────────────────────────────────────
-    # Sync helper
-    # ────────────────────────────────────────────────
-    def sync_folders(self, *, root_dir: Path, entry_cls, type_gltf):
-        """Scans `root_dir`, (re-)creates FolderEntry rows and copies thumbnails."""
+        root     = root or roots.root_for_dir(root_dir)
+        root_dir = Path(root.path).expanduser()
         if not root_dir.exists():
-            print(f"[Library] ROOT_DIR {root_dir} missing — aborting sync.")
-            return
+            print(f"[Library] Root {root.name} ({root_dir}) missing — aborting sync.")
+            return None
 
-        thumb_dir = Path(settings.MEDIA_ROOT) / "thumbs"
+        batch_size = batch_size or getattr(settings, "LIBRARY_SYNC_BATCH_SIZE", 500)
+        workers    = workers    or roots.root_workers(root)
+        thumb_rel  = root.thumb_dir
+        thumb_dir  = Path(settings.MEDIA_ROOT) / thumb_rel
         thumb_dir.mkdir(parents=True, exist_ok=True)
 
-        # Snapshot of existing DB rows keyed by folder-name
-        existing = {e.name: e for e in entry_cls.objects.all()}
-        seen     = set()
+        # Snapshot of this root's DB rows keyed by folder path under the root
+        rows      = entry_cls.objects.filter(root=root).order_by()
+        if names is not None:
+            rows  = rows.filter(rel_path__in=names)
+        existing  = {e.rel_path: e for e in rows.only(*SYNC_LOAD_FIELDS)}
+        seen      = set()
+        to_create = []
+        to_update = []
+        dirty     = {"fingerprint"}      # columns that differ on at least one updated row
+        to_copy   = []
+        report    = SyncReport()
+        started   = time.perf_counter()
 
-        print(f"[Library] Scanning {root_dir} …")
+        committed = False
 
-        for folder in sorted(p for p in root_dir.iterdir() if p.is_dir()):
-            name = folder.name
-            jpeg = folder / f"{name}.jpeg"
-            gltf = folder / f"{name}.gltf"
-            urlf = folder / f"{name}.url"
+        def report_progress(phase, done, total):
+            if progress:
+                try:
+                    progress(phase, done, total, report)
+                except SyncCancelled:
+                    if not committed:
+                        raise
+
+        known = {n: e.fingerprint for n, e in existing.items()}
+        if names is None:
+            print(f"[Library] Scanning {root.name} ({root_dir}) with {workers} workers …")
+            scans = scan_root(root_dir, known=known, workers=workers,
+                              on_progress=lambda done, total: report_progress("scanning", done, total))
+        else:
+            # Folders that vanished simply produce no scan → purged as orphans below
+            folders = [root_dir / n for n in sorted(set(names)) if (root_dir / n).is_dir()]
+            scans   = [scan_folder(f, known.get(f.name)) for f in folders]
+        report.scanned   = len(scans)
+        report.scan_time = time.perf_counter() - started
 
-            if not jpeg.exists():
+        for scan in scans:
+            name = scan.name
+            if scan.error:
+                report.errors += 1
+                print(f"  ! scan failed: {name} ({scan.error})")
+                if name in existing:
+                    seen.add(name)                          # don't purge on a flaky share
+                continue
+
+            if not scan.has_thumbnail:
                 continue                                    # must have thumbnail
 
-            # Copy thumbnail if newer / missing
+            seen.add(name)
+            folder      = scan.path
             safe_name   = self.slugify(name)
             dest_thumb  = thumb_dir / f"{safe_name}.jpeg"
+            entry       = existing.get(name)
+
+            jpeg = folder / f"{name}.jpeg"
+            gltf = folder / f"{name}.gltf"
+
+            # Unchanged since last sync → at most restore a lost thumbnail
+            if entry is not None and entry.fingerprint == scan.fingerprint:
+                if not dest_thumb.exists():
+                    to_copy.append((name, jpeg, dest_thumb))
+                report.skipped += 1
+                continue
+
+            # Copy thumbnail if newer / missing (done on the pool below)
             if self.needs_copy(dest_thumb, jpeg):
-                shutil.copyfile(jpeg, dest_thumb)
-                print(f"  • thumbnail updated: {name}")
+                to_copy.append((name, jpeg, dest_thumb))
 
             # Prepare/lookup DB row
-            entry   = existing.get(name)
-            mtime   = make_aware(datetime.fromtimestamp(gltf.stat().st_mtime)) if gltf.exists() else None
-            url_val = self.parse_url(urlf)
+            gltf_st = scan.stats[".gltf"]
+            mtime   = make_aware(datetime.fromtimestamp(gltf_st.st_mtime)) if gltf_st else None
+            url_val = scan.url
 
             if entry is None:
-                entry_cls.objects.create(
+                to_create.append(entry_cls(
+                    root        = root,
+                    rel_path    = name,
                     name        = name,
+                    name_lower  = fold_name(name),
                     path        = str(folder),
-                    jpeg_path   = f"thumbs/{safe_name}.jpeg",
-                    gltf_path   = str(gltf) if gltf.exists() else None,
+                    jpeg_path   = f"{thumb_rel}/{safe_name}.jpeg",
+                    gltf_path   = str(gltf) if gltf_st else None,
                     lnk_path    = url_val,
                     obtained_on = mtime,
+                    disk_bytes  = scan.disk_bytes or 0,
+                    fingerprint = scan.fingerprint,
                     type        = type_gltf,   # default type
-                )
+                ))
+                report.added += 1
                 print(f"  + added: {name}")
             else:
-                changed = False
-                if entry.jpeg_path != f"thumbs/{safe_name}.jpeg":
-                    entry.jpeg_path = f"thumbs/{safe_name}.jpeg"; changed = True
-                if gltf.exists() and entry.gltf_path != str(gltf):
-                    entry.gltf_path = str(gltf);           changed = True
+                changed = set()
+                if entry.path != str(folder):
+                    entry.path = str(folder);              changed.add("path")
+                if entry.jpeg_path != f"{thumb_rel}/{safe_name}.jpeg":
+                    entry.jpeg_path = f"{thumb_rel}/{safe_name}.jpeg"; changed.add("jpeg_path")
+                if gltf_st and entry.gltf_path != str(gltf):
+                    entry.gltf_path = str(gltf);           changed.add("gltf_path")
                 if entry.lnk_path != url_val:
-                    entry.lnk_path = url_val;              changed = True
+                    entry.lnk_path = url_val;              changed.add("lnk_path")
                 if mtime and entry.obtained_on != mtime:
-                    entry.obtained_on = mtime;             changed = True
+                    entry.obtained_on = mtime;             changed.add("obtained_on")
                 if entry.type_id is None:
-                    entry.type = type_gltf;                changed = True
+                    entry.type = type_gltf;                changed.add("type")
+                if scan.disk_bytes is not None and entry.disk_bytes != scan.disk_bytes:
+                    entry.disk_bytes = scan.disk_bytes;    changed.add("disk_bytes")
                 if changed:
-                    entry.save()
+                    dirty |= changed
                     print(f"  • updated: {name}")
+                # Always persist the new fingerprint so the next run can skip it
+                entry.fingerprint = scan.fingerprint
+                to_update.append(entry)
+                report.changed += 1
 
-            seen.add(name)
+        # Thumbnail copies are pure I/O — same pool size as the scan
+        report_progress("thumbnails", report.scanned, report.scanned)
+        copied = []
+        if to_copy:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="library-thumb") as pool:
+                for (name, _, dest), (_, ok) in zip(to_copy, pool.map(self._copy_thumb, to_copy)):
+                    if ok:
+                        copied.append(dest)
+                        print(f"  • thumbnail updated: {name}")
+                    else:
+                        report.errors += 1
+
+        # Card-size WebP variants for fresh thumbnails (CPU-bound → process pool)
+        prebuild = getattr(settings, "LIBRARY_DERIVATIVE_PREBUILD", (256, 512))
+        if copied and prebuild:
+            report_progress("derivatives", report.scanned, report.scanned)
+            build_derivatives(copied, sizes=prebuild)
 
-        # Purge orphans
-        for lost_name in set(existing) - seen:
-            existing[lost_name].delete()
+        orphans = sorted(set(existing) - seen)
+        for lost_name in orphans:
             print(f"  – removed orphan: {lost_name}")
+        report.removed = len(orphans)
+
+        # One write burst for the whole run
+        report_progress("writing", report.scanned, report.scanned)
+        with transaction.atomic():
+            entry_cls.objects.bulk_create(to_create, batch_size=batch_size)
+            # Only the columns that actually changed somewhere — usually just the fingerprint
+            entry_cls.objects.bulk_update(to_update, [f for f in SYNC_UPDATE_FIELDS if f in dirty],
+                                          batch_size=batch_size)
+            removed_ids = []
+            for i in range(0, len(orphans), batch_size):
+                doomed = entry_cls.objects.filter(root=root, rel_path__in=orphans[i:i + batch_size])
+                removed_ids += doomed.values_list("id", flat=True)
+                doomed.delete()
+
+            # bulk writes bypass the signals → refresh the search index here
+            touched = [e.rel_path for e in to_create] + [e.rel_path for e in to_update]
+            search.unindex(removed_ids)
+            search.reindex(entry_cls.objects.filter(root=root, rel_path__in=touched)
+                                            .values_list("id", flat=True))
+            if to_create or to_update or orphans:
+                facets.bump_version()                 # once, when the rows become visible
+        committed = True
+
+        # Duplicate-detection hashes for what this run added / changed — off by default:
+        # it reads file contents, `find_duplicates --refresh` does it off the sync
+        if touched and getattr(settings, "LIBRARY_HASH_ON_SYNC", False):
+            report_progress("hashing", report.scanned, report.scanned)
+            for i in range(0, len(touched), batch_size):
+                dedupe.refresh_hashes(entry_cls.objects.filter(root=root, rel_path__in=touched[i:i + batch_size]),
+                                      workers=workers)
 
-        print("[Library] Folder sync complete.")
+        # Dashboard aggregates: new type / sizes for touched rows, minus removed ones
+        if touched or orphans:
+            report_progress("stats", report.scanned, report.scanned)
+            for i in range(0, len(touched), batch_size):
+                stats.refresh_entries(entry_cls.objects.filter(root=root, rel_path__in=touched[i:i + batch_size])
+                                      .values_list("id", flat=True))
+            stats.collect_orphans()
+
+        # Gzip variants of the .gltf / .json / .url files of new and changed folders —
+        # built off the sync thread; the rows are already browsable
+        if getattr(settings, "LIBRARY_PRECOMPRESS_ON_SYNC", True):
+            precompress.build_in_background([(e.path, e.gltf_path) for e in (*to_create, *to_update)],
+                                            workers=workers)
+
+        report.elapsed = time.perf_counter() - started
+        self._record_metrics(root, report, "full" if names is None else "partial")
+        if names is None:
+            roots.mark_synced(root)
+            print(f"[Library] Folder sync of {root.name} complete — {report}")
+        return report
+
+    @staticmethod
+    def _record_metrics(root, report: SyncReport, mode: str) -> None:
+        metrics.SYNC_SECONDS.observe(report.elapsed, root=root.name, mode=mode)
+        for outcome in ("skipped", "added", "changed", "removed", "errors"):
+            if count := getattr(report, outcome):
+                metrics.SYNC_FOLDERS.inc(count, root=root.name, outcome=outcome)
+
+    @staticmethod
+    def _copy_thumb(job) -> tuple[str, bool]:
+        name, src, dest = job
+        try:
+            shutil.copy2(src, dest)                 # keep mtime so needs_copy() settles
+            return name, True
+        except OSError as exc:
+            print(f"  ! thumbnail copy failed: {name} ({exc})")
+            return name, False
 
     # ────────────────────────────────────────────────
     # Helpers
     # ────────────────────────────────────────────────
+    @staticmethod
+    def backfill_name_lower(entry_cls, batch_size: int = 2000) -> int:
+        """Sets `name_lower` on rows written before the column existed."""
+        from .models import fold_name
+
+        filled = 0
+        while True:
+            batch = list(entry_cls.objects.filter(name_lower="").exclude(name="")
+                                          .only("id", "name")[:batch_size])
+            if not batch:
+                break
+            for e in batch:
+                e.name_lower = fold_name(e.name) or e.name
+            entry_cls.objects.bulk_update(batch, ["name_lower"])
+            filled += len(batch)
+        if filled:
+            print(f"[Library] Filled name_lower for {filled} entries.")
+        return filled
+
     @staticmethod
     def slugify(text: str) -> str:
         text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
@@ -162,11 +362,4 @@ class LibraryConfig(AppConfig):
     def parse_url(url_file: Path) -> str | None:
         if not url_file.exists():
             return None
-        try:
-            with url_file.open("r", encoding="utf-8") as fh:
-                for line in fh:
-                    if line.lower().startswith("url="):
-                        return line.strip().split("=", 1)[1]
-        except Exception:
-            pass
-        return None
\ No newline at end of file
+        return parse_url(url_file)
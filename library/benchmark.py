@@ -0,0 +1,323 @@
+"""
+Synthetic asset libraries and the timed scenarios behind `manage.py benchmark`.
+
+`generate_library` writes a ROOT_DIR tree in the README layout — per
+folder a `<name>.gltf` (embedded buffer padded to the requested size,
+accessor counts that vary per asset), a `<name>.jpeg` thumbnail,
+`textures/*.png` and, for some folders, a `<name>.url` shortcut. Images
+are rendered once and hard-linked into every folder (copied where links
+aren't supported), so a 100k-folder tree costs directory entries rather
+than gigabytes. A `.benchmark.json` manifest lets a later run reuse a tree
+generated with the same parameters.
+
+`run_suite` points a `LibraryRoot` at such a tree inside a throwaway
+database and media folder, then times the sync (cold and warm), the index
+page and AJAX pages at depth, the detail page with and without a cached
+analysis, and file serving. The result is a JSON-ready dict; `compare`
+lines two of them up so commits can be checked for regressions.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+from django.conf import settings
+
+# Texture map names, in the order a folder with N textures gets them.
+TEXTURE_NAMES = ("albedo", "normal", "roughness", "metallic", "ao", "emissive", "opacity", "specular")
+
+# Distinct thumbnails to rotate through (near-duplicate clusters stay realistic).
+THUMB_VARIANTS = 32
+
+_WORDS_A = ("Old", "Rusty", "Mossy", "Wooden", "Stone", "Painted", "Broken", "Modern", "Antique", "Small")
+_WORDS_B = ("Chair", "Crate", "Barrel", "Lamp", "Table", "Rock", "Door", "Fence", "Statue", "Shelf")
+
+
+@dataclass
+class TreeSpec:
+    """ Shape of a generated library. """
+    folders:    int   = 1000
+    textures:   int   = 3        # textures per folder (≤ len(TEXTURE_NAMES))
+    texture_px: int   = 512      # square texture resolution
+    gltf_kb:    int   = 64       # size of each .gltf file
+    url_ratio:  float = 0.5      # share of folders with a .url shortcut
+    seed:       int   = 1
+
+    def key(self) -> str:
+        return hashlib.sha1(json.dumps(asdict(self), sort_keys=True).encode()).hexdigest()[:12]
+
+
+# ────────────────────────────────────────────────
+# Generator
+# ────────────────────────────────────────────────
+def generate_library(root: Path, spec: TreeSpec, *, workers: int = 8, log=print) -> bool:
+    """
+    Writes the tree for `spec` under `root`; returns False when a tree with
+    the same spec is already there (reused as-is).
+    """
+    root     = Path(root)
+    manifest = root / ".benchmark.json"
+    if manifest.exists() and json.loads(manifest.read_text()).get("key") == spec.key():
+        return False
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+
+    templates = root.parent / f".templates-{spec.key()}"
+    templates.mkdir(exist_ok=True)
+    thumbs   = [_write_once(templates / f"thumb-{i}.jpeg", lambda i=i: _image_bytes(256, i, "JPEG"))
+                for i in range(THUMB_VARIANTS)]
+    textures = [_write_once(templates / f"{kind}.png", lambda i=i: _image_bytes(spec.texture_px, 100 + i, "PNG"))
+                for i, kind in enumerate(TEXTURE_NAMES[:spec.textures])]
+
+    rng   = random.Random(spec.seed)
+    names = [f"{rng.choice(_WORDS_A)}{rng.choice(_WORDS_B)}_{i:06d}" for i in range(spec.folders)]
+    jobs  = [(root / name, rng.random() < spec.url_ratio, rng.randint(1, 400), thumbs[i % len(thumbs)])
+             for i, name in enumerate(names)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bench-gen") as pool:
+        for done, _ in enumerate(pool.map(lambda job: _write_folder(*job, textures, spec), jobs), 1):
+            if done % 10000 == 0:
+                log(f"  generated {done}/{spec.folders} folders …")
+    manifest.write_text(json.dumps({"key": spec.key(), "spec": asdict(spec)}))
+    log(f"Generated {spec.folders} folders in {time.perf_counter() - started:.1f}s under {root}")
+    return True
+
+
+def _write_folder(folder: Path, with_url: bool, scale: int, thumb: Path, textures: list, spec: TreeSpec) -> None:
+    name = folder.name
+    (folder / "textures").mkdir(parents=True)
+    _link(thumb, folder / f"{name}.jpeg")
+    for tex in textures:
+        _link(tex, folder / "textures" / tex.name)
+    (folder / f"{name}.gltf").write_text(gltf_document(name, spec.gltf_kb * 1024, scale,
+                                                        [t.name for t in textures]), encoding="utf-8")
+    if with_url:
+        (folder / f"{name}.url").write_text(
+            f"[InternetShortcut]\nURL=https://assets.example.com/{name.lower()}\n", encoding="utf-8")
+
+
+def gltf_document(name: str, size: int, scale: int, textures: list) -> str:
+    """A valid glTF 2.0 JSON document of about `size` bytes with ~`scale`×100 triangles."""
+    vertices = scale * 60
+    indices  = scale * 300
+    doc = {
+        "asset":       {"version": "2.0", "generator": "library benchmark"},
+        "scene":       0,
+        "scenes":      [{"nodes": [0]}],
+        "nodes":       [{"mesh": 0, "name": name}],
+        "meshes":      [{"primitives": [{"attributes": {"POSITION": 0}, "indices": 1, "material": 0}]}],
+        "materials":   [{"name": f"{name}_mat"}],
+        "accessors":   [{"bufferView": 0, "componentType": 5126, "count": vertices, "type": "VEC3"},
+                        {"bufferView": 1, "componentType": 5125, "count": indices, "type": "SCALAR"}],
+        "bufferViews": [{"buffer": 0, "byteLength": vertices * 12},
+                        {"buffer": 0, "byteOffset": vertices * 12, "byteLength": indices * 4}],
+        "images":      [{"uri": f"textures/{t}"} for t in textures],
+        "buffers":     [{"byteLength": 0, "uri": ""}],
+    }
+    # Pad with an embedded buffer so the file reaches the requested size
+    room    = max(0, size - len(json.dumps(doc)) - 64)
+    payload = os.urandom(room * 3 // 4)
+    doc["buffers"][0] = {"byteLength": len(payload),
+                         "uri": "data:application/octet-stream;base64," + base64.b64encode(payload).decode("ascii")}
+    return json.dumps(doc)
+
+
+def _image_bytes(px: int, seed: int, fmt: str) -> bytes:
+    from PIL import Image
+
+    rng   = random.Random(seed)
+    image = Image.effect_noise((px, px), 24 + seed % 40).convert("RGB")
+    tint  = Image.new("RGB", (px, px), tuple(rng.randrange(256) for _ in range(3)))
+    buf   = io.BytesIO()
+    Image.blend(image, tint, 0.6).save(buf, fmt, quality=85)
+    return buf.getvalue()
+
+
+def _write_once(path: Path, render) -> Path:
+    if not path.exists():
+        path.write_bytes(render())
+    return path
+
+
+def _link(src: Path, dest: Path) -> None:
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+# ────────────────────────────────────────────────
+# Timing
+# ────────────────────────────────────────────────
+def summarize(samples: list) -> dict:
+    """Milliseconds: n / min / median / p95 / max / mean of `samples` (seconds)."""
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "n":      len(ms),
+        "min":    round(ms[0], 3),
+        "median": round(statistics.median(ms), 3),
+        "p95":    round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "max":    round(ms[-1], 3),
+        "mean":   round(statistics.fmean(ms), 3),
+    }
+
+
+def timed(fn, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _consume(response) -> int:
+    """Reads the whole body (streamed or not) like a client would; returns its length."""
+    if response.streaming:
+        n = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        n = len(response.content)
+    response.close()
+    return n
+
+
+# ────────────────────────────────────────────────
+# Suite
+# ────────────────────────────────────────────────
+def run_suite(tree: Path, *, repeat: int = 20, depths=(1, 10, 100, 1000), samples: int = 20,
+              workers: int | None = None, log=print) -> dict:
+    """
+    Times every scenario against the library at `tree`. Expects to run
+    inside a throwaway database and MEDIA_ROOT (see the benchmark command).
+    """
+    from django.apps import apps
+    from django.core.cache import cache
+    from django.test import Client
+    from django.urls import reverse
+
+    from .analysis import TEXTURE_SUFFIXES
+    from .models import AssetAnalysis, FolderEntry, LibraryRoot, ModelType
+    from .pagination import PAGE_SIZE, encode_cursor
+
+    cfg        = apps.get_app_config("library")
+    gltf_type, _ = ModelType.objects.get_or_create(code="gltf", defaults={"name": "glTF"})
+    root       = LibraryRoot.objects.create(name="benchmark", path=str(tree))
+    client     = Client()
+    results    = {}
+
+    def record(name, samples_, **extra):
+        results[name] = {**summarize(samples_), **extra}
+        log(f"  {name:<34} median {results[name]['median']:9.2f} ms   p95 {results[name]['p95']:9.2f} ms")
+
+    def sync():
+        return cfg.sync_folders(root=root, entry_cls=FolderEntry, type_gltf=gltf_type, workers=workers)
+
+    # ▸ Sync: cold (empty DB + thumbnail cache), then warm (nothing changed)
+    log("Sync …")
+    started = time.perf_counter()
+    report  = sync()
+    record("sync.cold", [time.perf_counter() - started], folders=report.scanned,
+           folders_per_s=round(report.throughput), errors=report.errors)
+    report_warm = []
+    record("sync.warm", timed(lambda: report_warm.append(sync()), max(1, repeat // 5)),
+           folders_per_s=round(report_warm[-1].throughput))
+
+    # ▸ Index: full page with cold / warm count + facet caches, AJAX pages at depth
+    log("Index …")
+    def index_cold():
+        cache.clear()
+        assert client.get(reverse("index")).status_code == 200
+    record("index.full.cold_cache", timed(index_cold, repeat))
+    client.get(reverse("index"))
+    record("index.full.warm_cache", timed(lambda: client.get(reverse("index")), repeat))
+
+    ordered = FolderEntry.objects.order_by("name_lower", "id")
+    total   = ordered.count()
+    for depth in depths:
+        offset = depth * PAGE_SIZE - 1
+        if offset >= total:
+            continue
+        last   = ordered.values_list("name_lower", "id")[offset - PAGE_SIZE] if depth > 1 else None
+        cursor = encode_cursor(["k", *last]) if last else ""
+        url    = f"{reverse('index')}?cursor={cursor}"
+        record(f"index.ajax.page_{depth}",
+               timed(lambda: client.get(url, HTTP_X_REQUESTED_WITH="XMLHttpRequest"), repeat))
+
+    # ▸ Detail: first view analyses the asset, later views hit the AssetAnalysis cache
+    log("Detail …")
+    rng  = random.Random(7)
+    ids  = rng.sample(list(FolderEntry.objects.values_list("id", flat=True)), min(samples, total))
+    AssetAnalysis.objects.filter(entry_id__in=ids).delete()
+    cold = []
+    for entry_id in ids:
+        started = time.perf_counter()
+        assert client.get(reverse("detail", args=[entry_id])).status_code == 200
+        cold.append(time.perf_counter() - started)
+    record("detail.analysis_cold", cold)
+    detail_url = reverse("detail", args=[ids[0]])
+    record("detail.analysis_cached", timed(lambda: client.get(detail_url), repeat))
+
+    # ▸ File serving: whole-body reads of the .gltf and a texture, and a thumbnail variant
+    log("File serving …")
+    entry    = FolderEntry.objects.get(id=ids[0])
+    gltf_rel = Path(entry.gltf_path).name
+    texture  = next((p.name for p in sorted((Path(entry.path) / "textures").iterdir())
+                     if p.suffix.lower() in TEXTURE_SUFFIXES), None)
+    for name, url in (("serve.gltf", reverse("serve_file_direct", args=[entry.id, gltf_rel])),
+                      ("serve.texture", texture and reverse("serve_file_direct",
+                                                            args=[entry.id, f"textures/{texture}"])),
+                      ("serve.thumb_256", f"{reverse('entry_thumb', args=[entry.id])}?size=256")):
+        if not url:
+            continue
+        size = []
+        record(name, timed(lambda: size.append(_consume(client.get(url))), repeat), bytes=size[-1])
+        results[name]["mb_per_s"] = round(size[-1] / 1048576 / (results[name]["median"] / 1000), 1)
+
+    return results
+
+
+def environment() -> dict:
+    """Where the numbers came from: commit, interpreter, library versions, host."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+                                capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit":    commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python":    platform.python_version(),
+        "django":    django.get_version(),
+        "sqlite":    sqlite3.sqlite_version,
+        "platform":  platform.platform(),
+        "cpus":      os.cpu_count(),
+        "argv":      sys.argv[1:],
+    }
+
+
+def compare(baseline: dict, current: dict, *, threshold: float = 1.2) -> list:
+    """(scenario, baseline ms, current ms, ratio, regressed?) for scenarios in both runs, by median."""
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("median"):
+            continue
+        ratio = cur["median"] / base["median"]
+        rows.append((name, base["median"], cur["median"], ratio, ratio > threshold))
+    return rows
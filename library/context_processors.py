@@ -1,5 +1,5 @@
 from django.conf import settings
-from .models import ModelType, ModelCategory, Tag
+from .facets import facet_lists
 
 def app_version(request):
     return {
@@ -8,8 +8,7 @@ def app_version(request):
 
 
 def sidebar_context(request):
-    return {
-        'types': ModelType.objects.all(),
-        'categories': ModelCategory.objects.all(),
-        'tags': Tag.objects.all(),
-    }
\ No newline at end of file
+    # AJAX partials (infinite scroll, …) never render the sidebar
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return {}
+    return facet_lists()
\ No newline at end of file
@@ -0,0 +1,293 @@
+"""
+Duplicate and near-duplicate asset detection.
+
+Every entry gets two hashes, stored on the FolderEntry row:
+
+    content_hash   sha1 over the sorted digests of every file in the asset
+                   folder (except the .url shortcut) — equal for
+                   identical copies, whatever the folder is called. Files
+                   over `SAMPLE_FROM` contribute their size plus a head,
+                   middle and tail sample instead of every byte, so a
+                   folder of multi-hundred-MB buffers costs a few MB of
+                   reads
+    phash          64-bit difference hash (dHash) of the thumbnail —
+                   close in Hamming distance for re-renders / re-exports
+
+Hashing reads whole files, so it is incremental: `hash_fingerprint` (size
+and mtime of every file) is stored with the hashes and unchanged folders
+are skipped. `manage.py find_duplicates --refresh` (or `analyze_library
+--hashes`) brings them up to date; the folder sync only hashes what it
+added or changed when `LIBRARY_HASH_ON_SYNC` is on.
+
+`find_clusters` reports two kinds of cluster:
+
+    exact     entries sharing a content hash — every copy but the kept one
+              is reclaimable space
+    similar   entries with different content whose phashes are all within
+              `LIBRARY_DUPLICATE_DISTANCE` bits of each other (complete
+              linkage, so a chain of small differences never joins two
+              unrelated assets); worth a look, but nothing is counted as
+              reclaimable
+
+Neighbours are found through a BK-tree instead of comparing every pair.
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from PIL import Image, UnidentifiedImageError
+
+from . import facets, stats
+
+# Bump when the hashing scheme changes → every entry is re-hashed.
+HASH_VERSION = 2
+
+HASH_FIELDS  = ["phash", "content_hash", "disk_bytes", "hash_fingerprint"]
+CHUNK_SIZE   = 1024 * 1024
+
+# Larger files are hashed by size + three CHUNK_SIZE samples (head, middle, tail).
+SAMPLE_FROM  = 4 * CHUNK_SIZE
+
+
+def max_distance() -> int:
+    return getattr(settings, "LIBRARY_DUPLICATE_DISTANCE", 6)
+
+
+# ────────────────────────────────────────────────
+# Hashing
+# ────────────────────────────────────────────────
+def dhash(path) -> str:
+    """64-bit difference hash of an image as 16 hex chars; "" if unreadable."""
+    try:
+        with Image.open(path) as im:
+            small = im.convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+    except (OSError, UnidentifiedImageError):
+        return ""
+    px   = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+
+def folder_files(folder) -> list:
+    """(path, stat) of every file under `folder` that counts as content, sorted."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(".url"):
+                continue
+            path = os.path.join(dirpath, name)
+            files.append((path, os.stat(path)))
+    return files
+
+
+def hash_fingerprint(folder, files) -> str:
+    parts = [f"v{HASH_VERSION}"]
+    parts.extend(f"{os.path.relpath(p, folder)}:{st.st_size}:{st.st_mtime_ns}" for p, st in files)
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def file_digest(path, size: int) -> str:
+    """sha1 of the whole file, or of its size and head / middle / tail when over `SAMPLE_FROM`."""
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        if size <= SAMPLE_FROM:
+            for chunk in iter(lambda: fh.read(CHUNK_SIZE), b""):
+                h.update(chunk)
+        else:
+            h.update(str(size).encode("ascii"))
+            for offset in (0, (size - CHUNK_SIZE) // 2, size - CHUNK_SIZE):
+                fh.seek(offset)
+                h.update(fh.read(CHUNK_SIZE))
+    return h.hexdigest()
+
+
+def content_hash(files) -> str:
+    digests = [file_digest(path, st.st_size) for path, st in files]
+    return hashlib.sha1("".join(sorted(digests)).encode("ascii")).hexdigest() if digests else ""
+
+
+def refresh_hashes(entries, *, workers: int | None = None, force: bool = False) -> dict:
+    """
+    Brings the hashes of `entries` up to date; unchanged folders (same
+    `hash_fingerprint`) are only stat-ed. Hashing runs on a thread pool and
+    rows are written with one bulk_update.
+    Returns counters: {"fresh", "hashed", "errors"}.
+    """
+    from .models import FolderEntry                 # dedupe is imported by apps.py
+
+    workers    = workers or getattr(settings, "LIBRARY_SYNC_WORKERS", 8)
+    batch_size = getattr(settings, "LIBRARY_SYNC_BATCH_SIZE", 500)
+    media_root = Path(settings.MEDIA_ROOT)
+    counts     = {"fresh": 0, "hashed": 0, "errors": 0}
+
+    def work(entry):
+        try:
+            files = folder_files(entry.path)
+            fp    = hash_fingerprint(entry.path, files)
+            if not force and entry.hash_fingerprint == fp:
+                return entry, False
+            entry.content_hash     = content_hash(files)
+            entry.disk_bytes       = sum(st.st_size for _, st in files)
+            entry.phash            = dhash(media_root / entry.jpeg_path) if entry.jpeg_path else ""
+            entry.hash_fingerprint = fp
+            return entry, True
+        except OSError as exc:
+            print(f"  ! hashing failed: {entry.name} ({exc})")
+            return entry, exc
+
+    to_update = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="library-hash") as pool:
+        for entry, result in pool.map(work, entries):
+            if isinstance(result, Exception):
+                counts["errors"] += 1
+            elif result:
+                counts["hashed"] += 1
+                to_update.append(entry)
+            else:
+                counts["fresh"] += 1
+
+    with transaction.atomic():
+        FolderEntry.objects.bulk_update(to_update, HASH_FIELDS, batch_size=batch_size)
+        if to_update:
+            facets.bump_version()                               # cached clusters are stale
+    stats.refresh_entries([e.id for e in to_update])                 # disk_bytes feeds the totals
+    return counts
+
+
+# ────────────────────────────────────────────────
+# Near-duplicate index
+# ────────────────────────────────────────────────
+class BKTree:
+    """
+    Burkhard–Keller tree over 64-bit ints with Hamming distance. A lookup
+    within radius r only descends into children whose edge distance d
+    satisfies |d - dist(query, node)| ≤ r (triangle inequality).
+    """
+
+    def __init__(self):
+        self.root = None                                       # [value, items, {dist: node}]
+
+    def add(self, value: int, item) -> None:
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            d = (value ^ node[0]).bit_count()
+            if d == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int):
+        """Yields (distance, item) for every stored item within `radius`."""
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            d    = (value ^ node[0]).bit_count()
+            if d <= radius:
+                for item in node[1]:
+                    yield d, item
+            for edge, child in node[2].items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+
+
+@dataclass
+class Cluster:
+    """ Entries that look like copies of each other; `members[0]` is the one kept. """
+    members:     list = field(default_factory=list)  # dicts: id, name, path, disk_bytes, jpeg_path, distance
+    exact:       bool = False                        # all members share one content hash
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(m["disk_bytes"] for m in self.members)
+
+    @property
+    def reclaimable_bytes(self) -> int:
+        """Bytes freed by deleting the extra copies — only byte-identical ones count."""
+        return self.total_bytes - self.members[0]["disk_bytes"] if self.exact else 0
+
+
+def find_clusters(distance: int | None = None) -> list:
+    """Exact clusters, largest reclaimable first, then similar ones (cached per library version)."""
+    distance = max_distance() if distance is None else distance
+    key      = facets.cache_key("duplicates", distance)
+    clusters = cache.get(key)
+    if clusters is None:
+        clusters = _build_clusters(distance)
+        cache.set(key, clusters, getattr(settings, "LIBRARY_FACET_CACHE_SECONDS", 300))
+    return clusters
+
+
+def _keep_order(row) -> tuple:
+    return -row["disk_bytes"], row["id"]                       # keep the largest copy
+
+
+def _build_clusters(distance: int) -> list:
+    from .models import FolderEntry
+
+    rows = FolderEntry.objects.exclude(hash_fingerprint="").values(
+        "id", "name", "path", "jpeg_path", "disk_bytes", "phash", "content_hash")
+
+    # Exact copies; one representative per content goes on to the similarity pass
+    by_content, singles = {}, []
+    for r in rows:
+        if r["content_hash"]:
+            by_content.setdefault(r["content_hash"], []).append(r)
+        else:
+            singles.append(r)
+    clusters = []
+    for members in by_content.values():
+        members.sort(key=_keep_order)
+        if len(members) > 1:
+            clusters.append(_cluster(members, exact=True))
+    reps = {r["id"]: r for r in [m[0] for m in by_content.values()] + singles if r["phash"]}
+
+    # Similar: greedy complete linkage — a candidate joins only if it is
+    # within `distance` of every member already in the cluster
+    tree = BKTree()
+    for r in reps.values():
+        tree.add(int(r["phash"], 16), r["id"])
+    taken   = set()
+    similar = []
+    for seed in sorted(reps.values(), key=_keep_order):
+        if seed["id"] in taken:
+            continue
+        members = [seed]
+        hashes  = [int(seed["phash"], 16)]
+        near    = [reps[i] for _, i in tree.search(hashes[0], distance) if i != seed["id"] and i not in taken]
+        for r in sorted(near, key=_keep_order):
+            h = int(r["phash"], 16)
+            if all((h ^ other).bit_count() <= distance for other in hashes):
+                members.append(r)
+                hashes.append(h)
+        if len(members) > 1:
+            taken.update(m["id"] for m in members)
+            similar.append(_cluster(members, exact=False))
+
+    clusters.sort(key=lambda c: (-c.reclaimable_bytes, c.members[0]["name"]))
+    similar.sort(key=lambda c: (-c.total_bytes, c.members[0]["name"]))
+    return clusters + similar
+
+
+def _cluster(members: list, *, exact: bool) -> Cluster:
+    members = [dict(m) for m in members]      # a representative may sit in an exact and a similar cluster
+    keeper  = members[0]
+    for m in members:
+        m["distance"] = (int(m["phash"], 16) ^ int(keeper["phash"], 16)).bit_count() \
+            if m["phash"] and keeper["phash"] else None
+    return Cluster(members=members, exact=exact)
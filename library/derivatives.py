@@ -0,0 +1,115 @@
+"""
+Resized WebP / JPEG variants of card thumbnails and texture previews.
+
+Originals are often full-resolution JPEGs or 4K PNGs; the grid and the
+texture hover only need a few hundred pixels. Variants are bucketed to
+`LIBRARY_DERIVATIVE_SIZES` and cached under MEDIA_ROOT/derivatives/, named
+after a sha1 of the source path + size + mtime — a changed source gets a
+new key, so the cache never serves a stale image.
+
+`get_derivative` builds a variant lazily on first request;
+`build_derivatives` pre-renders a batch on a process pool (resizing is
+CPU-bound) and is called by the folder sync for fresh thumbnails.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+# Output format → (file suffix, Pillow format, MIME type)
+FORMATS = {
+    "webp": (".webp", "WEBP", "image/webp"),
+    "jpeg": (".jpg",  "JPEG", "image/jpeg"),
+}
+
+# Source files we know how to resize.
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tga", ".tif", ".tiff"}
+
+
+def size_buckets() -> tuple:
+    return tuple(sorted(getattr(settings, "LIBRARY_DERIVATIVE_SIZES", (256, 512, 1024))))
+
+
+def bucket(size) -> int:
+    """Smallest configured size ≥ `size` (largest one if it's bigger than all)."""
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        return size_buckets()[0]
+    return next((s for s in size_buckets() if s >= size), size_buckets()[-1])
+
+
+def negotiate_format(request) -> str:
+    """WebP when the browser advertises it, JPEG otherwise."""
+    return "webp" if "image/webp" in request.headers.get("Accept", "") else "jpeg"
+
+
+# ────────────────────────────────────────────────
+# Cache paths
+# ────────────────────────────────────────────────
+def derivative_path(src: Path, size: int, fmt: str) -> Path | None:
+    """Where the `size`/`fmt` variant of `src` lives; None if `src` is unreadable."""
+    try:
+        st = os.stat(src)
+    except OSError:
+        return None
+    key = hashlib.sha1(f"{src}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8")).hexdigest()
+    return Path(settings.MEDIA_ROOT) / "derivatives" / key[:2] / f"{key}-{size}{FORMATS[fmt][0]}"
+
+
+def get_derivative(src: Path, size, fmt: str = "webp") -> Path | None:
+    """Path of the cached variant, rendering it now if needed; None on failure."""
+    size = bucket(size)
+    dest = derivative_path(src, size, fmt)
+    if dest is None:
+        return None
+    if dest.exists() or render(src, dest, size, fmt):
+        return dest
+    return None
+
+
+# ────────────────────────────────────────────────
+# Rendering
+# ────────────────────────────────────────────────
+def render(src: Path, dest: Path, size: int, fmt: str) -> bool:
+    """Resizes `src` to fit `size`×`size` into `dest` (atomic write). Top-level so it pickles."""
+    _, pil_format, _ = FORMATS[fmt]
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with Image.open(src) as im:
+            im.draft("RGB", (size, size))                    # JPEG: decode at reduced scale
+            im = ImageOps.exif_transpose(im)
+            im.thumbnail((size, size), Image.Resampling.LANCZOS)
+            keep_alpha = fmt == "webp" and im.mode in ("RGBA", "LA", "PA", "P")
+            im = im.convert("RGBA" if keep_alpha else "RGB")
+            im.save(tmp, pil_format, quality=82, method=4 if fmt == "webp" else 0)
+        os.replace(tmp, dest)
+        return True
+    except Exception as exc:
+        print(f"  ! derivative failed: {src} @ {size} ({exc})")
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def build_derivatives(sources, *, sizes=None, fmt: str = "webp", workers: int | None = None) -> int:
+    """Pre-renders missing variants of `sources` on a process pool; returns how many were built."""
+    jobs = []
+    for src in sources:
+        for size in sizes or size_buckets():
+            dest = derivative_path(Path(src), size, fmt)
+            if dest is not None and not dest.exists():
+                jobs.append((Path(src), dest, size, fmt))
+    if not jobs:
+        return 0
+
+    workers = workers or getattr(settings, "LIBRARY_DERIVATIVE_WORKERS", None) or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return sum(pool.map(render, *zip(*jobs), chunksize=8))
@@ -0,0 +1,61 @@
+"""
+ZIP export of whole asset folders.
+
+Each `FolderEntry` becomes a top-level folder in the archive holding every
+file under `entry.path`. Files are walked with the same containment rule
+as the file endpoints (`fileserving.safe_join`), so a symlink pointing out
+of the asset folder is skipped rather than exported.
+
+Text formats are deflated; everything else (PNG / JPEG / KTX2 textures,
+.bin buffers, .glb) is stored, since re-compressing it costs CPU for
+little gain. `compress=False` stores everything, which also lets the
+response carry an exact Content-Length.
+"""
+import os
+
+from django.http import StreamingHttpResponse
+from django.utils.text import slugify
+
+from .fileserving import safe_join
+from .zipstream import Member, archive_size, prepare, stream_zip
+
+DEFLATE_SUFFIXES = {".gltf", ".json", ".url", ".txt", ".obj", ".mtl", ".xml"}
+
+
+def _arc_folder(entry, taken: set) -> str:
+    name = (entry.name or f"entry-{entry.id}").replace("/", "_").replace("\\", "_")
+    if name in taken:
+        name = f"{name} ({entry.id})"
+    taken.add(name)
+    return name
+
+
+def entry_members(entries, *, compress: bool = True) -> list:
+    """Archive members for every file of every entry, sorted by path."""
+    members, taken = [], set()
+    for entry in entries:
+        if not entry.path or not os.path.isdir(entry.path):
+            continue
+        folder = _arc_folder(entry, taken)
+        for dirpath, dirnames, filenames in os.walk(entry.path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                rel  = os.path.relpath(os.path.join(dirpath, filename), entry.path)
+                path = safe_join(entry.path, rel)
+                if path is None or not os.path.isfile(path):
+                    continue
+                deflate = compress and os.path.splitext(filename)[1].lower() in DEFLATE_SUFFIXES
+                members.append(Member(f"{folder}/{rel.replace(os.sep, '/')}", path, deflate))
+    return prepare(members)
+
+
+def export_response(entries, *, compress: bool = True, filename: str = "library-export"):
+    """StreamingHttpResponse with the ZIP of `entries`."""
+    members  = entry_members(entries, compress=compress)
+    response = StreamingHttpResponse(stream_zip(members), content_type="application/zip")
+    size     = archive_size(members)
+    if size is not None:
+        response["Content-Length"] = str(size)
+    response["Content-Disposition"] = f'attachment; filename="{slugify(filename) or "export"}.zip"'
+    response["Cache-Control"] = "no-store"
+    return response
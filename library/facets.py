@@ -0,0 +1,140 @@
+"""
+Cached sidebar facets (types, categories, tags) and per-filter counts.
+
+Everything is stored in Django's cache under keys that embed a
+library-wide *version* number. Any write that can change a facet or a
+count — the folder sync, bulk edits, admin / UI saves via signals — calls
+`bump_version()`, which orphans every old key at once instead of
+tracking them individually.
+
+The version lives in the cache itself, so reading it costs no query. A
+bump is deferred to the commit of the surrounding transaction (readers
+never cache old rows under a new version) and happens once however many
+rows that transaction wrote. A lost counter restarts from the clock, so
+it never goes back to a number whose keys may still be cached. With
+several processes writing (the watcher, `sync_roots`), give them a shared
+cache backend.
+
+Analysis writes only move a second counter: they change no facet, but the
+API ETags (library/api.py) embed both.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+VERSION_KEY  = "library:version"               # facets, counts, duplicate clusters, API ETags
+ANALYSIS_KEY = "library:analysis-version"      # API ETags only
+
+
+def _ttl() -> int:
+    return getattr(settings, "LIBRARY_FACET_CACHE_SECONDS", 300)
+
+
+# ────────────────────────────────────────────────
+# Version counters
+# ────────────────────────────────────────────────
+def _current(key: str) -> int:
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+        value = cache.get(key, 0)
+    return value
+
+
+def _increment(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:                                  # evicted → restart from the clock
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+
+
+# One callable per counter, so a transaction's pending bump can be recognised
+_BUMPS = {key: (lambda key=key: _increment(key)) for key in (VERSION_KEY, ANALYSIS_KEY)}
+
+
+def _bump_on_commit(key: str) -> None:
+    bump = _BUMPS[key]
+    conn = transaction.get_connection()
+    if conn.in_atomic_block:
+        level = set(conn.savepoint_ids)
+        if any(func is bump and sids == level for sids, func, _ in conn.run_on_commit):
+            return                                      # already bumps when this block commits
+    transaction.on_commit(bump)
+
+
+def library_version() -> int:
+    return _current(VERSION_KEY)
+
+
+def analysis_version() -> int:
+    return _current(ANALYSIS_KEY)
+
+
+def bump_version() -> None:
+    """Invalidates every cached facet list / count and API ETag once the current transaction commits."""
+    _bump_on_commit(VERSION_KEY)
+
+
+def bump_analysis_version() -> None:
+    """Invalidates the API ETags (not the facets) once the current transaction commits."""
+    _bump_on_commit(ANALYSIS_KEY)
+
+
+def cache_key(*parts) -> str:
+    digest = hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+    return f"library:v{library_version()}:{digest}"
+
+
+# ────────────────────────────────────────────────
+# Facet lists
+# ────────────────────────────────────────────────
+def facet_lists() -> dict:
+    """{"types", "categories", "tags"} as lists of plain dicts (id, slug, name)."""
+    from .models import ModelCategory, ModelType, Tag
+
+    key  = cache_key("facets")
+    data = cache.get(key)
+    if data is None:
+        data = {
+            "types":      list(ModelType.objects.values("id", "slug", "name")),
+            "categories": list(ModelCategory.objects.values("id", "slug", "name")),
+            "tags":       list(Tag.objects.values("id", "slug", "name")),
+        }
+        cache.set(key, data, _ttl())
+    return data
+
+
+def facet_counts(qs, filter_key: str) -> dict:
+    """
+    Entry counts per type / category / tag id within `qs` (the current
+    filter result). `filter_key` identifies the filter for caching.
+    """
+    from .models import FolderEntry
+
+    key    = cache_key("counts", filter_key)
+    counts = cache.get(key)
+    if counts is None:
+        ids  = qs.order_by().values("id")
+        base = FolderEntry.objects.filter(id__in=ids).order_by()
+        counts = {
+            "types":      dict(base.values_list("type_id").annotate(n=Count("id"))),
+            "categories": dict(base.values_list("category_id").annotate(n=Count("id"))),
+            "tags":       dict(FolderEntry.tags.through.objects.filter(folderentry_id__in=ids)
+                               .values_list("tag_id").annotate(n=Count("folderentry_id")).order_by()),
+        }
+        cache.set(key, counts, _ttl())
+    return counts
+
+
+def facets_with_counts(qs, filter_key: str) -> dict:
+    """`facet_lists()` with a `count` added to every item."""
+    lists  = facet_lists()
+    counts = facet_counts(qs, filter_key)
+    return {
+        group: [{**item, "count": counts[group].get(item["id"], 0)} for item in items]
+        for group, items in lists.items()
+    }
@@ -0,0 +1,208 @@
+"""
+Cache-friendly file responses for the asset endpoints.
+
+`serve_file` replaces a bare `FileResponse`: it derives an ETag and
+Last-Modified from the file's stat (no content hashing), answers
+If-None-Match / If-Modified-Since with 304, honours a single
+`Range: bytes=…` request with 206 (If-Range aware), and picks the MIME
+type from the extension so `<model-viewer>` and the browser cache treat
+.gltf / .bin / textures properly. `aserve_file` is the same for the async
+(ASGI) views, streaming the body from the `library.aio` thread pool.
+.gltf / .json / .url files are sent as their cached gzip variant
+(`library.precompress`) when Accept-Encoding allows, with a separate ETag
+and `Vary: Accept-Encoding`.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf       import settings
+from django.http       import HttpResponse, StreamingHttpResponse, FileResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+from . import aio, precompress
+
+# glTF-family types the stdlib registry doesn't know about
+mimetypes.add_type("model/gltf+json",   ".gltf")
+mimetypes.add_type("model/gltf-binary", ".glb")
+mimetypes.add_type("image/ktx2",        ".ktx2")
+mimetypes.add_type("image/webp",        ".webp")
+mimetypes.add_type("text/plain",        ".url")
+
+RANGE_RE   = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 256 * 1024
+
+
+def content_type_for(path) -> str:
+    ctype, _ = mimetypes.guess_type(str(path))
+    return ctype or "application/octet-stream"
+
+
+def etag_for(st) -> str:
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def safe_join(root, rel) -> str | None:
+    """
+    `rel` resolved inside the folder `root`, or None when it escapes it
+    (`..`, absolute paths, symlinks pointing elsewhere).
+    """
+    path = os.path.normpath(os.path.join(root, rel))
+    return path if is_within(root, path) else None
+
+
+def is_within(root, path) -> bool:
+    root, real = os.path.realpath(root), os.path.realpath(path)
+    try:
+        return os.path.commonpath([root, real]) == root
+    except ValueError:                              # different drives on Windows
+        return False
+
+
+# ────────────────────────────────────────────────
+# Public entry point
+# ────────────────────────────────────────────────
+def serve_file(request, path, *, content_type: str | None = None):
+    """
+    Response for `path` with validators, conditional GET and Range support;
+    text assets go out as their gzip variant when the client accepts it.
+
+    `path` must already be validated by the caller (inside the entry
+    folder / media root); a missing file raises `FileNotFoundError`.
+    """
+    st      = os.stat(path)
+    variant = precompress.select(request, path, st)
+    response, byte_range = _negotiate(request, path, st, variant)
+    if response is not None:
+        return response
+
+    content_type = content_type or content_type_for(path)
+    if variant is not None:
+        response = FileResponse(open(variant.path, "rb"), content_type=content_type)
+    elif byte_range is None:
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(path, start, end),
+                                         status=206, content_type=content_type)
+    return _body_headers(response, path, st, byte_range, variant)
+
+
+async def aserve_file(request, path, *, content_type: str | None = None):
+    """
+    `serve_file` for async views: the body is an async iterator read chunk
+    by chunk on the `aio` thread pool, so ASGI streams it instead of
+    buffering the whole file.
+    """
+    st      = await aio.run_io(os.stat, path)
+    variant = await aio.run_io(precompress.select, request, path, st)
+    response, byte_range = _negotiate(request, path, st, variant)
+    if response is not None:
+        return response
+
+    if variant is not None:
+        body = aio.read_chunks(variant.path, 0, variant.size - 1, CHUNK_SIZE)
+    else:
+        start, end = byte_range or (0, st.st_size - 1)
+        body = aio.read_chunks(path, start, end, CHUNK_SIZE)
+    response = StreamingHttpResponse(body, status=206 if byte_range else 200,
+                                     content_type=content_type or content_type_for(path))
+    return _body_headers(response, path, st, byte_range, variant)
+
+
+# ────────────────────────────────────────────────
+# Helpers
+# ────────────────────────────────────────────────
+def _negotiate(request, path, st, variant):
+    """(finished response, None) for 304 / 412 / 416, else (None, byte range or None)."""
+    etag, last_modified = _validators(st, variant)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:                    # 304 / 412
+        return _finish(not_modified, path, etag, last_modified), None
+
+    byte_range = _requested_range(request, st.st_size, etag, last_modified)
+    if byte_range == "unsatisfiable":
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{st.st_size}"
+        return _finish(response, path, etag, last_modified), None
+    return None, byte_range
+
+
+def _body_headers(response, path, st, byte_range, variant):
+    if byte_range is not None:
+        start, end = byte_range
+        response["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+    else:
+        start, end = 0, (variant.size if variant else st.st_size) - 1
+    if variant is not None:
+        response["Content-Encoding"] = "gzip"
+    response["Content-Length"]      = str(end - start + 1)
+    response["Accept-Ranges"]       = "bytes"
+    response["Content-Disposition"] = content_disposition_header(False, os.path.basename(path))
+    return _finish(response, path, *_validators(st, variant))
+
+
+def _validators(st, variant):
+    """ETag / Last-Modified of the source; the gzip representation gets its own ETag."""
+    etag = etag_for(st)
+    if variant is not None:
+        etag = f'{etag[:-1]}-gz"'
+    return etag, int(st.st_mtime)
+
+
+def _finish(response, path, etag, last_modified):
+    if precompress.is_compressible(path):
+        patch_vary_headers(response, ["Accept-Encoding"])
+    return _with_validators(response, etag, last_modified)
+
+
+def _with_validators(response, etag, last_modified):
+    response["ETag"]          = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = getattr(settings, "LIBRARY_FILE_CACHE_CONTROL", "private, max-age=3600")
+    return response
+
+
+def _requested_range(request, size, etag, last_modified):
+    """(start, end) inclusive, None for the whole file, or "unsatisfiable"."""
+    header = request.headers.get("Range", "")
+    match  = RANGE_RE.match(header.strip())
+    if not match or request.method not in ("GET", "HEAD"):
+        return None                                 # absent / multi-range → full body
+
+    # If-Range: only honour the range if the client's copy is still current
+    if_range = request.headers.get("If-Range")
+    if if_range:
+        if if_range.startswith(("\"", "W/")):
+            if if_range != etag:
+                return None
+        elif parse_http_date_safe(if_range) != last_modified:
+            return None
+
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":                                 # suffix: last N bytes
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end   = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, end
+
+
+def _read_range(path, start, end):
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = fh.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,205 @@
+"""
+glTF 2.0 / GLB inspection for the detail-page stats.
+
+Only the JSON document is ever read: for `.glb` containers that's the
+first chunk (located from the 12-byte header + 8-byte chunk header), and
+the binary chunk / external `.bin` buffers are only stat-ed for their
+size. Inline `data:` URIs (base64 buffers and images) are cut out while
+the document streams in, so they never reach memory or the parser. Geometry counts come from the accessors the primitives actually
+reference — vertices from POSITION, triangles from indices (or POSITION
+when non-indexed) according to each primitive's draw mode.
+"""
+import json
+import struct
+from pathlib import Path
+from urllib.parse import unquote
+
+from .fileserving import safe_join
+
+GLB_MAGIC      = b"glTF"
+GLB_CHUNK_JSON = 0x4E4F534A
+GLB_CHUNK_BIN  = 0x004E4942
+
+READ_CHUNK    = 1024 * 1024
+MAX_DOC_BYTES = 64 * 1024 * 1024            # JSON left once the data: URIs are cut out
+DATA_URI      = b'"data:'
+
+# Primitive draw modes (glTF 2.0 §3.7.2.1)
+MODE_TRIANGLES, MODE_TRIANGLE_STRIP, MODE_TRIANGLE_FAN = 4, 5, 6
+
+
+class GltfError(ValueError):
+    """ The file isn't a readable glTF / GLB document. """
+
+
+# ────────────────────────────────────────────────
+# Public entry point
+# ────────────────────────────────────────────────
+def inspect_gltf(path: Path) -> dict:
+    """
+    Statistics for one .gltf / .glb file.
+
+    Raises `GltfError` for malformed containers or documents and `OSError`
+    when the file can't be read.
+    """
+    path = Path(path)
+    doc, bin_size = read_document(path)
+    if not isinstance(doc, dict):
+        raise GltfError("glTF document is not a JSON object")
+
+    try:
+        return _statistics(doc, path, bin_size)
+    except (AttributeError, TypeError, KeyError, IndexError) as exc:
+        # valid JSON, wrong shape (a mesh that is a list, a string count, …)
+        raise GltfError(f"malformed glTF structure: {type(exc).__name__}: {exc}") from exc
+
+
+def _statistics(doc: dict, path: Path, bin_size: int | None) -> dict:
+    accessors   = doc.get("accessors", [])
+    meshes      = doc.get("meshes", [])
+    buffers     = doc.get("buffers", [])
+    views       = doc.get("bufferViews", [])
+
+    vertices = triangles = primitives = 0
+    for mesh in meshes:
+        for prim in mesh.get("primitives", []):
+            primitives += 1
+            n_vertices  = _count(accessors, prim.get("attributes", {}).get("POSITION"))
+            vertices   += n_vertices
+            n_indices   = _count(accessors, prim["indices"]) if "indices" in prim else n_vertices
+            triangles  += triangle_count(prim.get("mode", MODE_TRIANGLES), n_indices)
+
+    return {
+        "file_size":         path.stat().st_size,
+        "container":         "glb" if bin_size is not None else "gltf",
+        "mesh_count":        len(meshes),
+        "primitive_count":   primitives,
+        "vertex_count":      vertices,
+        "triangle_count":    triangles,
+        "material_count":    len(doc.get("materials", [])),
+        "node_count":        len(doc.get("nodes", [])),
+        "image_count":       len(doc.get("images", [])),
+        "buffer_view_bytes": sum(v.get("byteLength", 0) for v in views),
+        "buffer_bytes":      sum(b.get("byteLength", 0) for b in buffers),
+        "glb_bin_bytes":     bin_size,
+        "external":          external_refs(doc, path.parent),
+    }
+
+
+def triangle_count(mode: int, n: int) -> int:
+    """Triangles drawn by `n` vertices/indices in draw `mode` (0 for points/lines)."""
+    if mode == MODE_TRIANGLES:
+        return n // 3
+    if mode in (MODE_TRIANGLE_STRIP, MODE_TRIANGLE_FAN):
+        return max(n - 2, 0)
+    return 0
+
+
+# ────────────────────────────────────────────────
+# Reading
+# ────────────────────────────────────────────────
+def read_document(path: Path) -> tuple[dict, int | None]:
+    """The parsed JSON document, plus the GLB binary-chunk size (None for .gltf)."""
+    with open(path, "rb") as fh:
+        magic = fh.read(4)
+        if magic != GLB_MAGIC:
+            fh.seek(0)
+            try:
+                return json.loads(read_json(fh)), None
+            except ValueError as exc:
+                raise GltfError(f"invalid glTF JSON: {exc}") from exc
+
+        try:
+            version, total = struct.unpack("<II", fh.read(8))
+            json_len, json_type = struct.unpack("<II", fh.read(8))
+        except struct.error as exc:
+            raise GltfError("truncated GLB header") from exc
+        if version != 2 or json_type != GLB_CHUNK_JSON:
+            raise GltfError(f"unsupported GLB (version {version}, first chunk {json_type:#x})")
+        try:
+            doc = json.loads(read_json(fh, json_len))
+        except ValueError as exc:
+            raise GltfError(f"invalid GLB JSON chunk: {exc}") from exc
+
+        # Optional BIN chunk follows — read its 8-byte header, never its body
+        bin_size = 0
+        if 20 + json_len + 8 <= total:
+            fh.seek(20 + json_len)
+            chunk = fh.read(8)
+            if len(chunk) == 8:
+                length, kind = struct.unpack("<II", chunk)
+                if kind == GLB_CHUNK_BIN:
+                    bin_size = length
+        return doc, bin_size
+
+
+def read_json(fh, length: int | None = None) -> bytes:
+    """
+    The JSON text from `fh` (up to `length` bytes) with every "data:…"
+    string shortened to "data:", read in chunks so an embedded payload is
+    only ever held one chunk at a time. Raises `GltfError` past
+    `MAX_DOC_BYTES` of remaining JSON.
+    """
+    out, buf, skipping = bytearray(), b"", False
+    remaining = length
+    while remaining is None or remaining > 0:
+        data = fh.read(READ_CHUNK if remaining is None else min(READ_CHUNK, remaining))
+        if not data:
+            break
+        if remaining is not None:
+            remaining -= len(data)
+        buf += data
+        pos = 0
+        while True:
+            if skipping:                             # base64 has no quotes or backslashes
+                end = buf.find(b'"', pos)
+                if end < 0:
+                    pos = len(buf)
+                    break
+                out += b'data:"'
+                pos, skipping = end + 1, False
+                continue
+            start = buf.find(DATA_URI, pos)
+            if start < 0:
+                keep = max(pos, len(buf) - len(DATA_URI) + 1)   # a marker may straddle chunks
+                out += buf[pos:keep]
+                pos = keep
+                break
+            out += buf[pos:start + 1]
+            if start and buf[start - 1:start] == b"\\":        # an escaped quote inside a string
+                pos = start + 1
+            else:
+                pos, skipping = start + len(DATA_URI), True
+        buf = buf[pos:]
+        if len(out) > MAX_DOC_BYTES:
+            raise GltfError(f"glTF JSON over {MAX_DOC_BYTES // 1048576} MB")
+    return bytes(out + buf)
+
+
+def external_refs(doc: dict, base: Path) -> list[dict]:
+    """
+    Buffers and images referenced by relative URI, with their on-disk size.
+    URIs resolving outside the asset folder are listed but never stat-ed.
+    """
+    refs = []
+    for kind, items in (("buffer", doc.get("buffers", [])), ("image", doc.get("images", []))):
+        for item in items:
+            uri = item.get("uri")
+            if not uri or uri.startswith("data:"):
+                continue
+            path = safe_join(base, unquote(uri))
+            size = None
+            if path is not None:
+                try:
+                    size = Path(path).stat().st_size
+                except OSError:
+                    pass
+            refs.append({"kind": kind, "uri": uri, "exists": size is not None, "size": size,
+                         "outside": path is None})
+    return refs
+
+
+def _count(accessors: list, index) -> int:
+    if not isinstance(index, int) or not 0 <= index < len(accessors):
+        return 0
+    return accessors[index].get("count", 0)
@@ -0,0 +1,104 @@
+"""
+Header-only image metadata probe.
+
+Texture stats only need dimensions, bit depth and channel count, which PNG
+keeps in its IHDR chunk (first 33 bytes) and JPEG in its SOFn segment
+(usually within the first few KB — other segments are skipped with a
+seek, not read). Anything else — including a PNG / JPEG header these
+readers can't make sense of — falls back to Pillow, which also only
+parses the header until pixel data is requested.
+"""
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG colour type → channels (palette images expand to 1 index channel)
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# JPEG start-of-frame markers (C4 = DHT, C8 = JPG, CC = DAC are not frames)
+JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# Pillow mode → bits per channel, for the fallback path
+PIL_BIT_DEPTH = {"1": 1, "I;16": 16, "I;16B": 16, "I;16L": 16, "I": 32, "F": 32}
+
+
+@dataclass
+class ImageInfo:
+    """ What the probe learned from an image header. """
+    format:    str
+    width:     int
+    height:    int
+    bit_depth: int | None = None
+    channels:  int | None = None
+
+    @property
+    def dimensions(self) -> str:
+        return f"{self.width}×{self.height}"
+
+
+# ────────────────────────────────────────────────
+# Public entry point
+# ────────────────────────────────────────────────
+def probe_image(path: Path) -> ImageInfo | None:
+    """Reads just enough of `path` to describe it; None if it isn't an image."""
+    info = None
+    try:
+        with open(path, "rb") as fh:
+            head = fh.read(33)
+            if head.startswith(PNG_SIGNATURE):
+                info = _png(head)
+            elif head.startswith(b"\xff\xd8"):
+                fh.seek(2)
+                info = _jpeg(fh)
+    except OSError:
+        return None
+    except struct.error:                              # truncated segment → let Pillow judge
+        pass
+    return info or _pillow(path)
+
+
+# ────────────────────────────────────────────────
+# Format readers
+# ────────────────────────────────────────────────
+def _png(head: bytes) -> ImageInfo | None:
+    if len(head) < 33 or head[12:16] != b"IHDR":
+        return None
+    width, height, depth, colour = struct.unpack(">IIBB", head[16:26])
+    return ImageInfo("PNG", width, height, depth, PNG_CHANNELS.get(colour))
+
+
+def _jpeg(fh) -> ImageInfo | None:
+    while True:
+        byte = fh.read(1)
+        if not byte:
+            return None
+        if byte != b"\xff":
+            continue
+        marker = fh.read(1)
+        while marker == b"\xff":                      # fill bytes
+            marker = fh.read(1)
+        if not marker:
+            return None
+        code = marker[0]
+        if code == 0xD8 or 0xD0 <= code <= 0xD7 or code == 0x01:
+            continue                                  # stand-alone markers
+        if code == 0xD9:
+            return None                               # EOI before any frame
+        (length,) = struct.unpack(">H", fh.read(2))
+        if code in JPEG_SOF:
+            depth, height, width, channels = struct.unpack(">BHHB", fh.read(6))
+            return ImageInfo("JPEG", width, height, depth, channels)
+        fh.seek(length - 2, 1)                        # skip segment body
+
+
+def _pillow(path: Path) -> ImageInfo | None:
+    try:
+        with Image.open(path) as im:
+            return ImageInfo(im.format or "", im.width, im.height,
+                             PIL_BIT_DEPTH.get(im.mode, 8), len(im.getbands()))
+    except Exception:
+        return None
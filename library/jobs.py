@@ -0,0 +1,205 @@
+"""
+Background folder-sync jobs.
+
+`start_sync()` records a `SyncJob` and runs `LibraryConfig.sync_folders` on
+a daemon thread so the settings request returns immediately. Each root
+may have one active job at a time, and at most `LIBRARY_SYNC_PARALLEL_ROOTS`
+jobs run at once per process (the rest wait as "queued"). A job whose
+heartbeat went stale (process died mid-sync) is marked failed so it can't
+block new ones forever. A running job's row is touched from a side thread
+every `HEARTBEAT_INTERVAL`, independent of progress reports — hashing or
+the write burst can go minutes without one — and jobs whose worker thread
+lives in this process are never expired.
+
+`run_due_syncs()` starts a job for every root whose sync interval elapsed.
+"""
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.apps  import apps
+from django.conf  import settings
+from django.db    import DatabaseError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .       import roots
+from .apps   import SyncCancelled
+from .models import FolderEntry, LibraryRoot, ModelType, SyncJob
+
+# Minimum seconds between progress writes / cancel checks from the worker.
+PROGRESS_INTERVAL = 0.5
+
+# Seconds between heartbeats of a running job (at most a third of the stale timeout).
+HEARTBEAT_INTERVAL = 30.0
+
+_start_lock = threading.Lock()
+_run_slots  = threading.BoundedSemaphore(getattr(settings, "LIBRARY_SYNC_PARALLEL_ROOTS", 2))
+_live       = set()           # ids of jobs whose worker thread runs in this process
+
+
+# ────────────────────────────────────────────────
+# Public API
+# ────────────────────────────────────────────────
+def start_sync(root: LibraryRoot | None = None, *, root_dir: str | None = None) -> tuple[SyncJob, bool]:
+    """
+    Queues a sync of `root` (or of the root registered for `root_dir`;
+    default: the first configured root).
+
+    Returns `(job, created)`; when that root already has an active job it
+    is returned with `created=False`. Other roots are unaffected.
+    """
+    if root is None:
+        root = roots.root_for_dir(root_dir) if root_dir else roots.ensure_default_root()
+    if root is None:
+        raise LibraryRoot.DoesNotExist("No library root is configured.")
+
+    with _start_lock, transaction.atomic():
+        expire_stale_jobs()
+        active = SyncJob.objects.filter(root=root, status__in=SyncJob.ACTIVE).first()
+        if active is not None:
+            return active, False
+        job = SyncJob.objects.create(root=root, root_dir=root.path)
+
+    # Start the thread only once the job row is committed
+    threading.Thread(target=run_sync_job, args=(job.pk,),
+                     name=f"library-sync-{job.pk}", daemon=True).start()
+    return job, True
+
+
+def run_due_syncs() -> list:
+    """Starts a job for every enabled root whose interval elapsed; returns the new jobs."""
+    started = []
+    for root in roots.due_roots():
+        job, created = start_sync(root)
+        if created:
+            started.append(job)
+    return started
+
+
+def cancel_sync(job_id: int) -> bool:
+    """Flags an active job for cancellation; the worker stops at its next check."""
+    return bool(SyncJob.objects.filter(pk=job_id, status__in=SyncJob.ACTIVE)
+                               .update(cancel_requested=True))
+
+
+def expire_stale_jobs() -> int:
+    """Fails active jobs whose worker stopped heart-beating (never one still running here)."""
+    cutoff = timezone.now() - timedelta(seconds=_stale_after())
+    return (SyncJob.objects.filter(status__in=SyncJob.ACTIVE, updated_at__lt=cutoff)
+                           .exclude(pk__in=list(_live))
+                           .update(status=SyncJob.FAILED, message="Worker stopped responding.",
+                                   finished_at=timezone.now()))
+
+
+def _stale_after() -> float:
+    return getattr(settings, "LIBRARY_SYNC_STALE_AFTER", 300)
+
+
+# ────────────────────────────────────────────────
+# Worker
+# ────────────────────────────────────────────────
+def run_sync_job(job_id: int) -> None:
+    """Thread body: runs the sync and keeps the job row up to date."""
+    close_old_connections()
+    _live.add(job_id)
+    try:
+        if not _wait_for_slot(job_id):
+            _finish(job_id, SyncJob.CANCELLED, "Cancelled while queued.")
+            return
+        try:
+            with _heartbeat(job_id):
+                _run(job_id)
+        finally:
+            _run_slots.release()
+    finally:
+        _live.discard(job_id)
+        connection.close()
+
+
+@contextmanager
+def _heartbeat(job_id: int):
+    """Touches the job row every `HEARTBEAT_INTERVAL` while the block runs."""
+    stop     = threading.Event()
+    interval = min(HEARTBEAT_INTERVAL, _stale_after() / 3)
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                try:
+                    SyncJob.objects.filter(pk=job_id, status__in=SyncJob.ACTIVE).update(updated_at=timezone.now())
+                except DatabaseError:
+                    pass                             # the sync holds the write lock — next beat
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"library-heartbeat-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _wait_for_slot(job_id: int) -> bool:
+    """Blocks until a run slot is free, heart-beating the queued job; False if cancelled."""
+    while not _run_slots.acquire(timeout=PROGRESS_INTERVAL * 4):
+        SyncJob.objects.filter(pk=job_id).update(updated_at=timezone.now())
+        if SyncJob.objects.filter(pk=job_id, cancel_requested=True).exists():
+            return False
+    return True
+
+
+def _run(job_id: int) -> None:
+    job = SyncJob.objects.select_related("root").get(pk=job_id)
+    job.status, job.started_at = SyncJob.RUNNING, timezone.now()
+    job.save(update_fields=["status", "started_at", "updated_at"])
+
+    last_write = 0.0
+
+    def progress(phase, done, total, report):
+        nonlocal last_write
+        now = time.monotonic()
+        if now - last_write < PROGRESS_INTERVAL and done != total:
+            return
+        last_write = now
+        SyncJob.objects.filter(pk=job_id).update(
+            phase=phase, scanned=done, total=total,
+            changed=report.added + report.changed + report.removed,
+            errors=report.errors, updated_at=timezone.now())
+        if SyncJob.objects.filter(pk=job_id, cancel_requested=True).exists():
+            raise SyncCancelled()
+
+    if job.root is None:
+        _finish(job_id, SyncJob.FAILED, "The library root was removed.")
+        return
+
+    try:
+        gltf_type, _ = ModelType.objects.get_or_create(code="gltf", defaults={"name": "glTF"})
+        report = apps.get_app_config("library").sync_folders(
+            root      = job.root,
+            entry_cls = FolderEntry,
+            type_gltf = gltf_type,
+            progress  = progress,
+        )
+        if report is None:
+            _finish(job_id, SyncJob.FAILED, f"Root folder {job.root_dir} is missing.")
+        else:
+            SyncJob.objects.filter(pk=job_id).update(
+                scanned=report.scanned, total=report.scanned,
+                changed=report.added + report.changed + report.removed, errors=report.errors)
+            _finish(job_id, SyncJob.DONE, str(report))
+    except SyncCancelled:
+        _finish(job_id, SyncJob.CANCELLED, "Cancelled — no changes were written.")
+    except Exception as exc:
+        traceback.print_exc()
+        _finish(job_id, SyncJob.FAILED, f"{type(exc).__name__}: {exc}")
+
+
+def _finish(job_id: int, status: str, message: str) -> None:
+    SyncJob.objects.filter(pk=job_id).update(
+        status=status, message=message, phase="",
+        finished_at=timezone.now(), updated_at=timezone.now())
+    print(f"[Library] Sync job #{job_id} {status}: {message}")
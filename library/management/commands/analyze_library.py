@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from library          import dedupe
+from library.analysis import refresh_analyses
+from library.models   import FolderEntry
+
+
+class Command(BaseCommand):
+    help = "Precomputes the cached glTF/texture analysis for every entry whose files changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, help="Analysis threads (default LIBRARY_SYNC_WORKERS).")
+        parser.add_argument("--force", action="store_true", help="Re-analyse even entries whose cache is fresh.")
+        parser.add_argument("--chunk", type=int, default=2000, help="Entries loaded and written per round.")
+        parser.add_argument("--hashes", action="store_true",
+                            help="Also refresh the duplicate-detection hashes of changed folders.")
+
+    def handle(self, *args, **opts):
+        qs      = FolderEntry.objects.select_related("analysis").order_by("id")
+        total   = qs.count()
+        totals  = {"fresh": 0, "analyzed": 0, "errors": 0}
+        hashed  = {"fresh": 0, "hashed": 0, "errors": 0}
+        started = time.perf_counter()
+
+        last_id = 0
+        while True:
+            chunk = list(qs.filter(id__gt=last_id)[:opts["chunk"]])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+            for key, n in refresh_analyses(chunk, workers=opts["workers"], force=opts["force"]).items():
+                totals[key] += n
+            if opts["hashes"]:
+                for key, n in dedupe.refresh_hashes(chunk, workers=opts["workers"], force=opts["force"]).items():
+                    hashed[key] += n
+            done = sum(totals.values())
+            self.stdout.write(f"  {done}/{total} entries …")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Analysed {totals['analyzed']}, fresh {totals['fresh']}, errors {totals['errors']} "
+            f"in {time.perf_counter() - started:.2f}s"))
+        if opts["hashes"]:
+            self.stdout.write(f"Hashed {hashed['hashed']}, fresh {hashed['fresh']}, errors {hashed['errors']}")
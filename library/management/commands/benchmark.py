@@ -0,0 +1,109 @@
+import json
+import shutil
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+
+from library import benchmark
+from library.benchmark import TEXTURE_NAMES, TreeSpec
+
+
+def scale(value: str) -> int:
+    """'10k' → 10000, '1m' → 1000000, '2500' → 2500."""
+    value = value.strip().lower()
+    factor = {"k": 1000, "m": 1000000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * factor)
+
+
+class Command(BaseCommand):
+    help = ("Generates a synthetic asset library and times sync, index pages, detail and file serving "
+            "against it in a throwaway database. Prints / writes the results as JSON.")
+
+    def add_arguments(self, parser):
+        gen = parser.add_argument_group("synthetic library")
+        gen.add_argument("--folders", type=scale, default=1000, help="Asset folders, e.g. 1k, 10k, 100k.")
+        gen.add_argument("--textures", type=int, default=3, help=f"Textures per folder (max {len(TEXTURE_NAMES)}).")
+        gen.add_argument("--texture-px", type=int, default=512, help="Texture resolution (square).")
+        gen.add_argument("--gltf-kb", type=int, default=64, help="Size of each .gltf file in KiB.")
+        gen.add_argument("--url-ratio", type=float, default=0.5, help="Share of folders with a .url shortcut.")
+        gen.add_argument("--seed", type=int, default=1)
+        gen.add_argument("--workdir", help="Keep the generated tree here and reuse it on later runs "
+                                           "(default: a temporary folder, removed afterwards).")
+
+        run = parser.add_argument_group("run")
+        run.add_argument("--repeat", type=int, default=20, help="Timed repetitions per scenario.")
+        run.add_argument("--samples", type=int, default=20, help="Entries opened for the detail scenarios.")
+        run.add_argument("--depths", default="1,10,100,1000", help="AJAX page depths to time.")
+        run.add_argument("--workers", type=int, help="Sync workers (default LIBRARY_SYNC_WORKERS).")
+        run.add_argument("--output", help="Write the JSON here instead of stdout.")
+        run.add_argument("--compare", metavar="BASELINE", help="Earlier JSON result to compare medians with.")
+        run.add_argument("--threshold", type=float, default=1.2,
+                         help="With --compare: fail when a median grew by more than this factor.")
+        run.add_argument("--keep-db", action="store_true", help="Leave the benchmark database behind.")
+
+    def handle(self, *args, **opts):
+        if not 0 <= opts["textures"] <= len(TEXTURE_NAMES):
+            raise CommandError(f"--textures must be between 0 and {len(TEXTURE_NAMES)}.")
+        spec = TreeSpec(folders=opts["folders"], textures=opts["textures"], texture_px=opts["texture_px"],
+                        gltf_kb=opts["gltf_kb"], url_ratio=opts["url_ratio"], seed=opts["seed"])
+        depths  = [int(d) for d in opts["depths"].split(",") if d.strip()]
+        temp    = opts["workdir"] is None
+        workdir = Path(opts["workdir"] or tempfile.mkdtemp(prefix="library-bench-")).resolve()
+        log     = self.stderr.write
+
+        try:
+            tree = workdir / f"tree-{spec.key()}"
+            if not benchmark.generate_library(tree, spec, workers=opts["workers"] or 8, log=log):
+                log(f"Reusing the generated tree at {tree}")
+            media = workdir / "media"
+            shutil.rmtree(media, ignore_errors=True)
+
+            with override_settings(MEDIA_ROOT=str(media), DEBUG=False, LIBRARY_STARTUP="off",
+                                   ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                conn = connections["default"]
+                if conn.vendor == "sqlite":
+                    conn.settings_dict.setdefault("TEST", {})["NAME"] = str(workdir / "benchmark.sqlite3")
+                old_name = conn.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                try:
+                    results = benchmark.run_suite(tree, repeat=opts["repeat"], depths=depths,
+                                                  samples=opts["samples"], workers=opts["workers"], log=log)
+                finally:
+                    conn.creation.destroy_test_db(old_name, verbosity=0, keepdb=opts["keep_db"])
+        finally:
+            if temp:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        payload = {
+            "environment": benchmark.environment(),
+            "spec":        asdict(spec),
+            "settings":    {k: getattr(settings, k) for k in dir(settings)
+                            if k.startswith("LIBRARY_") and isinstance(getattr(settings, k), (int, float, str, bool))},
+            "results":     results,
+        }
+        text = json.dumps(payload, indent=2, default=str)
+        if opts["output"]:
+            Path(opts["output"]).write_text(text, encoding="utf-8")
+            log(f"Results written to {opts['output']}")
+        else:
+            self.stdout.write(text)
+
+        if opts["compare"]:
+            self.report_comparison(json.loads(Path(opts["compare"]).read_text(encoding="utf-8")),
+                                   payload, opts["threshold"])
+
+    def report_comparison(self, baseline, payload, threshold):
+        rows = benchmark.compare(baseline, payload, threshold=threshold)
+        base_commit = baseline.get("environment", {}).get("commit")
+        self.stderr.write(f"\nvs {base_commit or 'baseline'} (median ms):")
+        for name, before, after, ratio, regressed in rows:
+            mark = self.style.ERROR("slower") if regressed else ""
+            self.stderr.write(f"  {name:<34} {before:10.2f} → {after:10.2f}  ×{ratio:5.2f}  {mark}")
+        regressed = [name for name, *_, bad in rows if bad]
+        if regressed:
+            raise CommandError(f"{len(regressed)} scenario(s) regressed by more than ×{threshold}: "
+                               f"{', '.join(regressed)}")
@@ -0,0 +1,135 @@
+import re
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+
+from library.apps       import SYNC_LOAD_FIELDS
+from library.models     import FolderEntry, LibraryRoot, Tag
+from library.pagination import encode_cursor, keyset_page
+from library.queries    import filter_entries, sort_key
+
+# Plan lines meaning the entry table is read without an index, or sorted after the fact.
+FULL_SCAN = re.compile(r"\bSCAN library_folderentry\b(?! USING)")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY")
+
+# What each scenario must show: "seek" = index-ordered, no sort; "index" = no
+# unindexed table scan (the planner may filter via an index and sort the
+# matches); "any" = shown for timing only.
+EXPECT = {
+    "seek":  (FULL_SCAN, TEMP_SORT),
+    "index": (FULL_SCAN,),
+    "any":   (),
+}
+
+
+class Command(BaseCommand):
+    help = ("Runs the browse / sort / sync lookups against the current database, prints their "
+            "SQLite query plans and timings, and flags full scans or sorts that skip the indexes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query (median is shown).")
+        parser.add_argument("--analyze", action="store_true",
+                            help="Run ANALYZE first so the planner has table statistics.")
+        parser.add_argument("--check", action="store_true",
+                            help="Exit with an error when a query that should use an index doesn't.")
+
+    def handle(self, *args, **opts):
+        if connection.vendor != "sqlite":
+            raise CommandError("Query plans are only inspected on SQLite.")
+        if not FolderEntry.objects.exists():
+            raise CommandError("The library is empty — sync a root first.")
+        if opts["analyze"]:
+            with connection.cursor() as cur:
+                cur.execute("ANALYZE")
+
+        self.show_pragmas()
+        flagged = []
+        for label, run, expect in self.scenarios():
+            plans, median = self.measure(run, opts["repeat"])
+            bad = [l for p in plans for l in p if any(rx.search(l) for rx in EXPECT[expect])]
+            status = self.style.ERROR("NO INDEX") if bad else self.style.SUCCESS("ok")
+            self.stdout.write(f"\n{label}  —  {median * 1000:.2f} ms  [{status}]")
+            for plan in plans:
+                for line in plan:
+                    self.stdout.write(f"    {line}")
+            if bad:
+                flagged.append(label)
+
+        if flagged and opts["check"]:
+            raise CommandError(f"Not index-backed: {', '.join(flagged)}")
+        self.stdout.write(self.style.SUCCESS(f"\n{len(flagged) or 'No'} unindexed browse queries."))
+
+    # ────────────────────────────────────────────────
+    # Scenarios
+    # ────────────────────────────────────────────────
+    def scenarios(self):
+        """(label, callable running the real code path, EXPECT key)"""
+        base   = FolderEntry.objects.select_related("type", "category")
+        middle = FolderEntry.objects.order_by("name_lower", "id")[FolderEntry.objects.count() // 2]
+        dated  = FolderEntry.objects.exclude(obtained_on=None).order_by("-obtained_on", "-id").first()
+        root   = LibraryRoot.objects.order_by("id").first()
+        tag    = Tag.objects.annotate(n=Count("folderentry")).order_by("-n").first()
+        names  = list(FolderEntry.objects.filter(root=root).values_list("rel_path", flat=True)[:3])
+
+        def browse(query="", cursor=None):
+            params = QueryDict(query)
+            def run():
+                qs, ranked = filter_entries(base, params)
+                return keyset_page(qs, cursor, ranked=ranked, sort=sort_key(params))
+            return run
+
+        yield "browse: first page",          browse(), "seek"
+        yield "browse: deep page (keyset)",  browse(cursor=encode_cursor(["k", middle.name_lower, middle.id])), "seek"
+        yield "sort=newest: first page",     browse("sort=newest"), "seek"
+        if dated:
+            yield "sort=newest: deep page",  browse("sort=newest", encode_cursor(
+                ["k", dated.obtained_on.isoformat(), dated.id])), "seek"
+        if middle.type_id:
+            yield "type filter",             browse(f"type={middle.type.slug}"), "index"
+        if tag:
+            yield "tag filter",              browse(f"tag={tag.slug}"), "index"
+        # Substring match can't seek an index; shown for its timing only
+        yield "name substring (no FTS)",     lambda: list(base.filter(name_lower__contains=middle.name_lower[1:4])
+                                                          .order_by("name_lower", "id")[:20]), "any"
+        if root:
+            # Reads every row of the root — a plain table scan when one root holds the library
+            yield "sync snapshot (one root)", lambda: list(FolderEntry.objects.filter(root=root).order_by()
+                                                           .only(*SYNC_LOAD_FIELDS)), "any"
+            yield "watcher lookup (root, rel_path)", lambda: list(FolderEntry.objects.filter(
+                root=root, rel_path__in=names).order_by().values_list("rel_path", "fingerprint")), "seek"
+
+    # ────────────────────────────────────────────────
+    # Helpers
+    # ────────────────────────────────────────────────
+    def measure(self, run, repeat: int) -> tuple:
+        """Query plans of the SQL `run` issues, and its median wall time."""
+        with CaptureQueriesContext(connection) as ctx:
+            run()
+        plans = []
+        with connection.cursor() as cur:
+            for q in ctx.captured_queries:
+                cur.execute(f"EXPLAIN QUERY PLAN {q['sql']}")
+                plans.append([row[-1] for row in cur.fetchall()])
+
+        timings = []
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return plans, statistics.median(timings)
+
+    def show_pragmas(self):
+        with connection.cursor() as cur:
+            values = {}
+            for pragma in ("journal_mode", "synchronous", "cache_size", "temp_store"):
+                cur.execute(f"PRAGMA {pragma}")
+                values[pragma] = cur.fetchone()[0]
+            cur.execute("PRAGMA index_list(library_folderentry)")
+            indexes = sorted(row[1] for row in cur.fetchall())
+        self.stdout.write("SQLite: " + ", ".join(f"{k}={v}" for k, v in values.items()))
+        self.stdout.write(f"Entry indexes: {', '.join(indexes)}")
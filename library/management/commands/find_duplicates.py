@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from library import dedupe
+from library.models import FolderEntry
+
+
+class Command(BaseCommand):
+    help = "Lists duplicate / near-duplicate asset clusters and the space they waste."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--refresh", action="store_true",
+                            help="Hash entries whose folders changed before clustering.")
+        parser.add_argument("--force", action="store_true", help="With --refresh: re-hash every entry.")
+        parser.add_argument("--workers", type=int, help="Hashing threads (default LIBRARY_SYNC_WORKERS).")
+        parser.add_argument("--chunk", type=int, default=2000, help="Entries loaded and written per round.")
+        parser.add_argument("--distance", type=int,
+                            help="Max thumbnail hash distance in bits (default LIBRARY_DUPLICATE_DISTANCE).")
+        parser.add_argument("--limit", type=int, default=50, help="Clusters to print (0 = all).")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        if opts["refresh"] or opts["force"]:
+            qs     = FolderEntry.objects.order_by("id")
+            total  = qs.count()
+            totals = {"fresh": 0, "hashed": 0, "errors": 0}
+            last_id = 0
+            while True:
+                chunk = list(qs.filter(id__gt=last_id)[:opts["chunk"]])
+                if not chunk:
+                    break
+                last_id = chunk[-1].id
+                for key, n in dedupe.refresh_hashes(chunk, workers=opts["workers"], force=opts["force"]).items():
+                    totals[key] += n
+                self.stdout.write(f"  {sum(totals.values())}/{total} entries …")
+            self.stdout.write(f"Hashed {totals['hashed']}, fresh {totals['fresh']}, errors {totals['errors']}")
+
+        clusters = dedupe.find_clusters(opts["distance"])
+        shown    = clusters[:opts["limit"]] if opts["limit"] else clusters
+        for cluster in shown:
+            if cluster.exact:
+                self.stdout.write(f"\n[exact] {len(cluster.members)} copies, "
+                                  f"{filesizeformat(cluster.reclaimable_bytes)} reclaimable")
+            else:
+                self.stdout.write(f"\n[similar] {len(cluster.members)} look-alikes")
+            for i, m in enumerate(cluster.members):
+                mark = "keep" if i == 0 and cluster.exact else \
+                       f"d={m['distance']}" if m["distance"] is not None else "same"
+                self.stdout.write(f"  {mark:>6}  {filesizeformat(m['disk_bytes']):>10}  {m['path']}")
+        if len(shown) < len(clusters):
+            self.stdout.write(f"\n… {len(clusters) - len(shown)} more clusters")
+
+        reclaimable = sum(c.reclaimable_bytes for c in clusters)
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{len(clusters)} clusters, {filesizeformat(reclaimable)} reclaimable "
+            f"({time.perf_counter() - started:.2f}s)"))
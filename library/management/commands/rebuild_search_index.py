@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from library import search
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the SQLite FTS5 search index from the library tables."
+
+    def handle(self, *args, **opts):
+        if not search.available():
+            raise CommandError("Full-text search needs SQLite with the FTS5 extension.")
+        started = time.perf_counter()
+        n = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {n} entries in {time.perf_counter() - started:.2f}s"))
@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from library         import stats
+from library.models  import FolderEntry
+from library.scanner import folder_bytes
+
+
+class Command(BaseCommand):
+    help = "Recomputes the stats dashboard aggregates from the stored entries and analyses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", action="store_true",
+                            help="Re-measure every folder's size on disk first (a stat walk, no reads).")
+        parser.add_argument("--workers", type=int, help="Stat threads (default LIBRARY_SYNC_WORKERS).")
+        parser.add_argument("--chunk", type=int, default=2000, help="Entries loaded and written per round.")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        if opts["sizes"]:
+            self.stdout.write(f"Re-measured {self.measure(opts)} folder sizes")
+        n = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Aggregated {n} entries in {time.perf_counter() - started:.2f}s"))
+
+    def measure(self, opts) -> int:
+        workers = opts["workers"] or getattr(settings, "LIBRARY_SYNC_WORKERS", 8)
+        qs      = FolderEntry.objects.only("id", "path", "disk_bytes").order_by("id")
+        changed = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="library-stat") as pool:
+            while True:
+                chunk = list(qs.filter(id__gt=last_id)[:opts["chunk"]])
+                if not chunk:
+                    break
+                last_id = chunk[-1].id
+                to_update = []
+                for entry, size in zip(chunk, pool.map(lambda e: folder_bytes(e.path), chunk)):
+                    if entry.disk_bytes != size:
+                        entry.disk_bytes = size
+                        to_update.append(entry)
+                FolderEntry.objects.bulk_update(to_update, ["disk_bytes"])
+                changed += len(to_update)
+        return changed
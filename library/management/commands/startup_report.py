@@ -0,0 +1,107 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: times each boot step up to a servable app.
+PROBE = r"""
+import json, time
+marks = [("start", time.perf_counter())]
+def mark(label):
+    marks.append((label, time.perf_counter()))
+
+import django
+mark("import django")
+from django.conf import settings
+settings.INSTALLED_APPS
+mark("settings module")
+django.setup()
+mark("apps, models, ready()")
+from django.core.handlers.wsgi import WSGIHandler
+WSGIHandler()
+mark("WSGI handler + middleware")
+from django.urls import get_resolver
+get_resolver().url_patterns
+mark("URLconf + views")
+
+from library.startup import PHASES
+print(json.dumps({"steps":  [[b[0], b[1] - a[1]] for a, b in zip(marks, marks[1:])],
+                  "phases": PHASES}))
+"""
+
+
+class Command(BaseCommand):
+    help = ("Boots the project in fresh interpreters (warm-up disabled) and reports where the start-up "
+            "time goes: interpreter, each Django boot step, library.ready, and import time per package.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=3, help="Cold starts to measure (median is shown).")
+        parser.add_argument("--top", type=int, default=15, help="Packages listed by import time.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **opts):
+        runs = [self.probe() for _ in range(max(1, opts["runs"]))]
+
+        steps = [("interpreter start-up", statistics.median(r["interpreter"] for r in runs))]
+        for i, (label, _) in enumerate(runs[0]["steps"]):
+            steps.append((label, statistics.median(r["steps"][i][1] for r in runs)))
+        phases = {}
+        for r in runs:
+            for label, secs in r["phases"]:
+                phases.setdefault(label, []).append(secs)
+        phases = [(label, statistics.median(v)) for label, v in phases.items()]
+        imports = defaultdict(list)
+        for r in runs:
+            for pkg, secs in r["imports"].items():
+                imports[pkg].append(secs)
+        imports = sorted(((pkg, statistics.median(v)) for pkg, v in imports.items()),
+                         key=lambda item: -item[1])
+        total = statistics.median(r["wall"] for r in runs)
+
+        if opts["json"]:
+            self.stdout.write(json.dumps({
+                "runs": len(runs), "total": total, "steps": steps, "library": phases,
+                "imports": imports[:opts["top"]], "import_total": sum(s for _, s in imports),
+            }, indent=2))
+            return
+
+        self.stdout.write(f"Cold start to a servable app: {total * 1000:.0f} ms (median of {len(runs)})\n")
+        for label, secs in steps:
+            self.stdout.write(f"  {label:<28} {secs * 1000:8.1f} ms")
+        for label, secs in phases:
+            self.stdout.write(f"    ↳ {label:<24} {secs * 1000:8.1f} ms")
+        self.stdout.write(f"\nImport time by package (self time, {sum(s for _, s in imports) * 1000:.0f} ms total):")
+        for pkg, secs in imports[:opts["top"]]:
+            self.stdout.write(f"  {pkg:<28} {secs * 1000:8.1f} ms")
+        if getattr(settings, "LIBRARY_STARTUP", "deferred") == "blocking":
+            self.stdout.write(self.style.WARNING(
+                "\nLIBRARY_STARTUP=blocking: servers also migrate and sync before the first request."))
+
+    def probe(self) -> dict:
+        """One cold start in a subprocess with `-X importtime`."""
+        env = {**os.environ, "LIBRARY_STARTUP": "off"}
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE],
+                              cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        wall = time.perf_counter() - started
+        if proc.returncode != 0:
+            raise CommandError(f"Boot probe failed:\n{proc.stderr[-2000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+        imports = defaultdict(float)
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            self_us, _, name = line[len("import time:"):].split("|")
+            imports[name.strip().split(".")[0]] += int(self_us) / 1e6
+
+        result["wall"]        = wall
+        result["interpreter"] = max(0.0, wall - sum(secs for _, secs in result["steps"]))
+        result["imports"]     = imports
+        return result
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from library        import jobs, roots
+from library.models import LibraryRoot, SyncJob
+
+
+class Command(BaseCommand):
+    help = "Syncs library roots: one root now, every due root once, or a scheduling loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--root", action="append", metavar="NAME",
+                            help="Sync this root now, whatever its schedule (repeatable).")
+        parser.add_argument("--loop", action="store_true",
+                            help="Keep running and start each root's sync when its interval elapses.")
+        parser.add_argument("--tick", type=float, default=30.0, help="Seconds between schedule checks with --loop.")
+
+    def handle(self, *args, **opts):
+        roots.ensure_default_root()
+        if opts["root"]:
+            selected = list(LibraryRoot.objects.filter(name__in=opts["root"]))
+            missing  = set(opts["root"]) - {r.name for r in selected}
+            if missing:
+                raise CommandError(f"Unknown root(s): {', '.join(sorted(missing))}")
+            started = [jobs.start_sync(root)[0] for root in selected]
+        else:
+            started = jobs.run_due_syncs()
+        self._report(started)
+
+        if not opts["loop"]:
+            self._wait(started)
+            return
+        try:
+            while True:
+                time.sleep(opts["tick"])
+                close_old_connections()
+                self._report(jobs.run_due_syncs())
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped scheduling.")
+
+    def _report(self, started):
+        for job in started:
+            self.stdout.write(f"Started sync #{job.id} of {job.root.name}")
+
+    def _wait(self, started):
+        """Jobs run on daemon threads — stay alive until they finish."""
+        pending = {job.id for job in started}
+        while pending:
+            time.sleep(1)
+            for job in SyncJob.objects.filter(id__in=pending).exclude(status__in=SyncJob.ACTIVE):
+                pending.discard(job.id)
+                self.stdout.write(f"Sync #{job.id} {job.status}: {job.message}")
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from library import startup
+
+
+class Command(BaseCommand):
+    help = ("Runs the start-up warm-up now — migrations, seed rows and a sync of every enabled root — "
+            "once per deployment. The deploy step for LIBRARY_STARTUP=off.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Run even if this deployment is already warm.")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        ran = startup.run_warmup(force=opts["force"])
+        if ran:
+            self.stdout.write(self.style.SUCCESS(f"Warm-up finished in {time.perf_counter() - started:.2f}s"))
+        elif not startup.is_warm():
+            raise CommandError("Warm-up did not complete — another process holds the lock, "
+                               "or migrations failed (see above).")
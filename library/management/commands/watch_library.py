@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from library         import roots
+from library.models  import FolderEntry, LibraryRoot, ModelType
+from library.watcher import FolderWatcher, run_watchers
+
+
+class Command(BaseCommand):
+    help = "Watches the library roots by polling and applies per-folder index updates as assets change."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--root", action="append", metavar="NAME",
+                            help="Root to watch (repeatable); default every enabled root.")
+        parser.add_argument("--interval", type=float, help="Seconds between polls (LIBRARY_WATCH_INTERVAL).")
+        parser.add_argument("--debounce", type=float, help="Quiet seconds before a folder is applied (LIBRARY_WATCH_DEBOUNCE).")
+        parser.add_argument("--deep-every", type=int,
+                            help="Re-fingerprint all folders every N polls to catch in-place edits; 0 disables.")
+        parser.add_argument("--once", action="store_true",
+                            help="Apply the current difference between disk and index, then exit.")
+
+    def handle(self, *args, **opts):
+        roots.ensure_default_root()
+        selected = LibraryRoot.objects.filter(enabled=True)
+        if opts["root"]:
+            selected = LibraryRoot.objects.filter(name__in=opts["root"])
+            missing  = set(opts["root"]) - set(selected.values_list("name", flat=True))
+            if missing:
+                raise CommandError(f"Unknown root(s): {', '.join(sorted(missing))}")
+        if not selected:
+            raise CommandError("No library root is configured — add one on the settings page first.")
+
+        gltf_type, _ = ModelType.objects.get_or_create(code="gltf", defaults={"name": "glTF"})
+        watchers = []
+        for root in selected:
+            if not Path(root.path).expanduser().is_dir():
+                self.stderr.write(f"Skipping {root.name}: {root.path} does not exist.")
+                continue
+            watchers.append(FolderWatcher(root, entry_cls=FolderEntry, type_gltf=gltf_type,
+                                          interval=opts["interval"], debounce=opts["debounce"],
+                                          deep_every=opts["deep_every"]))
+        if not watchers:
+            raise CommandError("None of the selected roots exist on disk.")
+        try:
+            run_watchers(watchers, once=opts["once"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped watching.")
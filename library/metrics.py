@@ -0,0 +1,238 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Three metric kinds, all thread-safe and keyed by label values:
+
+    Counter     monotonically increasing total
+    Gauge       current value (set / inc / dec)
+    Histogram   fixed buckets, exported the Prometheus way (cumulative
+                `_bucket{le=…}`, `_sum`, `_count` since process start), plus
+                a *rolling* view over the last `LIBRARY_METRICS_WINDOW`
+                seconds: `_window{quantile=…}` and `_window_count`, computed
+                from a ring of time slices so a dashboard without PromQL
+                still sees current latency rather than all-time averages.
+
+Values live in memory per process; with several server workers each one is
+scraped (or summed) separately. `render()` produces the text served by the
+`/metrics/` endpoint.
+
+The series recorded by `middleware.InstrumentationMiddleware` and the sync
+are declared at the bottom of this module.
+"""
+import logging.handlers
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+from django.conf import settings
+
+QUANTILES = (0.5, 0.9, 0.99)
+SLICES    = 10          # ring slots per rolling window
+
+_lock     = threading.Lock()
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name   = name
+        self.help   = help
+        self.labels = tuple(labels)
+        self.series = {}
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with _lock:
+            for key, value in sorted(self.series.items()):
+                lines.append(f"{self.name}{_labels(self.labels, key)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            self.series[key] = self.series.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels) -> None:
+        with _lock:
+            self.series[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            self.series[key] = self.series.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "count", "ring")
+
+    def __init__(self, n: int):
+        self.counts = [0] * n           # per bucket (not cumulative); last = +Inf
+        self.sum    = 0.0
+        self.count  = 0
+        self.ring   = deque(maxlen=SLICES)   # [slice number, per-bucket counts]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), *, buckets):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    @staticmethod
+    def _slice_length() -> float:
+        return max(1.0, getattr(settings, "LIBRARY_METRICS_WINDOW", 300) / SLICES)
+
+    def observe(self, value: float, **labels) -> None:
+        key   = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        now   = int(time.monotonic() // self._slice_length())
+        with _lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = _HistogramSeries(len(self.buckets))
+            series.counts[index] += 1
+            series.sum           += value
+            series.count         += 1
+            if not series.ring or series.ring[-1][0] != now:
+                series.ring.append([now, [0] * len(self.buckets)])
+            series.ring[-1][1][index] += 1
+
+    def window(self, **labels) -> list:
+        """Per-bucket counts observed within the rolling window."""
+        now = int(time.monotonic() // self._slice_length())
+        with _lock:
+            series = self.series.get(self._key(labels))
+            return self._window_counts(series, now) if series else [0] * len(self.buckets)
+
+    def _window_counts(self, series, now: int) -> list:
+        totals = [0] * len(self.buckets)
+        for number, counts in series.ring:
+            if number > now - SLICES:
+                for i, n in enumerate(counts):
+                    totals[i] += n
+        return totals
+
+    def quantile(self, q: float, counts: list) -> float:
+        """Bucket-interpolated quantile, like PromQL's histogram_quantile."""
+        total = sum(counts)
+        if not total:
+            return math.nan
+        rank, seen, lower = q * total, 0, 0.0
+        for upper, n in zip(self.buckets, counts):
+            if seen + n >= rank and n:
+                if upper == math.inf:
+                    return lower                 # beyond the last finite bucket
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+            lower = upper if upper != math.inf else lower
+        return lower
+
+    def render(self) -> list:
+        name  = self.name
+        lines = [f"# HELP {name} {self.help}", f"# TYPE {name} histogram"]
+        now   = int(time.monotonic() // self._slice_length())
+        with _lock:
+            snapshot = [(key, list(s.counts), s.sum, s.count, self._window_counts(s, now))
+                        for key, s in sorted(self.series.items())]
+        window = []
+        for key, counts, total_sum, count, recent in snapshot:
+            cumulative = 0
+            for upper, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(self.labels, key, [('le', _number(upper))])} {cumulative}")
+            lines.append(f"{name}_sum{_labels(self.labels, key)} {_number(total_sum)}")
+            lines.append(f"{name}_count{_labels(self.labels, key)} {count}")
+            for q in QUANTILES:
+                value = self.quantile(q, recent)
+                window.append(f"{name}_window{_labels(self.labels, key, [('quantile', q)])} "
+                              f"{'NaN' if math.isnan(value) else _number(value)}")
+            window.append(f"{name}_window_count{_labels(self.labels, key)} {sum(recent)}")
+        if window:
+            lines += [f"# HELP {name}_window {self.help} (last {getattr(settings, 'LIBRARY_METRICS_WINDOW', 300)}s)",
+                      f"# TYPE {name}_window gauge", *window]
+        return lines
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text format 0.0.4."""
+    lines = []
+    for metric in _registry:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+class SlowLogHandler(logging.handlers.RotatingFileHandler):
+    """
+    The `library.slow` log file, opened on the first slow request: loading
+    the logging config creates no directory and no file, and a read-only
+    log location only matters once there is something to write.
+    """
+
+    def __init__(self, filename, **kwargs):
+        kwargs["delay"] = True
+        super().__init__(filename, **kwargs)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+# ────────────────────────────────────────────────
+# Series
+# ────────────────────────────────────────────────
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS   = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+REQUEST_SECONDS = Histogram("library_request_seconds", "Time spent producing the response, per view.",
+                            ("view", "method", "status"), buckets=LATENCY_BUCKETS)
+REQUEST_QUERIES = Histogram("library_request_queries", "SQL queries run per request, per view.",
+                            ("view",), buckets=QUERY_BUCKETS)
+REQUEST_SQL_SECONDS = Histogram("library_request_sql_seconds", "Time spent in SQL per request, per view.",
+                                ("view",), buckets=LATENCY_BUCKETS)
+BYTES_SERVED    = Counter("library_response_bytes_total", "Response body bytes sent, per view.", ("view",))
+IN_FLIGHT       = Gauge("library_requests_in_flight", "Requests being processed right now.")
+SLOW_REQUESTS   = Counter("library_slow_requests_total",
+                          "Requests slower than LIBRARY_SLOW_REQUEST_MS, per view.", ("view",))
+
+SYNC_SECONDS    = Histogram("library_sync_seconds", "Duration of sync_folders runs, per root.",
+                            ("root", "mode"), buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600))
+SYNC_FOLDERS    = Counter("library_sync_folders_total", "Folders handled by sync runs, per root and outcome.",
+                          ("root", "outcome"))
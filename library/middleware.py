@@ -0,0 +1,223 @@
+"""
+Per-request instrumentation.
+
+`InstrumentationMiddleware` times every request and, through an execute
+wrapper installed on every database connection, counts and times the SQL
+it runs — including the queries of the context processors and of the
+template render. It is sync- and async-capable; the request's `QueryLog`
+lives in a context variable, so queries on `sync_to_async` threads count
+towards the async request that issued them. Results go to the series in
+`library.metrics`, labelled by the URL name of the view (`index`,
+`detail`, `serve_file_direct`, …; `unresolved` for 404s outside the
+URLconf).
+
+Bytes served are taken from Content-Length (so `FileResponse` keeps using
+the server's sendfile / file_wrapper); streamed bodies without a length
+(ZIP exports) are counted as they are sent.
+
+Requests slower than `LIBRARY_SLOW_REQUEST_MS` are written to the
+`library.slow` logger with their SQL grouped by statement, slowest first.
+Latency is measured until the view returns its response; a streamed body
+is not included.
+
+`SchemaGateMiddleware` answers 503 while the deferred warm-up hasn't
+applied the migrations yet (see `library.startup`).
+"""
+import logging
+import re
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf  import settings
+from django.db    import connections
+from django.http  import HttpResponse
+from django.db.backends.signals import connection_created
+
+from . import metrics, startup
+
+logger = logging.getLogger("library.slow")
+
+# `IN (%s, %s, …)` lists of any length group into one statement.
+PLACEHOLDERS_RE = re.compile(r"%s(?:, %s)+")
+SLOW_TOP        = 10      # statements listed per slow request
+
+# QueryLog of the request being handled in this context (None outside requests).
+_current = ContextVar("library_query_log", default=None)
+
+
+class QueryLog:
+    """ `execute_wrapper` that tallies count and time per SQL statement. """
+
+    def __init__(self):
+        self.count      = 0
+        self.seconds    = 0.0
+        self.statements = {}      # sql → [count, seconds]
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count   += 1
+            self.seconds += elapsed
+            stat = self.statements.setdefault(PLACEHOLDERS_RE.sub("%s…", sql), [0, 0.0])
+            stat[0] += 1
+            stat[1] += elapsed
+
+    def top(self, n: int) -> list:
+        return sorted(self.statements.items(), key=lambda item: -item[1][1])[:n]
+
+
+class InstrumentationMiddleware:
+    sync_capable  = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_after   = getattr(settings, "LIBRARY_SLOW_REQUEST_MS", 500) / 1000
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        for alias in connections:
+            install(connections[alias])
+        queries, token, started = self._begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            elapsed = self._end(token, started)
+        return self._record(request, response, elapsed, queries)
+
+    async def __acall__(self, request):
+        # ORM calls run on sync_to_async threads, whose connections get the
+        # wrapper from `connection_created`; the log follows via the context.
+        queries, token, started = self._begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            elapsed = self._end(token, started)
+        return self._record(request, response, elapsed, queries)
+
+    @staticmethod
+    def _begin():
+        queries = QueryLog()
+        metrics.IN_FLIGHT.inc()
+        return queries, _current.set(queries), time.perf_counter()
+
+    @staticmethod
+    def _end(token, started: float) -> float:
+        elapsed = time.perf_counter() - started
+        _current.reset(token)
+        metrics.IN_FLIGHT.dec()
+        return elapsed
+
+    def _record(self, request, response, elapsed: float, queries: QueryLog):
+        view = _view_name(request)
+        metrics.REQUEST_SECONDS.observe(elapsed, view=view, method=request.method,
+                                        status=f"{response.status_code // 100}xx")
+        metrics.REQUEST_QUERIES.observe(queries.count, view=view)
+        metrics.REQUEST_SQL_SECONDS.observe(queries.seconds, view=view)
+        _count_bytes(response, view)
+
+        if elapsed >= self.slow_after:
+            metrics.SLOW_REQUESTS.inc(view=view)
+            _log_slow(request, response, view, elapsed, queries)
+        return response
+
+
+class SchemaGateMiddleware:
+    """ 503 + Retry-After until the migrations are applied, instead of errors from missing tables. """
+    sync_capable  = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not startup.check_schema():
+            return _starting_up()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not startup.schema_ready() and not await sync_to_async(startup.check_schema)():
+            return _starting_up()
+        return await self.get_response(request)
+
+
+def _starting_up() -> HttpResponse:
+    response = HttpResponse("Starting up — the database is being migrated. Try again shortly.",
+                            status=503, content_type="text/plain; charset=utf-8")
+    response["Retry-After"] = "5"
+    return response
+
+
+# ────────────────────────────────────────────────
+# Query tally
+# ────────────────────────────────────────────────
+def _tally(execute, sql, params, many, context):
+    queries = _current.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    return queries(execute, sql, params, many, context)
+
+
+def install(connection, **kwargs) -> None:
+    """Puts the tally wrapper on `connection` once (also the `connection_created` receiver)."""
+    if _tally not in connection.execute_wrappers:
+        # first, so `execute_wrapper()` blocks that are open right now still pop their own
+        connection.execute_wrappers.insert(0, _tally)
+
+
+connection_created.connect(install)
+
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return (match.url_name or match.view_name) if match else "unresolved"
+
+
+def _count_bytes(response, view: str) -> None:
+    length = response.get("Content-Length")
+    if length is not None:
+        metrics.BYTES_SERVED.inc(int(length), view=view)
+    elif response.streaming:
+        counted = _acounted if response.is_async else _counted
+        response.streaming_content = counted(response.streaming_content, view)
+    else:
+        metrics.BYTES_SERVED.inc(len(response.content), view=view)
+
+
+def _counted(chunks, view: str):
+    sent = 0
+    try:
+        for chunk in chunks:
+            sent += len(chunk)
+            yield chunk
+    finally:
+        metrics.BYTES_SERVED.inc(sent, view=view)
+
+
+async def _acounted(chunks, view: str):
+    sent = 0
+    try:
+        async for chunk in chunks:
+            sent += len(chunk)
+            yield chunk
+    finally:
+        metrics.BYTES_SERVED.inc(sent, view=view)
+
+
+def _log_slow(request, response, view: str, elapsed: float, queries: QueryLog) -> None:
+    lines = [f"{request.method} {request.get_full_path()} → {response.status_code} [{view}] "
+             f"{elapsed * 1000:.0f} ms, {queries.count} queries in {queries.seconds * 1000:.0f} ms"]
+    for sql, (count, seconds) in queries.top(SLOW_TOP):
+        lines.append(f"  {seconds * 1000:8.1f} ms  ×{count:<4} {sql[:300]}")
+    logger.warning("\n".join(lines))
@@ -1,6 +1,14 @@
+import unicodedata
+
 from django.db import models
 from django.utils.text import slugify
 
+
+def fold_name(name: str) -> str:
+    """Case-folded, NFKC-normalised form of a name (browse order / name search)."""
+    return unicodedata.normalize("NFKC", name or "").casefold()
+
+
 class ModelType(models.Model):
     """
     High-level format family (GLTF, HDR, OBJ, …).
@@ -76,16 +84,59 @@ class Tag(models.Model):
         return self.name
 
 
+class LibraryRoot(models.Model):
+    """
+    One configured asset share. Each root syncs on its own schedule with
+    its own scan concurrency (see library/roots.py).
+
+    ─ sync_interval – seconds between scheduled syncs; 0 = manual only
+    ─ workers       – scan / copy / hash threads; null = LIBRARY_SYNC_WORKERS
+    ─ thumb_dir     – MEDIA-relative folder for this root's thumbnails
+    """
+    name           = models.CharField(max_length=100, unique=True)
+    path           = models.CharField(max_length=1024, unique=True)
+    enabled        = models.BooleanField(default=True)
+    sync_interval  = models.PositiveIntegerField(default=0)
+    workers        = models.PositiveSmallIntegerField(null=True, blank=True)
+    thumb_dir      = models.CharField(max_length=150, blank=True, default="")
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name = "Library Root"
+        verbose_name_plural = "Library Roots"
+
+    def save(self, *args, **kwargs):
+        if not self.thumb_dir:
+            self.thumb_dir = f"thumbs/{slugify(self.name) or 'root'}"
+        super().save(*args, **kwargs)
+
+    def __str__(self) -> str:              # pragma: no cover
+        return self.name
+
+
 class FolderEntry(models.Model):
     """
-    One on-disk asset folder (thumbnail + model + optional .url link).
+    One on-disk asset folder (thumbnail + model + optional .url link),
+    identified by (root, rel_path) — folder names may repeat across roots.
     """
+    root        = models.ForeignKey(LibraryRoot, on_delete=models.CASCADE,
+                                    null=True, blank=True, related_name="entries")
+    rel_path    = models.CharField(max_length=512, blank=True, default="")   # folder path under root
     name        = models.CharField(max_length=255)
-    path        = models.TextField()                           # absolute FS path
+    name_lower  = models.CharField(max_length=255, blank=True, default="", editable=False)  # fold_name(name)
+    path        = models.CharField(max_length=1024)            # absolute FS path
     jpeg_path   = models.TextField(null=True, blank=True)      # MEDIA-relative
-    gltf_path   = models.TextField(null=True, blank=True)      # same
+    gltf_path   = models.CharField(max_length=1024, null=True, blank=True)   # absolute FS path
     lnk_path    = models.TextField(null=True, blank=True)      # web link
-    obtained_on = models.DateTimeField(null=True, blank=True)  # FS mtime stamp
+    obtained_on = models.DateTimeField(null=True, blank=True, db_index=True)  # FS mtime stamp
+    fingerprint = models.CharField(max_length=40, blank=True, default="")  # sync stat digest
+
+    # Duplicate detection (see library/dedupe.py)
+    phash            = models.CharField(max_length=16, blank=True, default="")               # thumbnail dHash
+    content_hash     = models.CharField(max_length=40, blank=True, default="", db_index=True)
+    disk_bytes       = models.BigIntegerField(default=0)                                     # folder size
+    hash_fingerprint = models.CharField(max_length=40, blank=True, default="")               # stats at hash time
 
     type = models.ForeignKey(                                 # GLTF / HDR / …
         ModelType,
@@ -102,16 +153,157 @@ class FolderEntry(models.Model):
     tags = models.ManyToManyField(Tag, blank=True)
 
     class Meta:
-        ordering = ["name"]
+        ordering = ["name_lower", "id"]                      # case-insensitive, index-backed
         verbose_name = "Folder Entry"
         verbose_name_plural = "Folder Entries"
+        constraints = [
+            models.UniqueConstraint(fields=["root", "rel_path"], name="library_entry_root_rel_path"),
+        ]
+        indexes = [
+            # Browse order and its keyset seek: WHERE (name_lower, id) > (…) ORDER BY name_lower, id
+            models.Index(fields=["name_lower", "id"], name="library_entry_name_lower_id"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.name_lower = fold_name(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "name_lower"}
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:              # pragma: no cover
         return self.name
 
+class AssetAnalysis(models.Model):
+    """
+    Cached result of `analysis.analyze_gltf_and_textures` for one entry.
+
+    `fingerprint` covers the size/mtime of the .gltf and texture files; a
+    mismatch means the cached `data` is stale.
+    """
+    entry       = models.OneToOneField(FolderEntry, on_delete=models.CASCADE, related_name="analysis")
+    fingerprint = models.CharField(max_length=40)
+    data        = models.JSONField(default=dict)
+    analyzed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Asset Analysis"
+        verbose_name_plural = "Asset Analyses"
+
+    def __str__(self) -> str:              # pragma: no cover
+        return f"Analysis of {self.entry_id}"
+
+class EntryStats(models.Model):
+    """
+    What one entry currently contributes to the `LibraryStat` aggregates
+    (see library/stats.py). Kept so a change can subtract the old values
+    before adding the new ones; `entry` is nulled when the entry is
+    deleted and the orphan is subtracted on the next refresh.
+    """
+    entry       = models.OneToOneField(FolderEntry, on_delete=models.SET_NULL, null=True,
+                                       related_name="stats")
+    type_key    = models.CharField(max_length=20, blank=True, default="")    # ModelType id
+    category_key = models.CharField(max_length=20, blank=True, default="")   # ModelCategory id
+    bytes       = models.BigIntegerField(default=0, db_index=True)
+    triangles   = models.BigIntegerField(null=True, blank=True, db_index=True)   # None = not analysed
+    textures    = models.JSONField(default=list)                         # [[resolution bucket, bytes], …]
+
+    class Meta:
+        verbose_name = "Entry Stats"
+        verbose_name_plural = "Entry Stats"
+
+    def __str__(self) -> str:              # pragma: no cover
+        return f"Stats of {self.entry_id}"
+
+
+class LibraryStat(models.Model):
+    """
+    One precomputed aggregate bucket, e.g. (group="type", key="1") or
+    (group="texture_res", key="2K"). Maintained by deltas, never by
+    re-scanning the library.
+    """
+    group     = models.CharField(max_length=20)
+    key       = models.CharField(max_length=40, blank=True, default="")
+    count     = models.BigIntegerField(default=0)
+    bytes     = models.BigIntegerField(default=0)
+    triangles = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("group", "key")
+        verbose_name = "Library Stat"
+        verbose_name_plural = "Library Stats"
+
+    def __str__(self) -> str:              # pragma: no cover
+        return f"{self.group}:{self.key}"
+
 class AppSetting(models.Model):            # ← add this block
     key   = models.CharField(max_length=100, unique=True)
     value = models.TextField()
 
     def __str__(self):
-        return f"{self.key}={self.value}"
\ No newline at end of file
+        return f"{self.key}={self.value}"
+
+class SyncJob(models.Model):
+    """
+    One background run of `LibraryConfig.sync_folders`.
+
+    The worker thread updates the counters as it goes; the settings page
+    polls them through the `sync_status` JSON endpoint.
+    """
+    QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+    STATUS_CHOICES = [(s, s.title()) for s in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)]
+    ACTIVE = (QUEUED, RUNNING)
+
+    status      = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    phase       = models.CharField(max_length=32, blank=True, default="")   # scanning / thumbnails / writing
+    root        = models.ForeignKey(LibraryRoot, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name="jobs")
+    root_dir    = models.TextField(blank=True, default="")
+    total       = models.PositiveIntegerField(default=0)    # folders found under root
+    scanned     = models.PositiveIntegerField(default=0)
+    changed     = models.PositiveIntegerField(default=0)    # added + changed + removed
+    errors      = models.PositiveIntegerField(default=0)
+    message     = models.TextField(blank=True, default="")
+    cancel_requested = models.BooleanField(default=False)
+
+    created_at  = models.DateTimeField(auto_now_add=True)
+    started_at  = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at  = models.DateTimeField(auto_now=True)       # worker heartbeat
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Sync Job"
+        verbose_name_plural = "Sync Jobs"
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in self.ACTIVE
+
+    def eta_seconds(self) -> float | None:
+        """Linear estimate from the scan rate so far; None until it's meaningful."""
+        if self.status != self.RUNNING or not self.started_at or not self.scanned or not self.total:
+            return None
+        elapsed = (self.updated_at - self.started_at).total_seconds()
+        return max(0.0, elapsed / self.scanned * (self.total - self.scanned))
+
+    def as_dict(self) -> dict:
+        return {
+            "id":          self.id,
+            "status":      self.status,
+            "phase":       self.phase,
+            "root":        self.root.name if self.root else None,
+            "root_dir":    self.root_dir,
+            "total":       self.total,
+            "scanned":     self.scanned,
+            "changed":     self.changed,
+            "errors":      self.errors,
+            "message":     self.message,
+            "eta":         self.eta_seconds(),
+            "cancel_requested": self.cancel_requested,
+            "started_at":  self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __str__(self) -> str:              # pragma: no cover
+        return f"Sync #{self.pk} ({self.status})"
@@ -0,0 +1,127 @@
+"""
+Keyset (cursor) pagination for the infinite-scroll index.
+
+`Paginator` costs a COUNT(*) plus an OFFSET scan that grows with depth.
+Here each page is `WHERE (name_lower, id) > (last, last_id) ORDER BY
+name_lower, id LIMIT n+1`, which the (name_lower, id) index can seek
+straight into, so page 3,000 costs the same as page 1. The "newest" sort
+seeks the same way over (obtained_on, id), descending, with undated
+entries last. The position travels as an opaque url-safe token.
+
+Ranked full-text results seek the same way over (search_rank, name_lower,
+id): the cursor carries the last row's bm25 score and name.
+
+A cursor that doesn't decode, or doesn't fit the listing it is used on,
+raises `InvalidCursor` — the views answer 400 rather than silently
+restarting at page one.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+from . import search
+from .queries import SORTS
+
+PAGE_SIZE = 20
+
+
+class InvalidCursor(ValueError):
+    """ The cursor token is malformed or belongs to a different listing. """
+
+
+def encode_cursor(payload) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str):
+    """Payload of `token`, or None when it's missing / malformed."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if isinstance(payload, list) and len(payload) == 3 and payload[0] in ("k", "r"):
+        return payload
+    return None
+
+
+def _is_id(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _after(column: str, desc: bool, value, last_id: int) -> Q:
+    """
+    Rows strictly past (value, last_id) in (column, id) order, written as a
+    range on `column` so the index seek keeps its order (no temp sort).
+    When `desc`, NULLs come last: a NULL `value` means that tail.
+    """
+    if desc:
+        if value is None:
+            return Q(**{f"{column}__isnull": True, "id__lt": last_id})
+        return Q(**{f"{column}__lte": value}) & (Q(**{f"{column}__lt": value}) | Q(id__lt=last_id))
+    return Q(**{f"{column}__gte": value}) & (Q(**{f"{column}__gt": value}) | Q(id__gt=last_id))
+
+
+def keyset_page(qs, cursor: str | None = None, *, ranked: bool = False, size: int = PAGE_SIZE,
+                sort: str = "name"):
+    """
+    One page of `qs` after `cursor`.
+
+    `qs` must already be ordered by `queries.ordering(sort)`, or by
+    (search_rank, name_lower, id) when `ranked`. Returns
+    `(rows, next_cursor)`; `next_cursor` is None on the last page.
+    """
+    pos = decode_cursor(cursor)
+    if cursor and (pos is None or pos[0] != ("r" if ranked else "k") or not _is_id(pos[2])):
+        raise InvalidCursor(cursor)
+
+    if ranked:
+        if pos:
+            key = pos[1]
+            if not (isinstance(key, list) and len(key) == 2 and isinstance(key[0], (int, float))
+                    and not isinstance(key[0], bool) and isinstance(key[1], str)):
+                raise InvalidCursor(cursor)
+            qs = search.rank_after(qs, key[0], key[1], pos[2])
+        rows = list(qs[:size + 1])
+        more = len(rows) > size
+        rows = rows[:size]
+        if not more:
+            return rows, None
+        return rows, encode_cursor(["r", [rows[-1].search_rank, rows[-1].name_lower], rows[-1].id])
+
+    column, desc = SORTS[sort]
+    if pos:
+        _, value, last_id = pos
+        if not (isinstance(value, str) or (desc and value is None)):   # None = undated tail
+            raise InvalidCursor(cursor)
+        if column == "obtained_on" and value is not None:
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                raise InvalidCursor(cursor) from None
+        seek = qs.filter(_after(column, desc, value, last_id))
+        if desc and value is not None:
+            # Dated rows, then the undated tail — two index seeks instead of one OR'd scan
+            rows = list(seek[:size + 1])
+            if len(rows) <= size:
+                rows += list(qs.filter(**{f"{column}__isnull": True})[:size + 1 - len(rows)])
+            return _page(rows, size, column)
+        qs = seek
+    return _page(list(qs[:size + 1]), size, column)
+
+
+def _page(rows: list, size: int, column: str) -> tuple:
+    """Trims the n+1 probe row and builds the cursor for the next page."""
+    more = len(rows) > size
+    rows = rows[:size]
+    if not more:
+        return rows, None
+    value = getattr(rows[-1], column)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return rows, encode_cursor(["k", value, rows[-1].id])
@@ -0,0 +1,172 @@
+"""
+Gzip variants of text asset files (.gltf, .json, .url).
+
+A .gltf is JSON — often tens of MB, with buffers embedded as base64 data
+URIs — and compresses 5–10× with gzip. Variants are cached under
+MEDIA_ROOT/precompressed/, named after a sha1 of the source path + size +
+mtime like the image derivatives, so a changed source gets a new key and a
+stale variant is never served.
+
+`select` is what `fileserving` asks per request: the variant to send with
+`Content-Encoding: gzip`, built on first use, or None when the client
+doesn't accept gzip, a byte range was requested, or compression wouldn't
+pay. `build_in_background` pre-builds them for the folder sync once its
+write has committed, so compression never holds up indexing.
+"""
+import gzip
+import hashlib
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from django.conf import settings
+
+# Source files worth compressing (text formats; images and .bin are already dense).
+COMPRESSIBLE_SUFFIXES = {".gltf", ".json", ".url"}
+
+# Variants must be at most this fraction of the original to be served.
+MAX_RATIO = 0.9
+
+ENCODING_RE = re.compile(r"^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*$")
+
+
+class Variant(NamedTuple):
+    path: Path
+    size: int
+
+
+def is_compressible(path) -> bool:
+    return getattr(settings, "LIBRARY_PRECOMPRESS", True) and Path(path).suffix.lower() in COMPRESSIBLE_SUFFIXES
+
+
+def accepts_gzip(request) -> bool:
+    """Whether Accept-Encoding allows gzip (explicitly or via `*`, with q > 0)."""
+    accepted = {}
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        match = ENCODING_RE.match(part)
+        if match:
+            try:
+                accepted[match[1].lower()] = float(match[2]) if match[2] else 1.0
+            except ValueError:
+                continue
+    return accepted.get("gzip", accepted.get("*", 0)) > 0
+
+
+# ────────────────────────────────────────────────
+# Cache paths
+# ────────────────────────────────────────────────
+def variant_path(src: Path, st=None) -> Path | None:
+    """Where the gzip variant of `src` lives; None if `src` is unreadable."""
+    try:
+        st = st or os.stat(src)
+    except OSError:
+        return None
+    key = hashlib.sha1(f"{src}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8")).hexdigest()
+    return Path(settings.MEDIA_ROOT) / "precompressed" / key[:2] / f"{key}.gz"
+
+
+def get_variant(src: Path, st=None) -> Variant | None:
+    """The cached variant, compressing `src` now if needed; None on failure or when it saves too little."""
+    st   = st or os.stat(src)
+    dest = variant_path(src, st)
+    if dest is None or st.st_size < getattr(settings, "LIBRARY_PRECOMPRESS_MIN_BYTES", 1024):
+        return None
+    try:
+        size = dest.stat().st_size
+    except FileNotFoundError:
+        if not compress(src, dest):
+            return None
+        size = dest.stat().st_size
+    return Variant(dest, size) if size <= st.st_size * MAX_RATIO else None
+
+
+def select(request, path, st) -> Variant | None:
+    """The variant to serve for this request, or None for the file itself."""
+    if (request.method not in ("GET", "HEAD") or "Range" in request.headers
+            or not is_compressible(path) or not accepts_gzip(request)):
+        return None
+    return get_variant(Path(path), st)
+
+
+# ────────────────────────────────────────────────
+# Compression
+# ────────────────────────────────────────────────
+def compress(src: Path, dest: Path) -> bool:
+    """Gzips `src` into `dest` in chunks (atomic write)."""
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        level = getattr(settings, "LIBRARY_PRECOMPRESS_LEVEL", 6)
+        with open(src, "rb") as fin, open(tmp, "wb") as raw:
+            # mtime=0 → identical bytes for identical sources
+            with gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=level, mtime=0) as fout:
+                shutil.copyfileobj(fin, fout, 1024 * 1024)
+        os.replace(tmp, dest)
+        return True
+    except Exception as exc:
+        print(f"  ! precompress failed: {src} ({exc})")
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def asset_sources(folder, gltf_path=None) -> list:
+    """The glTF plus the compressible files at the top of an asset folder."""
+    sources = [gltf_path] if gltf_path else []
+    try:
+        with os.scandir(folder) as it:
+            sources += [f.path for f in it
+                        if f.is_file() and Path(f.name).suffix.lower() in COMPRESSIBLE_SUFFIXES and f.path != gltf_path]
+    except OSError:
+        pass
+    return sources
+
+
+def build_variants(sources, *, workers: int | None = None) -> int:
+    """Pre-builds missing variants of the compressible `sources`; returns how many were built."""
+    min_bytes = getattr(settings, "LIBRARY_PRECOMPRESS_MIN_BYTES", 1024)
+    jobs = []
+    for src in sources:
+        if not src or not is_compressible(src):
+            continue
+        try:
+            st = os.stat(src)
+        except OSError:
+            continue
+        dest = variant_path(Path(src), st)
+        if st.st_size >= min_bytes and not dest.exists():
+            jobs.append((Path(src), dest))
+    if not jobs:
+        return 0
+
+    # zlib releases the GIL — threads are enough
+    workers = workers or getattr(settings, "LIBRARY_SYNC_WORKERS", 8)
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs)), thread_name_prefix="library-gzip") as pool:
+        return sum(pool.map(lambda job: compress(*job), jobs))
+
+
+def build_in_background(folders, *, workers: int | None = None) -> threading.Thread | None:
+    """
+    Pre-builds the variants of `folders` — (folder, gltf_path) pairs — on a
+    daemon thread. Nothing here touches the database; a variant not built
+    yet (or lost with the process) is made on its first request instead.
+    """
+    folders = list(folders)
+    if not folders or not getattr(settings, "LIBRARY_PRECOMPRESS", True):
+        return None
+
+    def run():
+        sources = [src for folder, gltf_path in folders for src in asset_sources(folder, gltf_path)]
+        built   = build_variants(sources, workers=workers)
+        if built:
+            print(f"[Library] Precompressed {built} file(s).")
+
+    thread = threading.Thread(target=run, name="library-precompress", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,89 @@
+"""
+Entry filtering shared by the HTML index and the JSON API.
+
+Both accept the same query parameters:
+
+    q         full-text search (FTS5, ranked)       ?q=wooden chair
+    root      LibraryRoot id, repeatable             ?root=2
+    type      ModelType slug, repeatable             ?type=gltf
+    category  ModelCategory slug, repeatable         ?category=props
+    tag       Tag slug, repeatable (any of)          ?tag=pbr&tag=scan
+    tags      comma-separated tag names (all of)     ?tags=pbr,low-poly
+    sort      "name" (default) or "newest"           ?sort=newest
+
+Every filter is a to-one join or an `id IN (…)` subquery, so rows never
+repeat and the listing needs no DISTINCT — that keeps the (name_lower, id)
+and obtained_on indexes usable for ORDER BY … LIMIT.
+"""
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+from . import search
+from .models import FolderEntry, Tag
+
+# ?sort= value → (column, descending); each is a keyset over (column, id).
+SORTS = {
+    "name":   ("name_lower", False),
+    "newest": ("obtained_on", True),
+}
+
+
+def sort_key(params) -> str:
+    """The `?sort=` value, falling back to "name"."""
+    sort = params.get("sort", "")
+    return sort if sort in SORTS else "name"
+
+
+def ordering(sort: str) -> tuple:
+    column, desc = SORTS[sort]
+    return (f"-{column}", "-id") if desc else (column, "id")
+
+
+def filter_entries(qs, params) -> tuple:
+    """
+    Applies the filters in `params` (a QueryDict) to `qs`.
+
+    Returns `(qs, ranked)` with `qs` ordered by `ordering(sort_key(params))`;
+    when `ranked`, list through `search.order_by_rank(qs, params["q"])`.
+    """
+    q          = params.get("q", "").strip()
+    type_slugs = params.getlist("type")
+    cat_slugs  = params.getlist("category")
+    tag_slugs  = params.getlist("tag")
+    tags_param = params.get("tags", "")
+    root_ids   = [r for r in params.getlist("root") if r.isdigit()]
+
+    ranked = False
+    if q:
+        qs, ranked = search.apply_search(qs, q)
+
+    if root_ids:
+        qs = qs.filter(root_id__in=root_ids)
+
+    if type_slugs:
+        qs = qs.filter(type__slug__in=type_slugs)
+
+    if cat_slugs:
+        qs = qs.filter(category__slug__in=cat_slugs)
+
+    if tag_slugs:
+        qs = qs.filter(id__in=FolderEntry.tags.through.objects
+                       .filter(tag__slug__in=tag_slugs)
+                       .values("folderentry_id"))
+
+    if tags_param:
+        # Entries carrying *all* listed tags — one grouped subquery, not a join per tag
+        tag_names = {t.strip().lower() for t in tags_param.split(",") if t.strip()}
+        tag_ids   = list(Tag.objects.annotate(lname=Lower("name"))
+                                    .filter(lname__in=tag_names).values_list("id", flat=True))
+        if len(tag_ids) < len(tag_names):
+            qs = qs.none()
+        elif tag_ids:
+            qs = qs.filter(id__in=FolderEntry.tags.through.objects
+                           .filter(tag_id__in=tag_ids)
+                           .values("folderentry_id")
+                           .annotate(n=Count("tag_id"))
+                           .filter(n=len(tag_ids))
+                           .values("folderentry_id"))
+
+    return qs.order_by(*ordering(sort_key(params))), ranked
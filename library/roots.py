@@ -0,0 +1,79 @@
+"""
+Configured library roots and their sync schedule.
+
+Installs from before multi-root support have a single `ROOT_DIR`
+AppSetting and entries without a root. `ensure_default_root` turns that
+setting into the first `LibraryRoot` (keeping the old `thumbs/` folder)
+and adopts the legacy entries, keyed by their folder name.
+
+A root with `sync_interval > 0` is *due* once that many seconds have
+passed since its last completed full sync; `jobs.run_due_syncs` starts a
+background job per due root (`manage.py sync_roots --loop`).
+"""
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+
+def ensure_default_root():
+    """The first root, created from ROOT_DIR on upgraded installs; None if nothing is configured."""
+    from .models import AppSetting, LibraryRoot
+
+    root = LibraryRoot.objects.order_by("id").first()
+    if root is None:
+        path = AppSetting.objects.filter(key="ROOT_DIR").values_list("value", flat=True).first()
+        if not path:
+            return None
+        root = LibraryRoot.objects.create(name="Default", path=path.strip(), thumb_dir="thumbs")
+    adopt_legacy_entries(root)
+    return root
+
+
+def adopt_legacy_entries(root) -> int:
+    """Assigns rootless entries (pre multi-root) to `root`."""
+    from .models import FolderEntry
+
+    return FolderEntry.objects.filter(root__isnull=True).update(root=root, rel_path=F("name"))
+
+
+def root_for_dir(root_dir):
+    """The root configured for `root_dir`, created on first use."""
+    from .models import LibraryRoot
+
+    ensure_default_root()
+    path = str(root_dir).strip()
+    root = LibraryRoot.objects.filter(path=path).first()
+    if root is None:
+        base = name = Path(path).name or "Root"
+        n = 1
+        while LibraryRoot.objects.filter(name=name).exists():
+            n += 1
+            name = f"{base} {n}"
+        root = LibraryRoot.objects.create(name=name, path=path)
+    return root
+
+
+def root_workers(root) -> int:
+    """Concurrency limit for `root`'s scan / copy / hash pools."""
+    return root.workers or getattr(settings, "LIBRARY_SYNC_WORKERS", 8)
+
+
+def due_roots(now=None) -> list:
+    """Enabled roots whose sync interval has elapsed."""
+    from .models import LibraryRoot
+
+    now = now or timezone.now()
+    due = []
+    for root in LibraryRoot.objects.filter(enabled=True, sync_interval__gt=0):
+        if root.last_synced_at is None or now - root.last_synced_at >= timedelta(seconds=root.sync_interval):
+            due.append(root)
+    return due
+
+
+def mark_synced(root, when=None) -> None:
+    from .models import LibraryRoot
+
+    LibraryRoot.objects.filter(pk=root.pk).update(last_synced_at=when or timezone.now())
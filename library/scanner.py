@@ -0,0 +1,130 @@
+"""
+Parallel filesystem scan stage for the folder sync.
+
+Every `exists()` / `stat()` on an SMB/NFS share is a network round-trip, so
+the per-folder work (listing, stat-ing, fingerprinting, reading the .url
+shortcut, summing the folder size) is fanned out over a bounded thread
+pool. The results are plain `FolderScan` records that
+`LibraryConfig.sync_folders` reconciles against the DB on the main thread.
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+# Files inside each asset folder that feed the sync fingerprint.
+ASSET_SUFFIXES = (".jpeg", ".gltf", ".url")
+
+
+@dataclass
+class FolderScan:
+    """ What the scan stage learned about one asset folder. """
+    name:        str
+    path:        Path
+    stats:       dict = field(default_factory=dict)  # suffix → os.stat_result | None
+    fingerprint: str  = ""
+    url:         str | None = None                   # only parsed when fingerprint changed
+    disk_bytes:  int | None = None                   # only summed when fingerprint changed
+    error:       str | None = None
+
+    @property
+    def has_thumbnail(self) -> bool:
+        return self.stats.get(".jpeg") is not None
+
+
+# ────────────────────────────────────────────────
+# Public entry point
+# ────────────────────────────────────────────────
+def scan_root(root_dir: Path, *, known: dict | None = None, workers: int = 8,
+              on_progress=None) -> list[FolderScan]:
+    """
+    Lists the asset folders under `root_dir` and scans them concurrently.
+
+    `known` maps folder-name → stored fingerprint; folders whose fingerprint
+    still matches skip the (comparatively expensive) .url parse.
+    `on_progress(done, total)` is called from the calling thread as results
+    arrive; if it raises, pending folders are cancelled and the error
+    propagates. Results come back sorted by folder name.
+    """
+    known = known or {}
+    with os.scandir(root_dir) as it:
+        folders = [Path(d.path) for d in it if d.is_dir(follow_symlinks=True)]
+
+    scans = []
+    pool  = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="library-scan")
+    try:
+        futures = [pool.submit(scan_folder, f, known.get(f.name)) for f in folders]
+        for future in as_completed(futures):
+            scans.append(future.result())
+            if on_progress:
+                on_progress(len(scans), len(folders))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    scans.sort(key=lambda s: s.name)
+    return scans
+
+
+def scan_folder(folder: Path, known_fingerprint: str | None = None) -> FolderScan:
+    """Stat + fingerprint one folder with a single directory listing."""
+    name = folder.name
+    scan = FolderScan(name=name, path=folder)
+    try:
+        wanted = {f"{name}{suffix}": suffix for suffix in ASSET_SUFFIXES}
+        scan.stats = dict.fromkeys(ASSET_SUFFIXES)
+        with os.scandir(folder) as it:
+            for item in it:
+                suffix = wanted.get(item.name)
+                if suffix and item.is_file():
+                    scan.stats[suffix] = item.stat()
+        scan.fingerprint = fingerprint(folder, scan.stats)
+        if scan.fingerprint != known_fingerprint:
+            if scan.stats[".url"] is not None:
+                scan.url = parse_url(folder / f"{name}.url")
+            scan.disk_bytes = folder_bytes(folder)
+    except OSError as exc:
+        scan.error = str(exc)
+    return scan
+
+
+# ────────────────────────────────────────────────
+# Helpers
+# ────────────────────────────────────────────────
+def fingerprint(folder: Path, stats: dict) -> str:
+    """sha1 over the folder mtime and the size/mtime of its asset files."""
+    try:
+        parts = [str(folder.stat().st_mtime_ns)]
+    except OSError:
+        parts = ["-"]
+    for suffix in ASSET_SUFFIXES:
+        st = stats.get(suffix)
+        parts.append(f"{suffix}:{st.st_size}:{st.st_mtime_ns}" if st else f"{suffix}:-")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def folder_bytes(folder) -> int:
+    """Bytes under `folder` from a stat walk, .url shortcut excluded as in `dedupe.folder_files`."""
+    total = 0
+    for dirpath, _, filenames in os.walk(folder):
+        for name in filenames:
+            if name.lower().endswith(".url"):
+                continue
+            try:
+                total += os.stat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def parse_url(url_file: Path) -> str | None:
+    """Pulls the `URL=` line out of a Windows internet shortcut."""
+    try:
+        with url_file.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                if line.lower().startswith("url="):
+                    return line.strip().split("=", 1)[1]
+    except Exception:
+        pass
+    return None
@@ -0,0 +1,199 @@
+"""
+SQLite FTS5 full-text index over the library.
+
+One row per FolderEntry (rowid = entry id) with the searchable text split
+into weighted columns: the name (plus its CamelCase / snake_case parts),
+tags, category, texture map types from the cached analysis, and the .url
+link. Queries are prefix-matched per token and ranked with bm25.
+
+The virtual table can't be expressed as a Django model, so it is created
+on first use (and filled from the DB if it was missing). The sync, tag /
+category edits (signals) and analysis refreshes keep it current through
+`reindex` / `unindex`. On non-SQLite databases, or SQLite builds without
+FTS5, `available()` is False and callers fall back to a substring match
+on the case-folded `name_lower` column.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+from django.db.utils import DatabaseError
+
+TABLE = "library_entry_fts"
+
+# Column weights for bm25 (name, tags, category, textures, url)
+RANK = "bm25(10.0, 5.0, 3.0, 1.0, 0.5)"
+
+CHUNK = 500
+
+_state = {"ready": None}
+
+
+# ────────────────────────────────────────────────
+# Tokenising
+# ────────────────────────────────────────────────
+_CAMEL_RE = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])|(?<=[A-Za-z])(?=\d)|(?<=\d)(?=[A-Za-z])")
+_WORD_RE  = re.compile(r"\w+", re.UNICODE)
+
+
+def split_words(text: str) -> list[str]:
+    """'WoodenChair_01b' → ['wooden', 'chair', '01', 'b']"""
+    words = []
+    for chunk in _WORD_RE.findall(text or ""):
+        for part in _CAMEL_RE.split(chunk.replace("_", " ")):
+            words.extend(w.lower() for w in part.split() if w)
+    return words
+
+
+def match_expression(query: str) -> str | None:
+    """User input → FTS5 MATCH string: every word must match as a prefix."""
+    words = split_words(query)
+    if not words:
+        return None
+    return " AND ".join(f'"{w}"*' for w in words)
+
+
+# ────────────────────────────────────────────────
+# Table management
+# ────────────────────────────────────────────────
+def available() -> bool:
+    """True once the FTS table exists (creating + filling it on first call)."""
+    if _state["ready"] is None:
+        _state["ready"] = _ensure_table()
+    return _state["ready"]
+
+
+def _ensure_table() -> bool:
+    if connection.vendor != "sqlite":
+        return False
+    try:
+        with connection.cursor() as cur:
+            cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABLE])
+            existed = cur.fetchone() is not None
+            if not existed:
+                cur.execute(f"CREATE VIRTUAL TABLE {TABLE} USING fts5("
+                            "name, tags, category, textures, url, "
+                            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')")
+                cur.execute(f"INSERT INTO {TABLE}({TABLE}, rank) VALUES ('rank', %s)", [RANK])
+    except DatabaseError as exc:
+        print(f"[Library] Full-text search unavailable ({exc}) — using plain filters.")
+        return False
+    if not existed:
+        _state["ready"] = True
+        rebuild()
+    return True
+
+
+def rebuild() -> int:
+    """Re-fills the whole index from the DB; returns the number of entries indexed."""
+    from .models import FolderEntry
+    if not available():
+        return 0
+    ids = list(FolderEntry.objects.values_list("id", flat=True))
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            cur.execute(f"DELETE FROM {TABLE}")
+        for i in range(0, len(ids), CHUNK):
+            _write(ids[i:i + CHUNK])
+    return len(ids)
+
+
+def reindex(ids) -> None:
+    """(Re)writes the index rows of the given entry ids; vanished ids are dropped."""
+    ids = sorted(set(ids))
+    if not ids or not available():
+        return
+    with transaction.atomic():
+        for i in range(0, len(ids), CHUNK):
+            chunk = ids[i:i + CHUNK]
+            _delete(chunk)
+            _write(chunk)
+
+
+def unindex(ids) -> None:
+    ids = sorted(set(ids))
+    if not ids or not available():
+        return
+    for i in range(0, len(ids), CHUNK):
+        _delete(ids[i:i + CHUNK])
+
+
+def _delete(ids) -> None:
+    marks = ",".join(["%s"] * len(ids))
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {TABLE} WHERE rowid IN ({marks})", ids)
+
+
+def _write(ids) -> None:
+    from .models import AssetAnalysis, FolderEntry
+
+    tags = {}
+    for entry_id, tag in FolderEntry.tags.through.objects.filter(folderentry_id__in=ids) \
+                                                         .values_list("folderentry_id", "tag__name"):
+        tags.setdefault(entry_id, []).append(tag)
+
+    textures = {}
+    for entry_id, data in AssetAnalysis.objects.filter(entry_id__in=ids).values_list("entry_id", "data"):
+        kinds = {t.get("type") for t in (data or {}).get("textures", []) if t.get("type") not in (None, "unknown")}
+        textures[entry_id] = " ".join(sorted(kinds))
+
+    rows = []
+    for entry_id, name, url, category, type_name in FolderEntry.objects.filter(id__in=ids).values_list(
+            "id", "name", "lnk_path", "category__name", "type__name"):
+        rows.append((
+            entry_id,
+            f"{name} {' '.join(split_words(name))}",
+            " ".join(tags.get(entry_id, [])),
+            " ".join(filter(None, [category, type_name])),
+            textures.get(entry_id, ""),
+            url or "",
+        ))
+    if rows:
+        with connection.cursor() as cur:
+            cur.executemany(f"INSERT INTO {TABLE}(rowid, name, tags, category, textures, url) "
+                            "VALUES (%s, %s, %s, %s, %s, %s)", rows)
+
+
+# ────────────────────────────────────────────────
+# Querying
+# ────────────────────────────────────────────────
+def apply_search(qs, query: str):
+    """
+    Restricts `qs` (FolderEntry queryset) to entries matching `query`.
+
+    Returns `(qs, ranked)`. The filter is an `id IN (… MATCH …)` subquery,
+    so the result stays usable for counts and as a subquery itself; when
+    `ranked`, pass the listing through `order_by_rank`. Falls back to a
+    substring filter on the case-folded name when FTS5 isn't available.
+    """
+    from .models import fold_name
+
+    expr = match_expression(query)
+    if expr is None or not available():
+        return qs.filter(name_lower__contains=fold_name(query)), False
+    return qs.filter(id__in=RawSQL(f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s", [expr])), True
+
+
+def order_by_rank(qs, query: str):
+    """
+    Orders a search result by bm25 rank, then name_lower / id.
+
+    Joins the FTS table (a correlated rank subquery is orders of magnitude
+    slower), so the returned queryset is for listing only — don't nest it
+    in another query.
+    """
+    return qs.extra(
+        select={"search_rank": f"{TABLE}.rank"},
+        tables=[TABLE],
+        where=[f"{TABLE}.rowid = library_folderentry.id", f"{TABLE} MATCH %s"],
+        params=[match_expression(query)],
+    ).order_by("search_rank", "name_lower", "id")
+
+
+def rank_after(qs, rank: float, name_lower: str, last_id: int):
+    """Rows of an `order_by_rank` listing strictly after (rank, name_lower, id) — the keyset seek."""
+    return qs.extra(
+        where=[f"({TABLE}.rank > %s OR ({TABLE}.rank = %s AND (library_folderentry.name_lower > %s OR "
+               "(library_folderentry.name_lower = %s AND library_folderentry.id > %s))))"],
+        params=[rank, rank, name_lower, name_lower, last_id],
+    )
@@ -0,0 +1,107 @@
+"""
+Keeps the full-text search index (library/search.py), the cached
+facets (library/facets.py) and the stats aggregates (library/stats.py)
+in step with edits made outside the sync — admin / UI changes to tags,
+categories and entries.
+Bulk writes from the sync don't fire these; it reindexes explicitly.
+Deleted entries need no handler: entry ids are never reused and search
+joins back to FolderEntry, so a leftover index row can't match.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import facets, search, stats
+from .models import AssetAnalysis, FolderEntry, ModelCategory, ModelType, Tag
+
+
+@receiver(post_save, sender=FolderEntry)
+def entry_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.reindex([instance.pk])
+
+
+@receiver(m2m_changed, sender=FolderEntry.tags.through)
+def entry_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+    if not reverse:                                   # entry.tags.add(...)
+        search.reindex([instance.pk])
+    elif action == "pre_clear":                       # tag.folderentry_set.clear()
+        instance._search_ids = list(instance.folderentry_set.values_list("id", flat=True))
+    else:
+        search.reindex(pk_set or getattr(instance, "_search_ids", []))
+
+
+@receiver(post_save, sender=AssetAnalysis)
+def analysis_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.reindex([instance.entry_id])
+
+
+# Renaming / deleting a tag, category or type changes the text of every entry using it
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=ModelCategory)
+@receiver(pre_delete, sender=ModelType)
+def facet_deleting(sender, instance, **kwargs):
+    instance._search_ids = _entry_ids(instance)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=ModelCategory)
+@receiver(post_save, sender=ModelType)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=ModelCategory)
+@receiver(post_delete, sender=ModelType)
+def facet_changed(sender, instance, created=False, raw=False, **kwargs):
+    if created or raw:
+        return
+    ids = getattr(instance, "_search_ids", None)
+    search.reindex(ids if ids is not None else _entry_ids(instance))
+
+
+def _entry_ids(instance) -> list:
+    if isinstance(instance, Tag):
+        return list(instance.folderentry_set.values_list("id", flat=True))
+    return list(instance.entries.values_list("id", flat=True))
+
+
+# Any change to the browse tables invalidates cached facets, counts and API ETags —
+# once per transaction, however many rows it saves (see facets.bump_version)
+@receiver(post_save, sender=FolderEntry)
+@receiver(post_delete, sender=FolderEntry)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=ModelCategory)
+@receiver(post_delete, sender=ModelCategory)
+@receiver(post_save, sender=ModelType)
+@receiver(post_delete, sender=ModelType)
+@receiver(m2m_changed, sender=FolderEntry.tags.through)
+def browse_data_changed(sender, raw=False, action="post", **kwargs):
+    if not raw and action.startswith("post"):
+        facets.bump_version()
+
+
+# An analysis changes no facet or count — only the API responses that embed it
+@receiver(post_save, sender=AssetAnalysis)
+def analysis_changed(sender, raw=False, **kwargs):
+    if not raw:
+        facets.bump_analysis_version()
+
+
+# Type / category / analysis changes move an entry between stats buckets
+@receiver(post_save, sender=FolderEntry)
+def entry_stats_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        stats.refresh_entries([instance.pk])
+
+
+@receiver(post_save, sender=AssetAnalysis)
+def analysis_stats_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        stats.refresh_entries([instance.entry_id])
+
+
+@receiver(post_delete, sender=ModelCategory)
+@receiver(post_delete, sender=ModelType)
+def facet_stats_deleted(sender, instance, **kwargs):
+    stats.refresh_entries(getattr(instance, "_search_ids", []))     # collected in facet_deleting
@@ -0,0 +1,260 @@
+"""
+Boot timing and the deferred warm-up.
+
+`LibraryConfig.ready` only connects signals and reads `.env`, so a server
+process is up as soon as Django is loaded and serves the existing index.
+What used to run there — makemigrations / migrate, seeding the ROOT_DIR
+setting and glTF type, and a full folder sync — is the *warm-up*, started
+from the WSGI / ASGI module (`on_server_start`) as `LIBRARY_STARTUP` says:
+
+    deferred   on a daemon thread right after boot; only the sync waits
+               `LIBRARY_WARMUP_DELAY` seconds
+    blocking   before the first request (the old behaviour)
+    off        never — run `manage.py warmup` as a deploy step instead
+
+In deferred mode nothing may query a schema that isn't migrated yet:
+`SchemaGateMiddleware` answers 503 until `schema_ready()` — set once the
+warm-up has migrated, or once this process finds the migrations applied
+(by another worker, or by an earlier deployment).
+
+The warm-up runs once per *deployment*, not per process: the first process
+to create `LIBRARY_STATE_DIR/warmup.lock` does the work and records the
+deployment id in `warmup.done`; every other worker (and every later
+autoreload) sees the marker or the live lock and skips. The lock is
+touched while the sync jobs run; one untouched for `LIBRARY_WARMUP_STALE`
+seconds belongs to a dead process and is broken.
+
+The deployment id is `LIBRARY_DEPLOYMENT_ID` when set, else APP_VERSION
+plus the models.py mtime — a release or a model change warms up again.
+
+`PHASES` collects how long each boot / warm-up step took in this process;
+`manage.py startup_report` breaks a cold start down further.
+"""
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db   import DatabaseError, connection
+
+# (label, seconds) for each timed step of this process's boot / warm-up.
+PHASES = []
+
+# Seconds between lock heartbeats / job polls while the warm-up sync runs.
+POLL_INTERVAL = 2.0
+
+# Minimum seconds between schema checks while requests are held off.
+SCHEMA_RECHECK = 1.0
+
+_started      = threading.Event()     # on_server_start ran in this process
+_schema_ready = threading.Event()     # migrations are applied; requests may query
+_checked_at   = 0.0
+
+
+@contextmanager
+def phase(label: str):
+    """Times the block and appends it to `PHASES`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASES.append((label, time.perf_counter() - started))
+
+
+# ────────────────────────────────────────────────
+# Entry points
+# ────────────────────────────────────────────────
+def on_server_start() -> None:
+    """Called by the WSGI / ASGI module once the app is loaded; starts the warm-up per `LIBRARY_STARTUP`."""
+    if _started.is_set():
+        return
+    _started.set()
+
+    mode = getattr(settings, "LIBRARY_STARTUP", "deferred")
+    if mode == "blocking":
+        run_warmup()
+    elif mode == "deferred":
+        delay = getattr(settings, "LIBRARY_WARMUP_DELAY", 5.0)
+        threading.Thread(target=_deferred, args=(delay,), name="library-warmup", daemon=True).start()
+        print(f"[Library] Migrating now — serving the existing index once done, sync in {delay:g}s.")
+
+
+def _deferred(sync_delay: float) -> None:
+    try:
+        run_warmup(sync_delay=sync_delay)
+    except Exception:
+        traceback.print_exc()
+    finally:
+        connection.close()
+
+
+def run_warmup(*, force: bool = False, sync_delay: float = 0) -> bool:
+    """
+    Migrates, seeds and — `sync_delay` seconds later — syncs every enabled
+    root, unless this deployment is already warm or another process holds
+    the lock. The lock is kept (and heart-beaten) until the sync jobs
+    finish. Returns True if it ran.
+    """
+    state = _state_dir()
+    state.mkdir(parents=True, exist_ok=True)
+    lock, done = state / "warmup.lock", state / "warmup.done"
+    deployment = deployment_id()
+
+    if not force and _read(done) == deployment:
+        _schema_ready.set()
+        print(f"[Library] Warm-up of {deployment} already done — skipping.")
+        return False
+    if not _acquire(lock):
+        print("[Library] Warm-up is running in another process — skipping.")
+        return False
+    try:
+        if not force and _read(done) == deployment:       # finished while we checked
+            _schema_ready.set()
+            return False
+        started, first = time.perf_counter(), len(PHASES)
+        print(f"[Library] Warm-up of {deployment} …")
+        with phase("warm-up: migrate"):
+            if not _migrate():
+                return False
+        with phase("warm-up: seed"):
+            _seed()
+        _schema_ready.set()
+        time.sleep(sync_delay)
+        with phase("warm-up: sync"):
+            _sync(lock)
+        done.write_text(deployment, encoding="utf-8")
+        steps = ", ".join(f"{label.removeprefix('warm-up: ')} {secs:.2f}s" for label, secs in PHASES[first:])
+        print(f"[Library] Warm-up done in {time.perf_counter() - started:.2f}s ({steps}).")
+        return True
+    finally:
+        lock.unlink(missing_ok=True)
+
+
+def is_warm() -> bool:
+    """Whether this deployment's warm-up has completed."""
+    return _read(_state_dir() / "warmup.done") == deployment_id()
+
+
+def schema_ready() -> bool:
+    """Whether requests may query the database (no database access — safe on the event loop)."""
+    return (_schema_ready.is_set() or not _started.is_set()
+            or getattr(settings, "LIBRARY_STARTUP", "deferred") != "deferred")
+
+
+def check_schema() -> bool:
+    """Looks (at most every `SCHEMA_RECHECK` s) whether the migrations were applied meanwhile."""
+    global _checked_at
+    if schema_ready():
+        return True
+    now = time.monotonic()
+    if now - _checked_at < SCHEMA_RECHECK:
+        return False
+    _checked_at = now
+
+    from django.db.migrations.executor import MigrationExecutor
+
+    from .models import FolderEntry
+
+    try:
+        # No library migrations on disk yet reads as an empty plan → check the table too
+        if FolderEntry._meta.db_table not in connection.introspection.table_names():
+            return False
+        executor = MigrationExecutor(connection)
+        if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            return False
+    except DatabaseError:
+        return False
+    _schema_ready.set()
+    return True
+
+
+def deployment_id() -> str:
+    explicit = getattr(settings, "LIBRARY_DEPLOYMENT_ID", "")
+    if explicit:
+        return explicit
+    models_py = Path(__file__).with_name("models.py")
+    return f"{getattr(settings, 'APP_VERSION', 'dev')}-{models_py.stat().st_mtime_ns}"
+
+
+# ────────────────────────────────────────────────
+# Steps
+# ────────────────────────────────────────────────
+def _migrate() -> bool:
+    from django.core.management import call_command
+
+    try:
+        call_command("makemigrations", "library", interactive=False, verbosity=0)
+        call_command("migrate",        interactive=False, verbosity=0)
+    except Exception as exc:
+        print(f"[Library] Migration error: {exc}")
+        return False
+    return True
+
+
+def _seed() -> None:
+    from django.apps import apps
+
+    from . import roots
+    from .models import AppSetting, FolderEntry, ModelType
+
+    # ROOT_DIR seeds the first LibraryRoot on fresh installs
+    default_root = os.getenv("DEFAULT_ROOT_DIR", r"C:\Fallback\Downloads")
+    AppSetting.objects.get_or_create(key="ROOT_DIR", defaults={"value": default_root})
+    ModelType.objects.get_or_create(code="gltf", defaults={"name": "glTF"})
+    apps.get_app_config("library").backfill_name_lower(FolderEntry)
+    roots.ensure_default_root()
+
+
+def _sync(lock: Path) -> None:
+    """Queues a background sync job per enabled root and heart-beats the lock until they end."""
+    from . import jobs
+    from .models import LibraryRoot, SyncJob
+
+    pending = set()
+    for root in LibraryRoot.objects.filter(enabled=True):
+        job, _ = jobs.start_sync(root)
+        pending.add(job.pk)
+    while pending:
+        time.sleep(POLL_INTERVAL)
+        os.utime(lock)
+        pending &= set(SyncJob.objects.filter(pk__in=pending, status__in=SyncJob.ACTIVE)
+                                      .values_list("pk", flat=True))
+
+
+# ────────────────────────────────────────────────
+# Lock / marker files
+# ────────────────────────────────────────────────
+def _acquire(lock: Path) -> bool:
+    """Creates `lock` exclusively; breaks it first when its heartbeat is stale."""
+    stale = getattr(settings, "LIBRARY_WARMUP_STALE", 600)
+    for _ in range(2):
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                age = time.time() - lock.stat().st_mtime
+            except FileNotFoundError:
+                continue                                   # released meanwhile — retry
+            if age < stale:
+                return False
+            print(f"[Library] Breaking stale warm-up lock ({age:.0f}s old).")
+            lock.unlink(missing_ok=True)
+            continue
+        with os.fdopen(fd, "w") as fh:
+            fh.write(f"{os.getpid()}\n")
+        return True
+    return False
+
+
+def _state_dir() -> Path:
+    return Path(getattr(settings, "LIBRARY_STATE_DIR", Path(settings.BASE_DIR) / "state"))
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except OSError:
+        return ""
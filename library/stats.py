@@ -0,0 +1,200 @@
+"""
+Precomputed library statistics for the /stats/ dashboard.
+
+Aggregates live in `LibraryStat` rows, one per (group, key) bucket:
+
+    total         ""                 all entries: count, bytes, triangles
+    type          ModelType id       count, bytes, triangles per type
+    category      ModelCategory id   same per category ("" = none)
+    triangles     "< 1K" … "≥ 1M"    entry count / bytes per triangle range
+    texture_res   "512" … "8K+"      texture count / bytes per resolution
+
+Each entry's share is remembered in its `EntryStats` row. When an entry's
+sync data (type, folder size from the scan's stat walk) or analysis
+change, `refresh_entries` subtracts the old share and adds the new one
+with F() updates, so the dashboard reads a few dozen rows however large
+the library is, and nothing is ever re-analysed to render it. Deleted
+entries are subtracted by the writers (sync, `refresh_entries`), never by
+the read path. `rebuild` recomputes everything from scratch
+(`manage.py rebuild_stats`).
+"""
+from collections import defaultdict
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import F
+
+from . import facets
+
+CHUNK = 500
+
+# (upper bound exclusive, label); None = open-ended
+TRIANGLE_BUCKETS = [(1_000, "< 1K"), (10_000, "1K–10K"), (100_000, "10K–100K"),
+                    (1_000_000, "100K–1M"), (None, "≥ 1M")]
+# (largest side inclusive, label)
+TEXTURE_BUCKETS  = [(256, "256"), (512, "512"), (1024, "1K"), (2048, "2K"),
+                    (4096, "4K"), (None, "8K+")]
+UNKNOWN = "?"
+
+SNAPSHOT_FIELDS = ["type_key", "category_key", "bytes", "triangles", "textures"]
+
+
+def triangle_bucket(n) -> str:
+    if n is None:
+        return UNKNOWN
+    return next(label for bound, label in TRIANGLE_BUCKETS if bound is None or n < bound)
+
+
+def texture_bucket(dimensions) -> str:
+    """Bucket of a "W×H" string from the texture analysis."""
+    try:
+        side = max(int(v) for v in str(dimensions).split("×"))
+    except ValueError:
+        return UNKNOWN
+    return next(label for bound, label in TEXTURE_BUCKETS if bound is None or side <= bound)
+
+
+# ────────────────────────────────────────────────
+# Per-entry contributions
+# ────────────────────────────────────────────────
+def snapshot(entry) -> dict:
+    """EntryStats field values for `entry` (load it with select_related("analysis"))."""
+    try:
+        data = entry.analysis.data
+    except ObjectDoesNotExist:
+        data = None
+    analysed = bool(data) and not data.get("error")
+    return {
+        "type_key":     str(entry.type_id or ""),
+        "category_key": str(entry.category_id or ""),
+        "bytes":        entry.disk_bytes,
+        "triangles":    data.get("triangle_count") if analysed else None,
+        "textures":     [[texture_bucket(t.get("dimensions")), int((t.get("size") or 0) * 1048576)]
+                         for t in (data or {}).get("textures", [])],
+    }
+
+
+def _accumulate(delta, rec, sign: int) -> None:
+    tris = rec.triangles or 0
+    for group, key in (("total", ""), ("type", rec.type_key), ("category", rec.category_key)):
+        d = delta[group, key]
+        d[0] += sign; d[1] += sign * rec.bytes; d[2] += sign * tris
+    d = delta["triangles", triangle_bucket(rec.triangles)]
+    d[0] += sign; d[1] += sign * rec.bytes; d[2] += sign * tris
+    for bucket_label, size in rec.textures:
+        d = delta["texture_res", bucket_label]
+        d[0] += sign; d[1] += sign * size
+
+
+def _apply(delta) -> None:
+    from .models import LibraryStat
+
+    for (group, key), (n, size, tris) in delta.items():
+        if not (n or size or tris):
+            continue
+        updated = LibraryStat.objects.filter(group=group, key=key).update(
+            count=F("count") + n, bytes=F("bytes") + size, triangles=F("triangles") + tris)
+        if not updated:
+            LibraryStat.objects.create(group=group, key=key, count=n, bytes=size, triangles=tris)
+    LibraryStat.objects.filter(count__lte=0).delete()
+
+
+# ────────────────────────────────────────────────
+# Maintenance
+# ────────────────────────────────────────────────
+def refresh_entries(ids) -> int:
+    """Re-derives the share of the given entries; returns how many changed."""
+    from .models import EntryStats, FolderEntry
+
+    ids, changed = list(ids), 0
+    with transaction.atomic():
+        collect_orphans()
+        for i in range(0, len(ids), CHUNK):
+            chunk   = ids[i:i + CHUNK]
+            current = {s.entry_id: s for s in EntryStats.objects.filter(entry_id__in=chunk)}
+            delta   = defaultdict(lambda: [0, 0, 0])
+            to_create, to_update = [], []
+            for entry in FolderEntry.objects.filter(id__in=chunk).select_related("analysis"):
+                new = snapshot(entry)
+                rec = current.get(entry.id)
+                if rec is None:
+                    rec = EntryStats(entry=entry, **new)
+                    to_create.append(rec)
+                elif any(getattr(rec, f) != v for f, v in new.items()):
+                    _accumulate(delta, rec, -1)
+                    for f, v in new.items():
+                        setattr(rec, f, v)
+                    to_update.append(rec)
+                else:
+                    continue
+                _accumulate(delta, rec, +1)
+            EntryStats.objects.bulk_create(to_create, batch_size=CHUNK)
+            EntryStats.objects.bulk_update(to_update, SNAPSHOT_FIELDS, batch_size=CHUNK)
+            _apply(delta)
+            changed += len(to_create) + len(to_update)
+    return changed
+
+
+def collect_orphans() -> int:
+    """Subtracts the share of deleted entries (their EntryStats.entry is NULL)."""
+    from .models import EntryStats
+
+    orphans = list(EntryStats.objects.filter(entry__isnull=True))
+    if orphans:
+        delta = defaultdict(lambda: [0, 0, 0])
+        for rec in orphans:
+            _accumulate(delta, rec, -1)
+        with transaction.atomic():
+            _apply(delta)
+            EntryStats.objects.filter(id__in=[r.id for r in orphans]).delete()
+    return len(orphans)
+
+
+def rebuild() -> int:
+    """Drops and recomputes every aggregate; returns the number of entries."""
+    from .models import EntryStats, FolderEntry, LibraryStat
+
+    with transaction.atomic():
+        EntryStats.objects.all().delete()
+        LibraryStat.objects.all().delete()
+        ids = list(FolderEntry.objects.values_list("id", flat=True))
+        refresh_entries(ids)
+    return len(ids)
+
+
+# ────────────────────────────────────────────────
+# Dashboard
+# ────────────────────────────────────────────────
+def dashboard(top: int = 10) -> dict:
+    """Everything the stats page shows, from the aggregate rows only."""
+    from .models import EntryStats, LibraryStat
+
+    groups = defaultdict(dict)
+    for row in LibraryStat.objects.all():
+        groups[row.group][row.key] = row
+
+    names = facets.facet_lists()
+    type_names = {str(t["id"]): t["name"] for t in names["types"]}
+    cat_names  = {str(c["id"]): c["name"] for c in names["categories"]}
+
+    def rows(group, labels=None, order=None):
+        found = groups.get(group, {})
+        keys  = order if order is not None else sorted(found, key=lambda k: -found[k].bytes)
+        items = [found[k] for k in keys if k in found]
+        peak  = max((r.count for r in items), default=0) or 1
+        return [{"label": (labels or {}).get(r.key, r.key) or "(none)", "count": r.count,
+                 "bytes": r.bytes, "triangles": r.triangles, "pct": round(100 * r.count / peak)}
+                for r in items]
+
+    total = groups.get("total", {}).get("")
+    return {
+        "total":       total,
+        "by_type":     rows("type", type_names),
+        "by_category": rows("category", cat_names),
+        "triangles":   rows("triangles", order=[label for _, label in TRIANGLE_BUCKETS] + [UNKNOWN]),
+        "texture_res": rows("texture_res", order=[label for _, label in TEXTURE_BUCKETS] + [UNKNOWN]),
+        "largest":     EntryStats.objects.filter(entry__isnull=False).select_related("entry")
+                                         .order_by("-bytes")[:top],
+        "heaviest":    EntryStats.objects.filter(triangles__isnull=False).select_related("entry")
+                                         .order_by("-triangles")[:top],
+    }
@@ -0,0 +1,67 @@
+"""Shared fixtures for the library test modules."""
+import os
+import shutil
+import tempfile
+
+from django.apps import apps
+from django.core.cache import cache
+from django.test import TestCase
+
+from library import search
+from library.models import FolderEntry, LibraryRoot, ModelType
+
+
+class TempDirMixin:
+    """ A scratch directory per test, removed afterwards. """
+
+    def setUp(self):
+        super().setUp()
+        self.dir = tempfile.mkdtemp(prefix="library-test-")
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+
+    def write(self, rel: str, data: bytes = b"") -> str:
+        path = os.path.join(self.dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(data)
+        return path
+
+
+class LibraryTestCase(TestCase):
+    """ TestCase with the FTS table in place and an empty cache per test. """
+
+    @classmethod
+    def setUpClass(cls):
+        # The FTS table is DDL: created inside a test's transaction it would roll back with it
+        search.available()
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+class SyncMixin(TempDirMixin):
+    """ A library root under the scratch directory, synced with thumbnails kept there too. """
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(self.settings(MEDIA_ROOT=os.path.join(self.dir, "media"),
+                                        LIBRARY_DERIVATIVE_PREBUILD=(),
+                                        LIBRARY_PRECOMPRESS_ON_SYNC=False,
+                                        LIBRARY_HASH_ON_SYNC=False))
+        self.gltf = ModelType.objects.create(code="GLTF", name="glTF")
+        self.root = LibraryRoot.objects.create(name="Share", path=os.path.join(self.dir, "lib"))
+        os.makedirs(self.root.path)
+
+    def add_folder(self, name: str, files: dict | None = None) -> str:
+        """`name/name.jpeg` and `name/name.gltf`, plus `files` keyed by path under the folder."""
+        self.write(f"lib/{name}/{name}.jpeg", b"jpeg")
+        self.write(f"lib/{name}/{name}.gltf", b'{"asset": {"version": "2.0"}}')
+        for rel, data in (files or {}).items():
+            self.write(f"lib/{name}/{rel}", data)
+        return os.path.join(self.root.path, name)
+
+    def sync(self, **kwargs):
+        return apps.get_app_config("library").sync_folders(
+            root=self.root, entry_cls=FolderEntry, type_gltf=self.gltf, **kwargs)
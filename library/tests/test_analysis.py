@@ -0,0 +1,35 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+from PIL import Image
+
+from library import analysis
+
+from .helpers import TempDirMixin
+
+
+class TextureAnalysisTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        folder = os.path.join(self.dir, "Chair")
+        self.entry = SimpleNamespace(path=folder, gltf_path=None)
+        os.makedirs(os.path.join(folder, "textures"))
+        Image.new("RGB", (64, 32)).save(os.path.join(folder, "textures", "wood_normal.png"))
+        self.write("Chair/textures/notes.txt", b"not a texture")
+        os.symlink(os.path.join(self.dir, "gone.png"), os.path.join(folder, "textures", "dangling.png"))
+
+    def test_unreadable_textures_are_skipped(self):
+        info = analysis.analyze_gltf_and_textures(self.entry)
+        self.assertEqual(info["texture_count"], 1)
+        self.assertEqual(info["textures"][0]["name"], "wood_normal.png")
+        self.assertEqual(info["textures"][0]["type"], "Normal")
+        self.assertEqual(info["textures"][0]["dimensions"], "64×32")
+
+    def test_async_path_skips_them_too(self):
+        info = asyncio.run(analysis.aanalyze_gltf_and_textures(self.entry))
+        self.assertEqual([t["name"] for t in info["textures"]], ["wood_normal.png"])
+
+    def test_missing_textures_folder(self):
+        self.assertEqual(analysis.texture_files(SimpleNamespace(path=os.path.join(self.dir, "nope"))), [])
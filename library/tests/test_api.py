@@ -0,0 +1,51 @@
+from django.urls import reverse
+
+from library.models import AssetAnalysis, FolderEntry, Tag
+
+from .helpers import LibraryTestCase
+
+
+class ConditionalGetTests(LibraryTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.entry = FolderEntry.objects.create(name="Chair", path="/lib/Chair")
+
+    def get(self, url, etag=None):
+        headers = {"If-None-Match": etag} if etag else {}
+        return self.client.get(url, headers=headers)
+
+    def test_unchanged_library_answers_304_without_queries(self):
+        url   = reverse("api_entries")
+        first = self.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first["ETag"].startswith('W/"'))
+        with self.assertNumQueries(0):
+            again = self.get(url, first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+        self.assertEqual(self.get(url, f'"other", {first["ETag"]}').status_code, 304)
+
+    def test_etag_depends_on_the_query(self):
+        etag = self.get(reverse("api_entries"))["ETag"]
+        self.assertEqual(self.get(reverse("api_entries") + "?q=chair", etag).status_code, 200)
+
+    def test_writes_change_the_etag(self):
+        url  = reverse("api_tags")
+        etag = self.get(url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name="Wood")
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t["name"] for t in response.json()["results"]], ["Wood"])
+
+    def test_analysis_writes_change_the_etag(self):
+        url  = reverse("api_entry", args=[self.entry.id]) + "?embed=analysis"
+        etag = self.get(url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            AssetAnalysis.objects.create(entry=self.entry, fingerprint="x", data={"triangle_count": 12})
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["analysis"], {"triangle_count": 12})
+
+    def test_only_get(self):
+        self.assertEqual(self.client.post(reverse("api_types")).status_code, 405)
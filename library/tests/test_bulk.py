@@ -0,0 +1,104 @@
+import json
+
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from library import search
+from library.bulk import BulkEditError, apply_bulk, resolve_tags
+from library.models import FolderEntry, LibraryStat, ModelCategory, ModelType, Tag
+
+from .helpers import LibraryTestCase
+
+
+class ResolveTagsTests(LibraryTestCase):
+    def test_matches_case_insensitively_and_creates_missing(self):
+        wood = Tag.objects.create(name="Wood")
+        tags = resolve_tags(["wood", " Metal ", "", "WOOD"], create=True)
+        self.assertEqual([t.name for t in tags], ["Wood", "Metal", "Wood"])
+        self.assertEqual(tags[0].pk, wood.pk)
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_reuses_a_tag_with_the_same_slug(self):
+        low = Tag.objects.create(name="low-poly")
+        self.assertEqual([t.pk for t in resolve_tags(["Low Poly"], create=True)], [low.pk])
+
+    def test_without_create_skips_unknown_names(self):
+        self.assertEqual(resolve_tags(["Nope"], create=False), [])
+        self.assertFalse(Tag.objects.exists())
+
+
+class ApplyBulkTests(LibraryTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.type  = ModelType.objects.create(code="GLTF", name="glTF")
+        cls.chair = ModelCategory.objects.create(name="Chairs", type=cls.type)
+        cls.old   = Tag.objects.create(name="Old")
+        cls.entries = [FolderEntry.objects.create(name=f"Chair {i}", path=f"/lib/Chair {i}", disk_bytes=10)
+                       for i in range(3)]
+        cls.entries[0].tags.add(cls.old)
+
+    def test_tags_and_category_in_one_go(self):
+        result = apply_bulk(FolderEntry.objects.all(), add_tags=["Wood", "wood"], remove_tags=["old"],
+                            set_category="chairs")
+        self.assertEqual(result, {"matched": 3, "tags_added": 3, "tags_removed": 1, "category_set": 3})
+        for entry in FolderEntry.objects.prefetch_related("tags"):
+            self.assertEqual([t.name for t in entry.tags.all()], ["Wood"])
+            self.assertEqual(entry.category_id, self.chair.id)
+
+        again = apply_bulk(FolderEntry.objects.all(), add_tags=["Wood"])
+        self.assertEqual(again["tags_added"], 0)                             # already tagged
+
+    def test_search_and_stats_follow(self):
+        apply_bulk(FolderEntry.objects.filter(id=self.entries[1].id), add_tags=["Walnut"],
+                   set_category=self.chair.id)
+        found, _ = search.apply_search(FolderEntry.objects.all(), "walnut")
+        self.assertEqual([e.id for e in found], [self.entries[1].id])
+        row = LibraryStat.objects.get(group="category", key=str(self.chair.id))
+        self.assertEqual((row.count, row.bytes), (1, 10))
+
+    def test_operations_apply_to_the_rows_matched_up_front(self):
+        tagged = FolderEntry.objects.filter(tags__name="Old")
+        result = apply_bulk(tagged, remove_tags=["Old"], set_category=self.chair.slug)
+        self.assertEqual(result["category_set"], 1)
+
+    def test_unknown_category_changes_nothing(self):
+        with self.assertRaises(BulkEditError):
+            apply_bulk(FolderEntry.objects.all(), add_tags=["Wood"], set_category="nope")
+        self.assertFalse(Tag.objects.filter(name="Wood").exists())
+
+
+@override_settings(LIBRARY_API_TOKEN="s3cret")
+class BulkEndpointTests(LibraryTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.entry = FolderEntry.objects.create(name="Chair", path="/lib/Chair")
+
+    def post(self, client, **headers):
+        return client.post(reverse("api_bulk"), json.dumps({"ids": [self.entry.id], "add_tags": ["Wood"]}),
+                           content_type="application/json", headers=headers)
+
+    def test_token(self):
+        client = Client(enforce_csrf_checks=True)
+        self.assertEqual(self.post(client, Authorization="Bearer s3cret").json()["tags_added"], 1)
+        self.assertEqual(self.post(client, Authorization="Bearer wrong").status_code, 403)
+
+    @override_settings(LIBRARY_API_TOKEN="")
+    def test_no_token_configured_rejects_bearer_requests(self):
+        self.assertEqual(self.post(Client(), Authorization="Bearer ").status_code, 403)
+
+    def test_browser_needs_the_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        self.assertEqual(self.post(client).status_code, 403)
+        self.assertFalse(Tag.objects.exists())
+
+        client.get(reverse("index"))
+        token = client.cookies["csrftoken"].value
+        self.assertEqual(self.post(client, X_CSRFToken=token).status_code, 200)
+
+    def test_bad_bodies(self):
+        client = Client()
+        response = client.post(reverse("api_bulk"), "[1]", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        response = client.post(reverse("api_bulk"), json.dumps({"ids": [1], "add_tags": [3]}),
+                               content_type="application/json")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,105 @@
+import os
+import random
+
+from django.test import SimpleTestCase
+from PIL import Image
+
+from library import dedupe
+from library.models import FolderEntry
+
+from .helpers import LibraryTestCase, TempDirMixin
+
+
+class BKTreeTests(SimpleTestCase):
+    def test_search_matches_brute_force(self):
+        rng    = random.Random(7)
+        values = [rng.getrandbits(64) for _ in range(300)]
+        values += [values[0] ^ 0b101, values[1] ^ 1, values[2]]        # near and exact neighbours
+        tree   = dedupe.BKTree()
+        for i, v in enumerate(values):
+            tree.add(v, i)
+        for query in values[:20]:
+            for radius in (0, 3, 12):
+                expected = {i for i, v in enumerate(values) if (v ^ query).bit_count() <= radius}
+                self.assertEqual({i for _, i in tree.search(query, radius)}, expected)
+
+    def test_empty_tree(self):
+        self.assertEqual(list(dedupe.BKTree().search(0, 64)), [])
+
+
+class HashingTests(TempDirMixin, SimpleTestCase):
+    def folder_hash(self, folder: str) -> str:
+        return dedupe.content_hash(dedupe.folder_files(os.path.join(self.dir, folder)))
+
+    def test_copies_match_whatever_the_folder_is_called(self):
+        for folder in ("Chair", "Chair copy"):
+            self.write(f"{folder}/{folder}.gltf", b'{"asset": {}}')
+            self.write(f"{folder}/textures/wood.png", b"png-bytes")
+            self.write(f"{folder}/{folder}.url", folder.encode())          # shortcut doesn't count
+        self.assertEqual(self.folder_hash("Chair"), self.folder_hash("Chair copy"))
+
+        self.write("Chair copy/textures/wood.png", b"png-bytez")
+        self.assertNotEqual(self.folder_hash("Chair"), self.folder_hash("Chair copy"))
+
+    def test_large_files_are_sampled(self):
+        size = dedupe.SAMPLE_FROM + 3 * dedupe.CHUNK_SIZE
+        data = bytearray(os.urandom(size))
+        path = self.write("big.bin", bytes(data))
+        base = dedupe.file_digest(path, size)
+
+        data[dedupe.CHUNK_SIZE + 10] ^= 0xFF                          # between the samples
+        self.write("big.bin", bytes(data))
+        self.assertEqual(dedupe.file_digest(path, size), base)
+
+        data[size // 2] ^= 0xFF                                       # inside the middle sample
+        self.write("big.bin", bytes(data))
+        self.assertNotEqual(dedupe.file_digest(path, size), base)
+
+    def test_dhash_is_close_for_a_re_render(self):
+        image = Image.linear_gradient("L").rotate(90).resize((128, 128))         # dark to light, left to right
+        image.save(os.path.join(self.dir, "a.png"))
+        image.point(lambda v: min(255, v + 6)).save(os.path.join(self.dir, "b.png"))
+        image.transpose(Image.Transpose.FLIP_LEFT_RIGHT).save(os.path.join(self.dir, "c.png"))
+        a, b, c = (int(dedupe.dhash(os.path.join(self.dir, f"{n}.png")), 16) for n in "abc")
+        self.assertLessEqual((a ^ b).bit_count(), 4)
+        self.assertGreater((a ^ c).bit_count(), 16)
+        self.assertEqual(dedupe.dhash(os.path.join(self.dir, "missing.png")), "")
+
+
+class ClusterTests(TempDirMixin, LibraryTestCase):
+    def entry(self, name: str, content: str, phash: int, size: int) -> FolderEntry:
+        return FolderEntry.objects.create(name=name, path=f"/lib/{name}", content_hash=content,
+                                          phash=f"{phash:016x}", disk_bytes=size, hash_fingerprint="x")
+
+    def test_only_identical_copies_are_reclaimable(self):
+        keep  = self.entry("Chair", "c1", 0xFF00, 500)
+        copy  = self.entry("Chair copy", "c1", 0xFF00, 500)
+        self.entry("Chair (re-export)", "c2", 0xFF01, 400)
+        clusters = dedupe.find_clusters(4)
+
+        exact = [c for c in clusters if c.exact]
+        self.assertEqual(len(exact), 1)
+        self.assertEqual({m["id"] for m in exact[0].members}, {keep.id, copy.id})
+        self.assertEqual(exact[0].reclaimable_bytes, 500)
+
+        similar = [c for c in clusters if not c.exact]
+        self.assertEqual(len(similar), 1)
+        self.assertEqual(similar[0].reclaimable_bytes, 0)
+        self.assertEqual(sum(c.reclaimable_bytes for c in clusters), 500)
+
+    def test_similar_clusters_use_complete_linkage(self):
+        # a–b and b–c are 3 bits apart, a–c 6: a chain, not a cluster of three
+        a = self.entry("A", "ha", 0b000000, 300)
+        b = self.entry("B", "hb", 0b000111, 200)
+        self.entry("C", "hc", 0b111111, 100)
+        clusters = dedupe.find_clusters(4)
+        self.assertEqual([{m["id"] for m in c.members} for c in clusters], [{a.id, b.id}])
+
+    def test_refresh_hashes_skips_unchanged_folders(self):
+        self.write("Chair/Chair.gltf", b'{"asset": {}}')
+        entry = FolderEntry.objects.create(name="Chair", path=os.path.join(self.dir, "Chair"))
+        self.assertEqual(dedupe.refresh_hashes([entry])["hashed"], 1)
+        entry.refresh_from_db()
+        self.assertTrue(entry.content_hash)
+        self.assertEqual(entry.disk_bytes, 13)
+        self.assertEqual(dedupe.refresh_hashes([entry])["fresh"], 1)
@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from library import facets
+from library.models import AssetAnalysis, FolderEntry, Tag
+
+from .helpers import LibraryTestCase
+
+
+class FacetCacheTests(LibraryTestCase):
+    def test_reading_the_version_costs_no_query(self):
+        facets.library_version()
+        with self.assertNumQueries(0):
+            facets.cache_key("facets")
+            facets.library_version()
+
+    def test_facets_are_cached_until_a_write_commits(self):
+        self.assertEqual(facets.facet_lists()["tags"], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Tag.objects.create(name="Wood")
+                self.assertEqual(facets.facet_lists()["tags"], [])     # not visible to others yet
+        self.assertEqual([t["name"] for t in facets.facet_lists()["tags"]], ["Wood"])
+
+    def test_one_bump_per_transaction(self):
+        before = facets.library_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                for name in ("Wood", "Metal", "Glass"):
+                    Tag.objects.create(name=name)
+                facets.bump_version()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(facets.library_version(), before + 1)
+
+    def test_rolled_back_writes_do_not_bump(self):
+        before = facets.library_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Tag.objects.create(name="Wood")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(facets.library_version(), before)
+
+    def test_analysis_writes_keep_the_facets(self):
+        entry = FolderEntry.objects.create(name="Chair", path="/lib/Chair")
+        facets.facet_lists()
+        version, analysis = facets.library_version(), facets.analysis_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            AssetAnalysis.objects.create(entry=entry, fingerprint="x", data={"triangle_count": 12})
+        self.assertEqual(facets.library_version(), version)
+        self.assertEqual(facets.analysis_version(), analysis + 1)
+
+    def test_lost_counter_never_goes_back(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            facets.bump_version()
+        before = facets.library_version()
+        cache.delete(facets.VERSION_KEY)
+        self.assertGreater(facets.library_version(), before)
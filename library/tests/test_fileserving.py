@@ -0,0 +1,72 @@
+import os
+from datetime import datetime, timezone
+
+from django.urls import reverse
+from django.utils.http import http_date
+
+from library.models import FolderEntry
+
+from .helpers import LibraryTestCase, TempDirMixin
+
+
+class RangeRequestTests(TempDirMixin, LibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.data  = bytes(range(256)) * 4                              # 1,024 bytes
+        self.write("Chair/Chair.bin", self.data)
+        entry      = FolderEntry.objects.create(name="Chair", path=os.path.join(self.dir, "Chair"))
+        self.url   = reverse("serve_file_direct", args=[entry.id, "Chair.bin"])
+        self.full  = self.client.get(self.url)
+
+    def test_full_response_advertises_ranges(self):
+        self.assertEqual(self.full.status_code, 200)
+        self.assertEqual(self.full["Accept-Ranges"], "bytes")
+        self.assertEqual(self.full["Content-Length"], "1024")
+        self.assertEqual(self.full.getvalue(), self.data)
+
+    def test_byte_range_is_206(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 100-199/1024")
+        self.assertEqual(response["Content-Length"], "100")
+        self.assertEqual(response.getvalue(), self.data[100:200])
+
+    def test_open_and_suffix_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=1000-")
+        self.assertEqual(response["Content-Range"], "bytes 1000-1023/1024")
+        self.assertEqual(response.getvalue(), self.data[1000:])
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-10")
+        self.assertEqual(response["Content-Range"], "bytes 1014-1023/1024")
+        self.assertEqual(response.getvalue(), self.data[-10:])
+
+    def test_end_past_size_is_clamped(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=1020-5000")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.getvalue(), self.data[1020:])
+
+    def test_unsatisfiable_range_is_416(self):
+        for header in ("bytes=1024-", "bytes=-0", "bytes=500-100"):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response["Content-Range"], "bytes */1024")
+
+    def test_if_range_with_current_validators_is_206(self):
+        for validator in (self.full["ETag"], self.full["Last-Modified"]):
+            with self.subTest(if_range=validator):
+                response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=validator)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response.getvalue(), self.data[:10])
+
+    def test_if_range_with_stale_validators_sends_whole_file(self):
+        stale_date = http_date(datetime.now(timezone.utc).timestamp() - 86_400)
+        for validator in ('"0-0"', stale_date):
+            with self.subTest(if_range=validator):
+                response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=validator)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn("Content-Range", response)
+                self.assertEqual(response.getvalue(), self.data)
+
+    def test_if_none_match_is_304(self):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=self.full["ETag"])
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,113 @@
+import base64
+import io
+import json
+import os
+import struct
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from library import gltf
+
+from .helpers import TempDirMixin
+
+
+def document(**extra) -> dict:
+    """One indexed triangle list (12 indices) and one 6-vertex strip."""
+    doc = {
+        "asset":     {"version": "2.0"},
+        "accessors": [{"count": 8}, {"count": 12}, {"count": 6}],
+        "meshes":    [{"primitives": [{"attributes": {"POSITION": 0}, "indices": 1},
+                                      {"attributes": {"POSITION": 2}, "mode": 5}]}],
+        "materials": [{}],
+    }
+    doc.update(extra)
+    return doc
+
+
+def glb(doc: dict, bin_size: int = 16) -> bytes:
+    text = json.dumps(doc).encode()
+    text += b" " * (-len(text) % 4)
+    body = struct.pack("<II", len(text), gltf.GLB_CHUNK_JSON) + text
+    body += struct.pack("<II", bin_size, gltf.GLB_CHUNK_BIN) + bytes(bin_size)
+    return b"glTF" + struct.pack("<II", 2, 12 + len(body)) + body
+
+
+class InspectTests(TempDirMixin, SimpleTestCase):
+    def test_counts(self):
+        info = gltf.inspect_gltf(self.write("a/a.gltf", json.dumps(document()).encode()))
+        self.assertEqual(info["container"], "gltf")
+        self.assertEqual((info["vertex_count"], info["triangle_count"]), (14, 4 + 4))
+        self.assertEqual((info["mesh_count"], info["primitive_count"], info["material_count"]), (1, 2, 1))
+
+    def test_glb(self):
+        info = gltf.inspect_gltf(self.write("a/a.glb", glb(document(), bin_size=64)))
+        self.assertEqual(info["container"], "glb")
+        self.assertEqual(info["glb_bin_bytes"], 64)
+        self.assertEqual(info["triangle_count"], 8)
+
+    def test_draw_modes(self):
+        self.assertEqual(gltf.triangle_count(gltf.MODE_TRIANGLES, 7), 2)
+        self.assertEqual(gltf.triangle_count(gltf.MODE_TRIANGLE_FAN, 2), 0)
+        self.assertEqual(gltf.triangle_count(1, 10), 0)                     # lines
+
+    def test_malformed_files(self):
+        for name, data in (("bad.gltf", b"{nope"), ("list.gltf", b"[]"), ("short.glb", b"glTF\x02"),
+                           ("shape.gltf", json.dumps({"meshes": [[]]}).encode())):
+            with self.subTest(name), self.assertRaises(gltf.GltfError):
+                gltf.inspect_gltf(self.write(name, data))
+
+
+class DataUriTests(TempDirMixin, SimpleTestCase):
+    def test_embedded_buffers_are_cut_out(self):
+        payload = "data:application/octet-stream;base64," + base64.b64encode(os.urandom(300_000)).decode()
+        doc     = document(buffers=[{"uri": payload, "byteLength": 300_000}],
+                           images=[{"uri": "data:image/png;base64,AAAA"}])
+        text    = json.dumps(doc).encode()
+        with mock.patch.object(gltf, "READ_CHUNK", 4096):
+            scrubbed = gltf.read_json(io.BytesIO(text))
+        self.assertLess(len(scrubbed), 1000)
+        parsed = json.loads(scrubbed)
+        self.assertEqual(parsed["buffers"], [{"uri": "data:", "byteLength": 300_000}])
+        self.assertEqual(parsed["images"], [{"uri": "data:"}])
+
+        info = gltf.inspect_gltf(self.write("a/a.gltf", text))
+        self.assertEqual(info["buffer_bytes"], 300_000)
+        self.assertEqual(info["external"], [])
+
+    def test_marker_split_across_chunks(self):
+        text = json.dumps(document(buffers=[{"uri": "data:;base64," + "A" * 50}])).encode()
+        split = text.index(b'"data:') + 3
+        for size in range(1, 12):
+            with self.subTest(size), mock.patch.object(gltf, "READ_CHUNK", max(1, split - size)):
+                self.assertEqual(json.loads(gltf.read_json(io.BytesIO(text)))["buffers"][0]["uri"], "data:")
+
+    def test_escaped_quotes_are_left_alone(self):
+        text = json.dumps({"asset": {"copyright": 'see "data:x" here'}}).encode()
+        self.assertEqual(json.loads(gltf.read_json(io.BytesIO(text))), json.loads(text))
+
+    def test_glb_chunk_length_is_respected(self):
+        data = glb(document(buffers=[{"uri": "data:;base64," + "A" * 5000}]))
+        info = gltf.inspect_gltf(self.write("a/a.glb", data))
+        self.assertEqual(info["triangle_count"], 8)
+
+    def test_document_size_cap(self):
+        with mock.patch.object(gltf, "MAX_DOC_BYTES", 1000), mock.patch.object(gltf, "READ_CHUNK", 256):
+            with self.assertRaises(gltf.GltfError):
+                gltf.read_json(io.BytesIO(json.dumps({"nodes": [{}] * 1000}).encode()))
+
+
+class ExternalRefTests(TempDirMixin, SimpleTestCase):
+    def test_refs_stay_inside_the_asset_folder(self):
+        self.write("a/scene.bin", bytes(40))
+        self.write("a/tex/wood%201.png", bytes(7))
+        self.write("secret.bin", bytes(99))
+        doc  = {"buffers": [{"uri": "scene.bin"}, {"uri": "../secret.bin"}, {"uri": "gone.bin"}],
+                "images":  [{"uri": "tex/wood%25201.png"}, {"uri": "/etc/passwd"}]}
+        refs = {r["uri"]: r for r in gltf.external_refs(doc, os.path.join(self.dir, "a"))}
+
+        self.assertEqual(refs["scene.bin"]["size"], 40)
+        self.assertEqual(refs["tex/wood%25201.png"]["size"], 7)
+        self.assertEqual((refs["gone.bin"]["exists"], refs["gone.bin"]["outside"]), (False, False))
+        for uri in ("../secret.bin", "/etc/passwd"):
+            self.assertEqual((refs[uri]["size"], refs[uri]["outside"]), (None, True))
@@ -0,0 +1,46 @@
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+from PIL import Image
+
+from library import imageprobe
+
+from .helpers import TempDirMixin
+
+
+class ProbeTests(TempDirMixin, SimpleTestCase):
+    def save(self, name: str, image: Image.Image, **params) -> str:
+        path = os.path.join(self.dir, name)
+        image.save(path, **params)
+        return path
+
+    def test_png_header(self):
+        info = imageprobe.probe_image(self.save("a.png", Image.new("RGBA", (300, 200))))
+        self.assertEqual((info.format, info.dimensions, info.bit_depth, info.channels), ("PNG", "300×200", 8, 4))
+        info = imageprobe.probe_image(self.save("g.png", Image.new("I;16", (5, 7))))
+        self.assertEqual((info.bit_depth, info.channels), (16, 1))
+
+    def test_jpeg_frame_after_other_segments(self):
+        path = self.save("a.jpg", Image.new("RGB", (640, 480)), exif=Image.Exif(), progressive=True)
+        with mock.patch.object(imageprobe, "_pillow") as pillow:
+            info = imageprobe.probe_image(path)
+        pillow.assert_not_called()
+        self.assertEqual((info.format, info.dimensions, info.bit_depth, info.channels), ("JPEG", "640×480", 8, 3))
+
+    def test_unreadable_headers_fall_back_to_pillow(self):
+        fallback = imageprobe.ImageInfo("PNG", 1, 1)
+        png  = self.write("short.png", imageprobe.PNG_SIGNATURE + b"\0\0\0\x0dIHDR")
+        bad  = self.write("chunk.png", imageprobe.PNG_SIGNATURE + b"\0" * 25)
+        jpeg = self.write("cut.jpg", b"\xff\xd8\xff\xe0\x00")
+        for path in (png, bad, jpeg):
+            with self.subTest(os.path.basename(path)), \
+                 mock.patch.object(imageprobe, "_pillow", return_value=fallback) as pillow:
+                self.assertIs(imageprobe.probe_image(path), fallback)
+                pillow.assert_called_once()
+
+    def test_other_formats_and_non_images(self):
+        info = imageprobe.probe_image(self.save("a.bmp", Image.new("L", (9, 4))))
+        self.assertEqual((info.format, info.dimensions, info.channels), ("BMP", "9×4", 1))
+        self.assertIsNone(imageprobe.probe_image(self.write("notes.png", b"hello")))
+        self.assertIsNone(imageprobe.probe_image(os.path.join(self.dir, "missing.png")))
@@ -0,0 +1,95 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from library import jobs, search
+from library.apps import LibraryConfig, SyncReport
+from library.models import LibraryRoot, SyncJob
+
+
+def fake_sync(seconds: float, *, reports: int = 1):
+    """A sync_folders stand-in: `reports` progress calls, then a silent phase of `seconds`."""
+    def sync_folders(self, *, root, entry_cls, type_gltf, progress=None, **kwargs):
+        report = SyncReport(scanned=reports)
+        for done in range(1, reports + 1):
+            if progress:
+                progress("scanning", done, reports, report)
+            time.sleep(0.05)
+        time.sleep(seconds)                         # e.g. hashing: no progress reports at all
+        return report
+    return sync_folders
+
+
+def wait_for_workers(timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    for thread in threading.enumerate():
+        if thread.name.startswith("library-sync-"):
+            thread.join(max(0, deadline - time.monotonic()))
+
+
+class SyncJobLifecycleTests(TransactionTestCase):
+    # Workers run on their own threads and connections → committed data only
+
+    def setUp(self):
+        search.available()
+        self.root = LibraryRoot.objects.create(name="Share", path="/lib")
+        self.addCleanup(wait_for_workers)
+
+    def test_job_runs_to_done(self):
+        with mock.patch.object(LibraryConfig, "sync_folders", fake_sync(0)):
+            job, created = jobs.start_sync(self.root)
+            self.assertTrue(created)
+            wait_for_workers()
+        job.refresh_from_db()
+        self.assertEqual(job.status, SyncJob.DONE)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_second_start_returns_the_active_job(self):
+        with mock.patch.object(LibraryConfig, "sync_folders", fake_sync(0.5)):
+            first, _ = jobs.start_sync(self.root)
+            again, created = jobs.start_sync(self.root)
+            wait_for_workers()
+        self.assertFalse(created)
+        self.assertEqual(again.pk, first.pk)
+
+    def test_cancel_while_running(self):
+        with mock.patch.object(LibraryConfig, "sync_folders", fake_sync(0, reports=60)), \
+             mock.patch.object(jobs, "PROGRESS_INTERVAL", 0):
+            job, _ = jobs.start_sync(self.root)
+            time.sleep(0.3)
+            self.assertTrue(jobs.cancel_sync(job.pk))
+            wait_for_workers()
+        job.refresh_from_db()
+        self.assertEqual(job.status, SyncJob.CANCELLED)
+
+    @override_settings(LIBRARY_SYNC_STALE_AFTER=0.6)
+    def test_slow_phase_is_not_expired_as_stale(self):
+        with mock.patch.object(LibraryConfig, "sync_folders", fake_sync(2.0)):
+            job, _ = jobs.start_sync(self.root)
+            time.sleep(1.2)                         # two stale timeouts without a progress report
+            again, created = jobs.start_sync(self.root)
+            self.assertFalse(created)
+            self.assertEqual(again.pk, job.pk)
+
+            # …whether judged from this process or from another one
+            with mock.patch.object(jobs, "_live", set()):
+                self.assertEqual(jobs.expire_stale_jobs(), 0)
+            wait_for_workers()
+        job.refresh_from_db()
+        self.assertEqual(job.status, SyncJob.DONE)
+        self.assertEqual(SyncJob.objects.filter(root=self.root).count(), 1)
+
+    @override_settings(LIBRARY_SYNC_STALE_AFTER=60)
+    def test_job_of_a_dead_worker_is_expired(self):
+        orphan = SyncJob.objects.create(root=self.root, status=SyncJob.RUNNING)
+        SyncJob.objects.filter(pk=orphan.pk).update(updated_at=timezone.now() - timedelta(minutes=5))
+        with mock.patch.object(LibraryConfig, "sync_folders", fake_sync(0)):
+            job, created = jobs.start_sync(self.root)
+            wait_for_workers()
+        self.assertTrue(created)
+        orphan.refresh_from_db()
+        self.assertEqual(orphan.status, SyncJob.FAILED)
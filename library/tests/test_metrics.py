@@ -0,0 +1,21 @@
+import logging
+import os
+
+from django.test import SimpleTestCase
+
+from library.metrics import SlowLogHandler
+
+from .helpers import TempDirMixin
+
+
+class SlowLogHandlerTests(TempDirMixin, SimpleTestCase):
+    def test_log_directory_is_created_on_first_write(self):
+        path    = os.path.join(self.dir, "logs", "slow_requests.log")
+        handler = SlowLogHandler(path, maxBytes=1024, backupCount=1, encoding="utf-8")
+        self.addCleanup(handler.close)
+        self.assertFalse(os.path.exists(os.path.dirname(path)))
+
+        handler.emit(logging.makeLogRecord({"msg": "GET /slow/ 1.2s", "levelno": logging.WARNING}))
+        handler.flush()
+        with open(path, encoding="utf-8") as fh:
+            self.assertIn("GET /slow/", fh.read())
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+from django.urls import reverse
+
+from library import search
+from library.models import FolderEntry
+from library.pagination import encode_cursor
+
+from .helpers import LibraryTestCase
+
+
+class CursorPaginationTests(LibraryTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for i in range(23):
+            FolderEntry.objects.create(
+                name=f"Chair {i % 7:02d}", path=f"/lib/Chair_{i}",
+                # repeated names and dates exercise the id tie-break; every 5th is undated
+                obtained_on=None if i % 5 == 0 else start + timedelta(days=i % 4),
+            )
+
+    def walk(self, params: dict, limit: int = 4) -> list:
+        """Ids of every page of /api/entries/, following the cursor."""
+        ids, cursor = [], None
+        while True:
+            response = self.client.get(reverse("api_entries"),
+                                       {**params, "limit": limit, **({"cursor": cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            body    = response.json()
+            ids    += [row["id"] for row in body["results"]]
+            cursor  = body["cursor"]
+            if not cursor:
+                return ids
+
+    def test_name_pages_cover_every_entry_once_in_order(self):
+        entries  = FolderEntry.objects.all()
+        expected = [e.id for e in sorted(entries, key=lambda e: (e.name_lower, e.id))]
+        self.assertEqual(self.walk({"sort": "name"}), expected)
+
+    def test_newest_pages_end_with_the_undated_entries(self):
+        entries  = FolderEntry.objects.all()
+        dated    = sorted((e for e in entries if e.obtained_on), key=lambda e: (e.obtained_on, e.id), reverse=True)
+        undated  = sorted((e.id for e in entries if not e.obtained_on), reverse=True)
+        self.assertEqual(self.walk({"sort": "newest"}), [e.id for e in dated] + undated)
+
+    def test_ranked_search_pages(self):
+        if not search.available():
+            self.skipTest("SQLite without FTS5")
+        qs, ranked = search.apply_search(FolderEntry.objects.all(), "chair")
+        self.assertTrue(ranked)
+        expected = [e.id for e in search.order_by_rank(qs, "chair")]
+        self.assertEqual(len(expected), 23)
+        self.assertEqual(self.walk({"q": "chair"}), expected)
+
+    def test_bad_cursor_is_400(self):
+        bad = [
+            "not-a-cursor",
+            encode_cursor(["k", "chair 01", -5]),               # negative id
+            encode_cursor(["o", 40, None]),                     # old offset cursor
+            encode_cursor(["r", [0.5, "chair 01"], 3]),         # ranked cursor on a plain listing
+            encode_cursor(["k", 17, 3]),                        # name sort expects a string
+        ]
+        for cursor in bad:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse("api_entries"), {"cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "Invalid cursor"})
+                self.assertEqual(self.client.get(reverse("index"), {"cursor": cursor}).status_code, 400)
+
+    def test_bad_date_cursor_is_400(self):
+        cursor   = encode_cursor(["k", "yesterday", 3])
+        response = self.client.get(reverse("api_entries"), {"sort": "newest", "cursor": cursor})
+        self.assertEqual(response.status_code, 400)
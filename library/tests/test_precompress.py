@@ -0,0 +1,98 @@
+import gzip
+import json
+import os
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from library import precompress
+from library.models import FolderEntry
+
+from .helpers import LibraryTestCase, TempDirMixin
+
+
+class AcceptEncodingTests(SimpleTestCase):
+    def accepts(self, header: str) -> bool:
+        return precompress.accepts_gzip(RequestFactory().get("/", HTTP_ACCEPT_ENCODING=header))
+
+    def test_accept_encoding_parsing(self):
+        for header, expected in (("gzip, deflate, br", True), ("br;q=1.0, GZIP;q=0.5", True),
+                                 ("*", True), ("gzip;q=0", False), ("*;q=0", False),
+                                 ("identity", False), ("gzip;q=oops", False), ("", False)):
+            with self.subTest(header=header):
+                self.assertEqual(self.accepts(header), expected)
+
+
+class PrecompressedServingTests(TempDirMixin, LibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.enterContext(override_settings(MEDIA_ROOT=os.path.join(self.dir, "media"), LIBRARY_PRECOMPRESS=True,
+                                            LIBRARY_PRECOMPRESS_MIN_BYTES=1024))
+        self.data  = json.dumps({"nodes": [{"name": f"Node{i}"} for i in range(500)]}).encode()
+        self.src   = self.write("Chair/Chair.gltf", self.data)
+        self.write("Chair/tiny.json", b'{"a": 1}')
+        self.entry = FolderEntry.objects.create(name="Chair", path=os.path.join(self.dir, "Chair"))
+
+    def get(self, name: str, **headers):
+        return self.client.get(reverse("serve_file_direct", args=[self.entry.id, name]), **headers)
+
+    def test_gzip_variant_when_accepted(self):
+        response = self.get("Chair.gltf", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertTrue(response["ETag"].endswith('-gz"'))
+        body = response.getvalue()
+        self.assertEqual(response["Content-Length"], str(len(body)))
+        self.assertLess(len(body), len(self.data))
+        self.assertEqual(gzip.decompress(body), self.data)
+
+    def test_identity_when_gzip_is_not_accepted(self):
+        for header in ({}, {"HTTP_ACCEPT_ENCODING": "identity"}, {"HTTP_ACCEPT_ENCODING": "gzip;q=0"}):
+            with self.subTest(header=header):
+                response = self.get("Chair.gltf", **header)
+                self.assertNotIn("Content-Encoding", response)
+                self.assertEqual(response["Vary"], "Accept-Encoding")     # caches must still key on it
+                self.assertEqual(response.getvalue(), self.data)
+
+    def test_each_representation_revalidates_on_its_own_etag(self):
+        plain  = self.get("Chair.gltf")["ETag"]
+        zipped = self.get("Chair.gltf", HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+        self.assertNotEqual(plain, zipped)
+        response = self.get("Chair.gltf", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=zipped)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(self.get("Chair.gltf", HTTP_IF_NONE_MATCH=zipped).status_code, 200)
+
+    def test_range_requests_get_the_source_bytes(self):
+        response = self.get("Chair.gltf", HTTP_ACCEPT_ENCODING="gzip", HTTP_RANGE="bytes=0-9")
+        self.assertEqual(response.status_code, 206)
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response.getvalue(), self.data[:10])
+
+    def test_small_and_incompressible_files_are_sent_as_they_are(self):
+        self.write("Chair/noise.json", os.urandom(4096))
+        for name in ("tiny.json", "noise.json"):
+            with self.subTest(name=name):
+                self.assertNotIn("Content-Encoding", self.get(name, HTTP_ACCEPT_ENCODING="gzip"))
+
+    def test_changed_source_gets_a_new_variant(self):
+        self.get("Chair.gltf", HTTP_ACCEPT_ENCODING="gzip")
+        self.data = self.data.replace(b"Node", b"Part")
+        self.write("Chair/Chair.gltf", self.data)
+        os.utime(self.src, ns=(1, 1))                                     # same size: the mtime moves the key
+        response = self.get("Chair.gltf", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(gzip.decompress(response.getvalue()), self.data)
+
+    def test_build_variants_prebuilds_what_is_missing(self):
+        sources = precompress.asset_sources(self.entry.path, self.src)
+        self.assertEqual(sorted(os.path.basename(s) for s in sources), ["Chair.gltf", "tiny.json"])
+        self.assertEqual(precompress.build_variants(sources, workers=2), 1)   # tiny.json is under the threshold
+        self.assertTrue(precompress.variant_path(self.src).exists())
+        self.assertEqual(precompress.build_variants(sources, workers=2), 0)
+
+    @override_settings(LIBRARY_PRECOMPRESS=False)
+    def test_disabled(self):
+        response = self.get("Chair.gltf", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertNotIn("Vary", response)
@@ -0,0 +1,68 @@
+import os
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from library import scanner
+
+from .helpers import TempDirMixin
+
+
+class ScanTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        for name in ("Lamp", "Chair", "Desk"):
+            self.write(f"{name}/{name}.jpeg", b"jpeg")
+            self.write(f"{name}/{name}.gltf", b"{}")
+        self.write("Chair/Chair.url", b"[InternetShortcut]\r\nURL=https://example.com/chair\r\n")
+        self.write("stray.txt", b"not a folder")
+
+    def test_scan_root_reports_every_folder_in_name_order(self):
+        progress = []
+        scans = scanner.scan_root(Path(self.dir), workers=3,
+                                  on_progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual([s.name for s in scans], ["Chair", "Desk", "Lamp"])
+        self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+        chair = scans[0]
+        self.assertTrue(chair.has_thumbnail)
+        self.assertEqual(chair.url, "https://example.com/chair")
+        self.assertEqual(chair.stats[".gltf"].st_size, 2)
+        self.assertEqual(len(chair.fingerprint), 40)
+
+    def test_known_fingerprint_skips_the_shortcut(self):
+        first = scanner.scan_folder(Path(self.dir, "Chair"))
+        with mock.patch.object(scanner, "parse_url") as parse_url:
+            again = scanner.scan_folder(Path(self.dir, "Chair"), first.fingerprint)
+        parse_url.assert_not_called()
+        self.assertEqual(again.fingerprint, first.fingerprint)
+        self.assertIsNone(again.url)
+        self.assertIsNone(again.disk_bytes)
+
+    def test_fingerprint_follows_the_asset_files(self):
+        before = scanner.scan_folder(Path(self.dir, "Desk")).fingerprint
+        self.write("Desk/Desk.gltf", b'{"asset": {}}')
+        self.assertNotEqual(scanner.scan_folder(Path(self.dir, "Desk")).fingerprint, before)
+
+    def test_failures_stay_per_folder(self):
+        scan = scanner.scan_folder(Path(self.dir, "Gone"))
+        self.assertTrue(scan.error)
+        self.assertFalse(scan.has_thumbnail)
+
+    def test_progress_callback_can_abort_the_scan(self):
+        for i in range(20):
+            os.makedirs(os.path.join(self.dir, f"Extra{i}"))
+
+        class Stop(Exception):
+            pass
+
+        def progress(done, total):
+            if done == 2:
+                raise Stop
+
+        with self.assertRaises(Stop):
+            scanner.scan_root(Path(self.dir), workers=2, on_progress=progress)
+
+    def test_parse_url(self):
+        self.assertEqual(scanner.parse_url(Path(self.dir, "Chair", "Chair.url")), "https://example.com/chair")
+        self.assertIsNone(scanner.parse_url(Path(self.dir, "Desk", "Desk.url")))
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from library import search
+from library.models import AssetAnalysis, FolderEntry, ModelCategory, ModelType, Tag
+
+from .helpers import LibraryTestCase
+
+
+class TokenisingTests(SimpleTestCase):
+    def test_split_words(self):
+        self.assertEqual(search.split_words("WoodenChair_01b"), ["wooden", "chair", "01", "b"])
+        self.assertEqual(search.split_words("HDRISky 4K"), ["hdri", "sky", "4", "k"])
+        self.assertEqual(search.split_words("  "), [])
+
+    def test_match_expression_quotes_every_word(self):
+        self.assertEqual(search.match_expression('oak "table'), '"oak"* AND "table"*')
+        self.assertIsNone(search.match_expression('"*:-'))
+
+
+class FullTextSearchTests(LibraryTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        gltf = ModelType.objects.create(code="GLTF", name="glTF")
+        cls.seating = ModelCategory.objects.create(name="Seating", type=gltf)
+        cls.chair = FolderEntry.objects.create(name="WoodenChair_01", path="/lib/a", type=gltf,
+                                               category=cls.seating)
+        cls.cafe  = FolderEntry.objects.create(name="Café Table", path="/lib/b",
+                                               lnk_path="https://example.com/bistro")
+        cls.shelf = FolderEntry.objects.create(name="Shelf", path="/lib/c")
+        cls.shelf.tags.add(Tag.objects.create(name="Chair parts"))
+
+    def names(self, query: str) -> list:
+        qs, ranked = search.apply_search(FolderEntry.objects.all(), query)
+        self.assertTrue(ranked)
+        return [e.name for e in search.order_by_rank(qs, query)]
+
+    def test_name_parts_prefixes_and_diacritics(self):
+        self.assertEqual(self.names("chair 01"), ["WoodenChair_01"])
+        self.assertEqual(self.names("woo"), ["WoodenChair_01"])
+        self.assertEqual(self.names("cafe"), ["Café Table"])
+        self.assertEqual(self.names("bistro"), ["Café Table"])              # .url link
+        self.assertEqual(self.names("seating"), ["WoodenChair_01"])         # category
+
+    def test_name_matches_rank_above_tag_matches(self):
+        self.assertEqual(self.names("chair"), ["WoodenChair_01", "Shelf"])
+
+    def test_edits_are_reindexed(self):
+        self.chair.tags.add(Tag.objects.create(name="Walnut"))
+        self.assertEqual(self.names("walnut"), ["WoodenChair_01"])
+
+        self.seating.name = "Lounge"
+        self.seating.save()
+        self.assertEqual(self.names("lounge"), ["WoodenChair_01"])
+        self.assertEqual(self.names("seating"), [])
+
+        AssetAnalysis.objects.create(entry=self.shelf, fingerprint="x",
+                                     data={"textures": [{"type": "Roughness"}, {"type": "unknown"}]})
+        self.assertEqual(self.names("roughness"), ["Shelf"])
+        self.assertEqual(self.names("unknown"), [])
+
+    def test_deleted_entries_never_match(self):
+        self.cafe.delete()
+        self.assertEqual(self.names("cafe"), [])
+
+    def test_rebuild(self):
+        self.assertEqual(search.rebuild(), 3)
+        self.assertEqual(self.names("shelf"), ["Shelf"])
+
+    def test_falls_back_to_a_name_filter_without_fts(self):
+        with mock.patch.dict(search._state, {"ready": False}):
+            qs, ranked = search.apply_search(FolderEntry.objects.all(), "CAFÉ")
+        self.assertFalse(ranked)
+        self.assertEqual([e.name for e in qs], ["Café Table"])
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from library import startup
+
+from .helpers import LibraryTestCase, TempDirMixin
+
+
+class ProcessStateMixin:
+    """ Fresh per-process startup state: not started, schema not known to be ready. """
+
+    def setUp(self):
+        super().setUp()
+        for name, value in (("_started", threading.Event()), ("_schema_ready", threading.Event()),
+                            ("_checked_at", 0.0)):
+            patcher = mock.patch.object(startup, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+@override_settings(LIBRARY_STARTUP="deferred")
+class SchemaGateTests(ProcessStateMixin, LibraryTestCase):
+    def test_requests_wait_for_the_schema_in_deferred_mode(self):
+        startup._started.set()
+        with mock.patch.object(connection.introspection, "table_names", return_value=[]):
+            response = self.client.get(reverse("api_types"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+
+        startup._checked_at = 0.0                          # past the recheck interval
+        self.assertEqual(self.client.get(reverse("api_types")).status_code, 200)
+        self.assertTrue(startup.schema_ready())
+
+    def test_rechecks_are_throttled(self):
+        startup._started.set()
+        with mock.patch.object(connection.introspection, "table_names", return_value=[]) as tables:
+            self.assertFalse(startup.check_schema())
+            self.assertFalse(startup.check_schema())
+        self.assertEqual(tables.call_count, 1)
+
+    def test_not_gated_outside_a_deferred_server(self):
+        self.assertTrue(startup.schema_ready())                  # manage.py, tests: never started
+        startup._started.set()
+        with override_settings(LIBRARY_STARTUP="blocking"):
+            self.assertTrue(startup.schema_ready())
+
+
+class WarmupTests(ProcessStateMixin, TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.enterContext(override_settings(LIBRARY_STATE_DIR=self.dir, LIBRARY_DEPLOYMENT_ID="release-1"))
+        self.steps = {}
+        for step in ("_migrate", "_seed", "_sync"):
+            self.steps[step] = self.enterContext(mock.patch.object(startup, step, return_value=True))
+        self.lock = Path(self.dir) / "warmup.lock"
+
+    def test_runs_once_per_deployment(self):
+        self.assertTrue(startup.run_warmup())
+        self.assertTrue(startup.is_warm())
+        self.assertFalse(self.lock.exists())
+        self.assertFalse(startup.run_warmup())
+        self.assertEqual(self.steps["_migrate"].call_count, 1)
+
+        with override_settings(LIBRARY_DEPLOYMENT_ID="release-2"):
+            self.assertFalse(startup.is_warm())
+            self.assertTrue(startup.run_warmup())
+
+    def test_skips_while_another_process_holds_the_lock(self):
+        self.lock.write_text("123\n")
+        self.assertFalse(startup.run_warmup())
+        self.steps["_migrate"].assert_not_called()
+
+    @override_settings(LIBRARY_WARMUP_STALE=60)
+    def test_breaks_a_stale_lock(self):
+        self.lock.write_text("123\n")
+        old = time.time() - 120
+        os.utime(self.lock, (old, old))
+        self.assertTrue(startup.run_warmup())
+
+    def test_failed_migration_leaves_the_deployment_cold(self):
+        self.steps["_migrate"].return_value = False
+        self.assertFalse(startup.run_warmup())
+        self.assertFalse(startup.is_warm())
+        self.assertFalse(startup._schema_ready.is_set())
+        self.steps["_sync"].assert_not_called()
+
+    def test_server_start_modes(self):
+        with mock.patch.object(startup, "run_warmup") as warmup, override_settings(LIBRARY_STARTUP="off"):
+            startup.on_server_start()
+            warmup.assert_not_called()
+        startup._started.clear()
+        with mock.patch.object(startup, "run_warmup") as warmup, override_settings(LIBRARY_STARTUP="blocking"):
+            startup.on_server_start()
+            startup.on_server_start()                           # once per process
+            warmup.assert_called_once_with()
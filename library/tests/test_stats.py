@@ -0,0 +1,78 @@
+import os
+
+from library import stats
+from library.models import EntryStats, FolderEntry, LibraryStat, ModelType
+
+from .helpers import LibraryTestCase, SyncMixin
+
+
+def stat(group: str, key: str = ""):
+    row = LibraryStat.objects.filter(group=group, key=key).first()
+    return (row.count, row.bytes) if row else (0, 0)
+
+
+class StatsDeltaTests(LibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.hdr  = ModelType.objects.create(code="HDR", name="HDR")
+        self.gltf = ModelType.objects.create(code="GLTF", name="glTF")
+
+    def test_entries_move_between_buckets(self):
+        a = FolderEntry.objects.create(name="A", path="/lib/A", type=self.hdr, disk_bytes=100)
+        b = FolderEntry.objects.create(name="B", path="/lib/B", type=self.hdr, disk_bytes=50)
+        self.assertEqual(stat("total"), (2, 150))
+        self.assertEqual(stat("type", str(self.hdr.id)), (2, 150))
+
+        b.type, b.disk_bytes = self.gltf, 70
+        b.save()
+        self.assertEqual(stat("total"), (2, 170))
+        self.assertEqual(stat("type", str(self.hdr.id)), (1, 100))
+        self.assertEqual(stat("type", str(self.gltf.id)), (1, 70))
+
+        a.delete()
+        stats.collect_orphans()
+        self.assertEqual(stat("total"), (1, 70))
+        self.assertFalse(LibraryStat.objects.filter(group="type", key=str(self.hdr.id)).exists())
+
+    def test_deltas_match_a_rebuild(self):
+        for i in range(5):
+            FolderEntry.objects.create(name=f"E{i}", path=f"/lib/E{i}", type=self.hdr, disk_bytes=10 * i)
+        FolderEntry.objects.filter(name="E1").update(type=self.gltf)
+        stats.refresh_entries(FolderEntry.objects.values_list("id", flat=True))
+        FolderEntry.objects.get(name="E2").delete()
+        stats.collect_orphans()
+
+        incremental = sorted(LibraryStat.objects.values_list("group", "key", "count", "bytes"))
+        stats.rebuild()
+        self.assertEqual(sorted(LibraryStat.objects.values_list("group", "key", "count", "bytes")), incremental)
+
+    def test_dashboard_does_not_write(self):
+        FolderEntry.objects.create(name="A", path="/lib/A", type=self.hdr, disk_bytes=100)
+        FolderEntry.objects.get(name="A").delete()
+        stats.dashboard()
+        self.assertTrue(EntryStats.objects.filter(entry__isnull=True).exists())
+        self.assertEqual(stat("total"), (1, 100))                     # until the next sync / rebuild
+
+
+class SyncSizeTests(SyncMixin, LibraryTestCase):
+    def test_sync_measures_folder_sizes_without_hashing(self):
+        self.add_folder("Chair", {"textures/wood.png": b"x" * 1000})
+        self.sync()
+        entry = FolderEntry.objects.get(name="Chair")
+        self.assertEqual(entry.content_hash, "")
+        self.assertEqual(entry.disk_bytes, 4 + 29 + 1000)
+        self.assertEqual(stat("total"), (1, 1033))
+
+        self.write("lib/Chair/Chair.gltf", b"{}")                   # fingerprint changes → re-measured
+        self.sync()
+        self.assertEqual(FolderEntry.objects.get(name="Chair").disk_bytes, 4 + 2 + 1000)
+        self.assertEqual(stat("total"), (1, 1006))
+
+    def test_removed_folders_leave_the_totals(self):
+        self.add_folder("Chair")
+        self.add_folder("Lamp")
+        self.sync()
+        self.assertEqual(stat("total")[0], 2)
+        os.rename(os.path.join(self.root.path, "Lamp"), os.path.join(self.dir, "Lamp"))
+        self.sync()
+        self.assertEqual(stat("total"), (1, 33))
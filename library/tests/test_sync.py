@@ -0,0 +1,111 @@
+import os
+import shutil
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from library import scanner, search
+from library.apps import SyncCancelled
+from library.models import FolderEntry
+
+from .helpers import LibraryTestCase, SyncMixin
+
+
+class IncrementalSyncTests(SyncMixin, LibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_folder("Chair", {"Chair.url": b"[InternetShortcut]\r\nURL=https://example.com/chair\r\n"})
+        self.add_folder("Lamp")
+
+    def test_unchanged_folders_are_skipped(self):
+        report = self.sync()
+        self.assertEqual((report.scanned, report.added, report.skipped), (2, 2, 0))
+        chair = FolderEntry.objects.get(name="Chair")
+        self.assertEqual(chair.lnk_path, "https://example.com/chair")
+        self.assertTrue(chair.fingerprint)
+
+        with mock.patch.object(scanner, "parse_url", wraps=scanner.parse_url) as parse_url:
+            report = self.sync()
+        self.assertEqual((report.added, report.changed, report.skipped, report.removed), (0, 0, 2, 0))
+        parse_url.assert_not_called()                                  # skipped folders aren't opened
+
+    def test_changed_folder_is_re_read(self):
+        self.sync()
+        self.write("lib/Chair/Chair.url", b"[InternetShortcut]\r\nURL=https://example.com/chair-v2\r\n")
+        report = self.sync()
+        self.assertEqual((report.changed, report.skipped), (1, 1))
+        self.assertEqual(FolderEntry.objects.get(name="Chair").lnk_path, "https://example.com/chair-v2")
+
+    def test_lost_thumbnail_is_restored_without_touching_the_row(self):
+        self.sync()
+        thumb = os.path.join(self.dir, "media", FolderEntry.objects.get(name="Chair").jpeg_path)
+        os.remove(thumb)
+        report = self.sync()
+        self.assertEqual(report.skipped, 2)
+        self.assertTrue(os.path.exists(thumb))
+
+    def test_folders_without_a_thumbnail_are_ignored(self):
+        os.makedirs(os.path.join(self.root.path, "Scratch"))
+        self.write("lib/Scratch/Scratch.gltf", b"{}")
+        report = self.sync()
+        self.assertEqual(report.added, 2)
+        self.assertFalse(FolderEntry.objects.filter(name="Scratch").exists())
+
+    def test_partial_sync_touches_only_the_named_folders(self):
+        self.sync()
+        self.add_folder("Desk")
+        os.remove(os.path.join(self.root.path, "Lamp", "Lamp.jpeg"))
+        report = self.sync(names=["Desk"])
+        self.assertEqual((report.scanned, report.added, report.removed), (1, 1, 0))
+        self.assertTrue(FolderEntry.objects.filter(name="Lamp").exists())
+
+
+class BatchedWriteTests(SyncMixin, LibraryTestCase):
+    def queries_to_add(self, names) -> int:
+        for name in names:
+            self.add_folder(name)
+        with CaptureQueriesContext(connection) as queries:
+            self.sync()
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_the_folders(self):
+        few  = self.queries_to_add([f"A{i}" for i in range(3)])
+        many = self.queries_to_add([f"B{i}" for i in range(40)])
+        self.assertEqual(FolderEntry.objects.count(), 43)
+        self.assertLessEqual(many, few)
+
+    def test_cancelled_before_the_write_leaves_no_rows(self):
+        self.add_folder("Chair")
+
+        def progress(phase, done, total, report):
+            if phase == "writing":
+                raise SyncCancelled
+
+        with self.assertRaises(SyncCancelled):
+            self.sync(progress=progress)
+        self.assertFalse(FolderEntry.objects.exists())
+
+    def test_cancel_after_the_commit_is_ignored(self):
+        self.add_folder("Chair")
+
+        def progress(phase, done, total, report):
+            if phase == "stats":
+                raise SyncCancelled
+
+        report = self.sync(progress=progress)
+        self.assertEqual(report.added, 1)
+        self.assertTrue(FolderEntry.objects.filter(name="Chair").exists())
+        found, _ = search.apply_search(FolderEntry.objects.all(), "chair")     # indexed with the rows
+        self.assertEqual([e.name for e in found], ["Chair"])
+
+    def test_adds_updates_and_removals_in_one_run(self):
+        self.add_folder("Chair")
+        self.add_folder("Lamp")
+        self.sync()
+        self.add_folder("Desk")
+        self.write("lib/Chair/Chair.url", b"URL=https://example.com/chair\r\n")
+        shutil.rmtree(os.path.join(self.root.path, "Lamp"))
+        report = self.sync()
+        self.assertEqual((report.added, report.changed, report.removed), (1, 1, 1))
+        self.assertEqual(sorted(FolderEntry.objects.values_list("name", flat=True)), ["Chair", "Desk"])
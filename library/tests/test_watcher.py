@@ -0,0 +1,80 @@
+import os
+import shutil
+
+from library.models import FolderEntry, SyncJob
+from library.watcher import FolderWatcher, run_watchers
+
+from .helpers import LibraryTestCase, SyncMixin
+
+
+class FolderWatcherTests(SyncMixin, LibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_folder("Chair")
+        self.add_folder("Lamp")
+        self.sync()
+
+    def watcher(self, **kwargs) -> FolderWatcher:
+        kwargs.setdefault("debounce", 0)
+        kwargs.setdefault("deep_every", 0)
+        watcher = FolderWatcher(self.root, entry_cls=FolderEntry, type_gltf=self.gltf, **kwargs)
+        watcher.prime()
+        return watcher
+
+    def test_quiet_library_has_nothing_to_do(self):
+        watcher = self.watcher()
+        self.assertEqual(watcher.dirty, {})
+        self.assertEqual(watcher.poll(), set())
+        self.assertIsNone(watcher.flush())
+
+    def test_new_and_removed_folders_are_applied(self):
+        watcher = self.watcher()
+        self.add_folder("Desk")
+        shutil.rmtree(os.path.join(self.root.path, "Lamp"))
+        self.assertEqual(watcher.poll(), {"Desk", "Lamp"})
+
+        report = watcher.flush()
+        self.assertEqual((report.scanned, report.added, report.removed), (1, 1, 1))
+        self.assertEqual(sorted(FolderEntry.objects.values_list("name", flat=True)), ["Chair", "Desk"])
+        self.assertEqual(watcher.dirty, {})
+
+    def test_changes_wait_for_the_debounce(self):
+        watcher = self.watcher(debounce=60)
+        self.add_folder("Desk")
+        watcher.poll()
+        self.assertEqual(watcher.settled(), [])
+        self.assertIsNone(watcher.flush())
+        self.assertFalse(FolderEntry.objects.filter(name="Desk").exists())
+
+    def test_in_place_rewrites_are_caught_by_the_deep_pass(self):
+        watcher = self.watcher(deep_every=2)
+        folder  = os.path.join(self.root.path, "Chair")
+        mtime   = os.stat(folder).st_mtime_ns
+        self.write("lib/Chair/Chair.url", b"URL=https://example.com/chair\r\n")
+        os.utime(folder, ns=(mtime, mtime))                           # as a rewrite in place leaves it
+
+        self.assertEqual(watcher.poll(), set())                       # listing pass: nothing
+        self.assertEqual(watcher.poll(), {"Chair"})                   # deep pass: fingerprint moved
+        watcher.flush()
+        self.assertEqual(FolderEntry.objects.get(name="Chair").lnk_path, "https://example.com/chair")
+
+    def test_non_asset_folders_are_not_flagged_again(self):
+        watcher = self.watcher(deep_every=1)
+        os.makedirs(os.path.join(self.root.path, "Scratch"))
+        self.assertEqual(watcher.poll(), {"Scratch"})
+        watcher.flush()
+        self.assertEqual(watcher.poll(), set())
+        self.assertFalse(FolderEntry.objects.filter(name="Scratch").exists())
+
+    def test_waits_for_a_running_full_sync(self):
+        watcher = self.watcher()
+        self.add_folder("Desk")
+        watcher.poll()
+        SyncJob.objects.create(root=self.root, status=SyncJob.RUNNING)
+        self.assertIsNone(watcher.flush())
+        self.assertIn("Desk", watcher.dirty)
+
+    def test_run_once_applies_what_is_pending(self):
+        self.add_folder("Desk")
+        run_watchers([FolderWatcher(self.root, entry_cls=FolderEntry, type_gltf=self.gltf)], once=True)
+        self.assertTrue(FolderEntry.objects.filter(name="Desk").exists())
@@ -0,0 +1,85 @@
+import io
+import os
+import zipfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from library import zipstream
+
+from .helpers import TempDirMixin
+
+
+class ZipStreamTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.files = {
+            "Chair/Chair.gltf":         b'{"asset": {"version": "2.0"}}' * 500,
+            "Chair/Chair.bin":          os.urandom(70_000),
+            "Chair/textures/wood.png":  os.urandom(3_000),
+            "Chair/empty.txt":          b"",
+        }
+        for arcname, data in self.files.items():
+            self.write(arcname, data)
+
+    def members(self, *, deflate: bool):
+        return zipstream.prepare([zipstream.Member(name, os.path.join(self.dir, name),
+                                                   deflate=deflate and name.endswith(".gltf"))
+                                  for name in self.files])
+
+    def assertReadsBack(self, data: bytes):
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual({i.filename: zf.read(i) for i in zf.infolist()}, self.files)
+            return zf.infolist()
+
+    def test_stored_round_trip_matches_archive_size(self):
+        members = self.members(deflate=False)
+        data    = b"".join(zipstream.stream_zip(members))
+        self.assertReadsBack(data)
+        self.assertEqual(len(data), zipstream.archive_size(members))
+
+    def test_deflated_round_trip(self):
+        members = self.members(deflate=True)
+        data    = b"".join(zipstream.stream_zip(members))
+        infos   = self.assertReadsBack(data)
+        gltf    = next(i for i in infos if i.filename.endswith(".gltf"))
+        self.assertEqual(gltf.compress_type, zipfile.ZIP_DEFLATED)
+        self.assertLess(gltf.compress_size, gltf.file_size)
+        self.assertIsNone(zipstream.archive_size(members))
+
+    def test_zip64_member_records(self):
+        # Every member takes the ZIP64 layout, as a > 4 GiB one would
+        with mock.patch.object(zipstream, "ZIP64_FROM", 0):
+            for deflate in (False, True):
+                members = self.members(deflate=deflate)
+                data    = b"".join(zipstream.stream_zip(members))
+                for info in self.assertReadsBack(data):
+                    self.assertGreaterEqual(info.create_version, 45)
+                    self.assertEqual(info.extra[:2], b"\x01\x00")        # ZIP64 extended information
+                if not deflate:
+                    self.assertEqual(len(data), zipstream.archive_size(members))
+
+    def test_deflated_members_get_zip64_headroom(self):
+        # Incompressible input near 4 GiB can deflate to more than 4 GiB
+        near = zipstream.ZIP32_MAX - 1_000_000
+        self.assertTrue(zipstream._needs_zip64(zipstream.Member("a.bin", "", deflate=True, size=near)))
+        self.assertFalse(zipstream._needs_zip64(zipstream.Member("a.bin", "", deflate=False, size=near)))
+        self.assertTrue(zipstream._needs_zip64(zipstream.Member("a.bin", "", size=zipstream.ZIP32_MAX)))
+        self.assertFalse(zipstream._needs_zip64(zipstream.Member("a.gltf", "", deflate=True, size=2**31)))
+
+    def test_zip64_end_records(self):
+        # More members than the 32-bit end record can count
+        with mock.patch.object(zipstream, "COUNT_MAX", 2):
+            members = self.members(deflate=False)
+            data    = b"".join(zipstream.stream_zip(members))
+        self.assertIn(b"PK\x06\x06", data)                               # ZIP64 end of central directory
+        self.assertEqual(len(self.assertReadsBack(data)), len(self.files))
+        with mock.patch.object(zipstream, "COUNT_MAX", 2):
+            self.assertEqual(len(data), zipstream.archive_size(members))
+
+    def test_member_shrinking_mid_stream_raises(self):
+        members = self.members(deflate=False)
+        self.write("Chair/Chair.bin", b"short")
+        with self.assertRaises(zipstream.ZipStreamError):
+            b"".join(zipstream.stream_zip(members))
@@ -1,24 +1,48 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views
+
+# Under ASGI (LIBRARY_ASYNC_VIEWS) the detail page and asset files use the async views
+ASYNC = getattr(settings, "LIBRARY_ASYNC_VIEWS", False)
 
 urlpatterns = [
     # ───────────────────────────────
     # Core browser
     # ───────────────────────────────
     path("", views.index,          name="index"),
-    path("entry/<int:entry_id>/", views.detail,        name="detail"),
+    path("entry/<int:entry_id>/", views.adetail if ASYNC else views.detail, name="detail"),
     path("entry/<int:entry_id>/open/", views.open_folder, name="open_folder"),
+    path("entry/<int:entry_id>/thumb/", views.entry_thumb, name="entry_thumb"),   # ?size=256|512|1024
+    path("entry/<int:entry_id>/export/", views.export_entry, name="export_entry"), # ZIP, ?compress=0
+    path("export/", views.export_entries, name="export_entries"),                  # ZIP, ?id=1&id=2…
+    path("duplicates/", views.duplicates, name="duplicates"),                      # ?distance=N
+    path("stats/", views.stats_view, name="stats"),
+    path("metrics/", views.metrics_view, name="metrics"),                           # Prometheus text
 
     # ───────────────────────────────
     # Settings page
     # ───────────────────────────────
     path("settings/", views.settings_view, name="settings"),
+    path("sync/status/", views.sync_status, name="sync_status"),
+    path("sync/<int:job_id>/cancel/", views.sync_cancel, name="sync_cancel"),
 
     # ───────────────────────────────
     # Dynamic assets (thumbnails / GLTF / textures)
     # ───────────────────────────────
     path("serve-file/", views.serve_entry_file,       name="serve_file"),         # legacy query-string endpoint
-    path("serve-file/<int:entry_id>/<path:file>/", views.serve_entry_file_direct, name="serve_file_direct"), # prettified
+    path("serve-file/<int:entry_id>/<path:file>/",                                                     # prettified
+         views.aserve_entry_file_direct if ASYNC else views.serve_entry_file_direct, name="serve_file_direct"),
+
+    # ───────────────────────────────
+    # JSON API
+    # ───────────────────────────────
+    path("api/entries/",                 api.entries,      name="api_entries"),
+    path("api/entries/bulk/",            api.bulk_edit,    name="api_bulk"),      # POST
+    path("api/entries/<int:entry_id>/",  api.entry_detail, name="api_entry"),
+    path("api/roots/",                   api.library_roots, name="api_roots"),
+    path("api/types/",                   api.types,        name="api_types"),
+    path("api/categories/",              api.categories,   name="api_categories"),
+    path("api/tags/",                    api.tags,         name="api_tags"),
 
     # ───────────────────────────────
     # (NEW) Browsing helpers — not yet wired in templates,
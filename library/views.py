@@ -1,149 +1,170 @@
-from django.shortcuts import render, get_object_or_404
-from .models import FolderEntry, AppSetting, ModelType, ModelCategory, Tag
-from django.http import JsonResponse, FileResponse, Http404
-from django.core.paginator import Paginator, EmptyPage
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
+from django.views.decorators.http import require_POST
+from .models import FolderEntry, LibraryRoot, SyncJob
+from .jobs import start_sync, cancel_sync
+from .analysis import aget_analysis, get_analysis
+from .derivatives import FORMATS, IMAGE_SUFFIXES, get_derivative, negotiate_format
+from .fileserving import aserve_file, safe_join, serve_file
+from .export import export_response
+from . import aio, dedupe, facets, metrics, roots, search, stats
+from .pagination import InvalidCursor, keyset_page
+from .queries import filter_entries, sort_key
+from django.http import JsonResponse, Http404
 from django.conf import settings
+from django.core.cache import cache
 from django.contrib import messages
-from django.apps import apps
 from pathlib import Path
-from PIL import Image
 from urllib.parse import unquote
 from django.urls import reverse
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest
 # ✂ imports stay as-is
-from django.db.models import Prefetch, Q
+from django.db.models import Count, Q
+
+from asgiref.sync import sync_to_async
 
-import json
 import os
 
 def index(request):
-    q    = request.GET.get("q", "").strip()
-    page = int(request.GET.get("page", 1))
+    q      = request.GET.get("q", "").strip()
+    cursor = request.GET.get("cursor", "")
+    sort   = sort_key(request.GET)
 
     # Sanitize inputs
     type_slugs = request.GET.getlist("type")
     cat_slugs  = request.GET.getlist("category")
     tag_slugs  = request.GET.getlist("tag")
-    tags_param = request.GET.get("tags", "")
-
-    qs = FolderEntry.objects.select_related("type", "category").prefetch_related("tags")
-
-    if q:
-        qs = qs.filter(name__icontains=q)
-
-    if type_slugs:
-        qs = qs.filter(type__slug__in=type_slugs)
-
-    if cat_slugs:
-        qs = qs.filter(category__slug__in=cat_slugs)
 
-    if tag_slugs:
-        qs = qs.filter(tags__slug__in=tag_slugs)
+    qs = FolderEntry.objects.select_related("type", "category", "stats").prefetch_related("tags")
+    qs, ranked = filter_entries(qs, request.GET)
 
-    if tags_param:
-        tag_names = [t.strip() for t in tags_param.split(",") if t.strip()]
-        for tag in tag_names:
-            qs = qs.filter(tags__name__iexact=tag)
-
-    qs = qs.distinct().order_by("name")
-    total_count = qs.count()
-
-    selected_type_slugs = type_slugs
-    selected_cat_slugs  = cat_slugs
-    selected_tag_slugs  = tag_slugs
-
-    # ------- pagination ------------------------------------------------------
-    pager = Paginator(qs, 20)
-    objs  = pager.get_page(page)
+    # ------- keyset pagination ----------------------------------------------
+    listing = search.order_by_rank(qs, q) if ranked else qs
+    try:
+        objs, next_cursor = keyset_page(listing, cursor, ranked=ranked, sort=sort)
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid cursor")
 
     # ------- AJAX for infinite scroll ---------------------------------------
     if request.headers.get("x-requested-with") == "XMLHttpRequest":
         html = render(request, "library/partials/_entries.html",
                       {"entries": objs, "MEDIA_URL": settings.MEDIA_URL})
-        if not objs.has_next():
+        if next_cursor:
+            html["X-Next-Cursor"] = next_cursor
+        else:
             html["X-Last-Page"] = "1"
         return html
 
-    # ------- sidebar data ----------------------------------------------------
-    all_types      = ModelType.objects.all()
-    all_categories = ModelCategory.objects.filter(type__in=all_types)
-
+    # ------- total (full page loads only, cached per filter) ----------------
+    filter_key  = request.GET.copy()
+    filter_key.pop("cursor", None)
+    filter_key.pop("sort", None)                 # order doesn't change counts
+    filter_key  = filter_key.urlencode()
+    count_key   = facets.cache_key("total", filter_key)
+    total_count = cache.get(count_key)
+    if total_count is None:
+        total_count = qs.count()
+        cache.set(count_key, total_count, getattr(settings, "LIBRARY_COUNT_CACHE_SECONDS", 60))
+
+    # ------- sidebar facets with counts for this filter (cached) ------------
     context = {
     "entries": objs,
+    "next_cursor": next_cursor,
     "query": q,
+    "sort": sort,
     "total_count": total_count,
     "MEDIA_URL": settings.MEDIA_URL,
 
-    "all_types": ModelType.objects.all(),
-    "all_categories": ModelCategory.objects.all(),
-    "all_tags": Tag.objects.all(),
+    **facets.facets_with_counts(qs, filter_key),
 
     "selected_type_slugs": type_slugs,
     "selected_cat_slugs": cat_slugs,
     "selected_tag_slugs": tag_slugs,
     }
     return render(request, "library/index.html", context)
-'''
-# Old index() function
-def index(request):
-    q     = request.GET.get('q', '')
-    page  = request.GET.get('page', 1)
-    qs    = FolderEntry.objects.filter(name__icontains=q) if q else FolderEntry.objects.all()
-    pager = Paginator(qs, 20)
-    try:
-      objs = pager.page(page)          # strict - will raise EmptyPage  
-    except EmptyPage:
-        # AJAX call asking for a page that doesn’t exist → return nothing
-        if request.headers.get("x-requested-with") == "XMLHttpRequest":
-            return HttpResponse("")      # ← already imported earlier
-        # Direct (non-AJAX) access: show the last real page instead of 404
-        objs = pager.page(pager.num_pages)
-    # AJAX request (infinite scroll)
-    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        if not objs.object_list:
-            return HttpResponse("")  # nothing to render at all
-
-        if not objs.has_next():
-            # Final page – render entries but indicate it’s the last
-            response = render(request, 'library/partials/_entries.html', {
-                'entries': objs,
-                'MEDIA_URL': settings.MEDIA_URL
-            })
-            response['X-Last-Page'] = '1'
-            return response
-
-        return render(request, 'library/partials/_entries.html', {
-            'entries': objs,
-            'MEDIA_URL': settings.MEDIA_URL
-        })   
-
-    # Normal full-page load
-    return render(request, 'library/index.html', {
-        'entries': objs,
-        'query': q,
-        'MEDIA_URL': settings.MEDIA_URL,
-        'is_last_page': not objs.has_next(),
-        'total_count': qs.count(),
-    })
-'''
 
 def serve_entry_file_direct(request, entry_id, file):
     entry = get_object_or_404(FolderEntry, id=entry_id)
-    safe_path = os.path.normpath(os.path.join(entry.path, file))
+    safe_path = _entry_file(entry.path, file)
 
-    if not safe_path.startswith(entry.path) or not os.path.exists(safe_path):
+    if safe_path is None:
         raise Http404("File not found or invalid path")
 
-    return FileResponse(open(safe_path, 'rb'), content_type='application/octet-stream')
+    # ?size=N on an image → resized preview variant
+    if 'size' in request.GET and Path(safe_path).suffix.lower() in IMAGE_SUFFIXES:
+        return _derivative_response(request, Path(safe_path), request.GET['size'])
 
-def detail(request, entry_id):
+    return serve_file(request, safe_path)
+
+async def aserve_entry_file_direct(request, entry_id, file):
+    """ASGI version of serve_entry_file_direct: path checks, resizing and the body stream run on the aio pool."""
+    entry = await aget_object_or_404(FolderEntry.objects.only('id', 'path'), id=entry_id)
+    safe_path = await aio.run_io(_entry_file, entry.path, file)
+
+    if safe_path is None:
+        raise Http404("File not found or invalid path")
+
+    if 'size' in request.GET and Path(safe_path).suffix.lower() in IMAGE_SUFFIXES:
+        fmt  = negotiate_format(request)
+        path = await aio.run_io(get_derivative, Path(safe_path), request.GET['size'], fmt)
+        if path is None:
+            raise Http404("Image not available")
+        response = await aserve_file(request, path, content_type=FORMATS[fmt][2])
+        response['Vary'] = 'Accept'
+        return response
+
+    return await aserve_file(request, safe_path)
+
+def _entry_file(entry_path, rel):
+    """`rel` inside the entry folder when it is an existing file, else None."""
+    safe_path = safe_join(entry_path, rel)
+    return safe_path if safe_path is not None and os.path.isfile(safe_path) else None
+
+def export_entry(request, entry_id):
+    """Whole asset folder as a streamed ZIP (?compress=0 → store only, with Content-Length)."""
     entry = get_object_or_404(FolderEntry, id=entry_id)
+    return export_response([entry], compress=request.GET.get('compress') != '0', filename=entry.name)
+
+def export_entries(request):
+    """Several assets in one ZIP: ?id=1&id=2…"""
+    ids = [int(i) for i in request.GET.getlist('id') if i.isdigit()]
+    entries = FolderEntry.objects.filter(id__in=ids).order_by('name_lower', 'id')
+    if not entries:
+        raise Http404("No entries selected")
+    return export_response(entries, compress=request.GET.get('compress') != '0')
+
+def entry_thumb(request, entry_id):
+    """Card thumbnail resized to ?size= (bucketed), WebP when accepted."""
+    entry = get_object_or_404(FolderEntry, id=entry_id)
+    if not entry.jpeg_path:
+        raise Http404("No thumbnail")
+    return _derivative_response(request, Path(settings.MEDIA_ROOT) / entry.jpeg_path,
+                                request.GET.get('size', 256))
+
+def _derivative_response(request, src, size):
+    fmt  = negotiate_format(request)
+    path = get_derivative(src, size, fmt)
+    if path is None:
+        raise Http404("Image not available")
+    response = serve_file(request, path, content_type=FORMATS[fmt][2])
+    response['Vary'] = 'Accept'
+    return response
+
+def detail(request, entry_id):
+    entry = get_object_or_404(FolderEntry.objects.select_related('analysis'), id=entry_id)
     image_exists = os.path.exists(os.path.join(settings.MEDIA_ROOT, entry.jpeg_path or ''))
-    gltf_info = analyze_gltf_and_textures(entry)
+    return render(request, 'library/detail.html', _detail_context(entry, get_analysis(entry), image_exists))
+
+async def adetail(request, entry_id):
+    """ASGI version of detail: a stale analysis probes its textures concurrently on the aio pool."""
+    entry = await aget_object_or_404(FolderEntry.objects.select_related('analysis'), id=entry_id)
+    image_exists = await aio.run_io(os.path.exists, os.path.join(settings.MEDIA_ROOT, entry.jpeg_path or ''))
+    context = _detail_context(entry, await aget_analysis(entry), image_exists)
+    return await sync_to_async(render)(request, 'library/detail.html', context)
 
+def _detail_context(entry, gltf_info, image_exists):
     for tex in gltf_info['textures']:
         tex_rel        = f"textures/{tex['name']}"
-        tex['preview'] = reverse('serve_file_direct', args=[entry.id, tex_rel])
+        tex['preview'] = reverse('serve_file_direct', args=[entry.id, tex_rel]) + '?size=512'
 
     # relative gltf path (models/scene.gltf, etc.)
     gltf_rel_path = ''
@@ -154,15 +175,48 @@ def detail(request, entry_id):
     dummy = reverse('serve_file_direct', args=[entry.id, 'dummy.txt']).rstrip('/')  # /serve-file/13/dummy.txt
     base_url = dummy.rsplit('/', 1)[0] + '/'                                       # /serve-file/13/
 
-    return render(request, 'library/detail.html', {
+    return {
         'entry'        : entry,
         'MEDIA_URL'    : settings.MEDIA_URL,
         'image_exists' : image_exists,
         'gltf_info'    : gltf_info,
         'gltf_rel_path': gltf_rel_path,
         'base_url'     : base_url,
+    }
+
+def duplicates(request):
+    """Duplicate / near-duplicate clusters with the space deleting the extra copies would free."""
+    try:
+        distance = max(0, min(32, int(request.GET.get('distance', dedupe.max_distance()))))
+    except ValueError:
+        distance = dedupe.max_distance()
+    clusters = dedupe.find_clusters(distance)
+    return render(request, 'library/duplicates.html', {
+        'clusters'   : clusters[:200],
+        'cluster_count': len(clusters),
+        'reclaimable': sum(c.reclaimable_bytes for c in clusters),
+        'distance'   : distance,
+        'unhashed'   : FolderEntry.objects.filter(hash_fingerprint='').count(),
+    })
+
+def stats_view(request):
+    """Library-wide storage / complexity dashboard, read from the precomputed aggregates."""
+    data = stats.dashboard()
+    return render(request, 'library/stats.html', {
+        **data,
+        'tables'   : [('By type', data['by_type']), ('By category', data['by_category']),
+                      ('Triangle count', data['triangles']), ('Texture resolution (textures)', data['texture_res'])],
+        'top_lists': [('Largest assets', data['largest'], 'bytes'),
+                      ('Most triangles', data['heaviest'], 'triangles')],
     })
 
+def metrics_view(request):
+    """Prometheus text exposition of library.metrics; bearer-token protected when LIBRARY_METRICS_TOKEN is set."""
+    token = getattr(settings, 'LIBRARY_METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization', '') != f'Bearer {token}':
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 def open_folder(request, entry_id):
     entry = get_object_or_404(FolderEntry, id=entry_id)
     try:
@@ -172,52 +226,56 @@ def open_folder(request, entry_id):
         return JsonResponse({'status': 'error', 'message': str(e)})
 
 def settings_view(request):
-    setting, _ = AppSetting.objects.get_or_create(key='ROOT_DIR')
+    roots.ensure_default_root()
     if request.method == 'POST':
-        setting.value = request.POST['root'].strip()
-        setting.save()
-        messages.success(request, 'Root folder path updated.')
-        if request.POST.get('action') == 'resync':
-            apps.get_app_config('library').sync_folders()
-            messages.success(request, 'Re-synced successfully.')
-    return render(request, 'library/settings.html', {'root': setting.value})
-
-TEX_MAP_TYPES = {
-    "diffuse": "Diffuse", "albedo": "Albedo", "basecolor": "Base Color",
-    "normal": "Normal", "bump": "Bump", "roughness": "Roughness",
-    "metallic": "Metallic", "glossiness": "Glossiness", "specular": "Specular",
-    "opacity": "Opacity", "emissive": "Emissive", "ao": "Ambient Occlusion",
-    "occlusion": "Ambient Occlusion"
-}
-
-def analyze_gltf_and_textures(entry):
-    info = {'file_size':None,'mesh_count':0,'vertex_count':0,'triangle_count':0,
-            'textures':[],'texture_count':0}
-    try:
-        p = Path(entry.gltf_path)
-        if p.exists():
-            info['file_size'] = round(p.stat().st_size/1048576,2)
-            data = json.load(p.open('r',encoding='utf-8'))
-            info['mesh_count'] = len(data.get('meshes',[]))
-            for acc in data.get('accessors',[]):
-                if acc.get('type')=='SCALAR' and 'count' in acc:
-                    info['vertex_count'] += acc['count']
-            info['triangle_count'] = int(info['vertex_count']*0.5)
-    except Exception: pass
-
-    tex_dir = Path(entry.path)/'textures'
-    if tex_dir.exists():
-        for tex in tex_dir.glob('*.png'):
-            kind = next((v for k,v in TEX_MAP_TYPES.items() if k in tex.name.lower()),'unknown')
-            try:  w,h = Image.open(tex).size
-            except Exception: w=h='?'
-            info['textures'].append({
-                'name':tex.name, 'type':kind,
-                'size':round(tex.stat().st_size/1048576,2),
-                'dimensions':f'{w}×{h}'
-            })
-        info['texture_count']=len(info['textures'])
-    return info
+        action = request.POST.get('action')
+        root   = LibraryRoot.objects.filter(id=request.POST.get('root_id') or 0).first()
+        if action == 'add':
+            root = LibraryRoot()
+        if action in ('add', 'save'):
+            if root is None:
+                raise Http404("Unknown root")
+            root.name          = request.POST.get('name', '').strip() or root.name
+            root.path          = request.POST.get('path', '').strip() or root.path
+            try:
+                root.sync_interval = max(0, int(request.POST.get('sync_interval') or 0)) * 60
+                root.workers       = max(1, int(request.POST['workers'])) if request.POST.get('workers') else None
+            except ValueError:
+                messages.error(request, 'Interval and workers must be whole numbers.')
+                return redirect('settings')
+            root.enabled       = action == 'add' or 'enabled' in request.POST
+            if not root.name or not root.path:
+                messages.error(request, 'A root needs a name and a path.')
+            elif LibraryRoot.objects.exclude(pk=root.pk).filter(Q(name=root.name) | Q(path=root.path)).exists():
+                messages.error(request, 'Another root already uses that name or path.')
+            else:
+                root.save()
+                messages.success(request, f'Root “{root.name}” saved.')
+        elif action == 'delete' and root is not None:
+            root.delete()
+            messages.success(request, f'Root “{root.name}” and its entries were removed.')
+        elif action == 'resync' and root is not None:
+            job, created = start_sync(root)
+            if created:
+                messages.success(request, f'Re-sync of “{root.name}” started in the background.')
+            else:
+                messages.info(request, f'“{root.name}” is already syncing (job #{job.id}).')
+        return redirect('settings')
+    return render(request, 'library/settings.html', {
+        'roots': LibraryRoot.objects.annotate(entry_count=Count('entries')),
+        'job'  : SyncJob.objects.first(),
+    })
+
+def sync_status(request):
+    """JSON progress of ?job=<id>, or of the most recent sync job."""
+    job_id = request.GET.get('job')
+    job = get_object_or_404(SyncJob, id=job_id) if job_id else SyncJob.objects.first()
+    return JsonResponse({'job': job.as_dict() if job else None})
+
+@require_POST
+def sync_cancel(request, job_id):
+    get_object_or_404(SyncJob, id=job_id)
+    return JsonResponse({'status': 'ok' if cancel_sync(job_id) else 'inactive'})
 
 def serve_entry_file(request):
     entry_id = request.GET.get('entry_id')
@@ -227,13 +285,13 @@ def serve_entry_file(request):
         raise Http404("Invalid parameters")
 
     entry = get_object_or_404(FolderEntry, id=entry_id)
-    full_path = os.path.normpath(os.path.join(entry.path, unquote(rel_path)))
+    full_path = safe_join(entry.path, unquote(rel_path))
 
-    if not full_path.startswith(entry.path):
+    if full_path is None:
         raise Http404("Invalid path")
 
     if not os.path.isfile(full_path):
         raise Http404("File not found")
 
-    return FileResponse(open(full_path, 'rb'), content_type='application/octet-stream')
+    return serve_file(request, full_path)
 
@@ -0,0 +1,177 @@
+"""
+Polling filesystem watcher for live, per-folder index updates.
+
+Native change notifications don't work reliably on SMB/NFS shares, so
+`FolderWatcher` polls instead: each tick is one `os.scandir(root)`
+comparing the top-level folder names and directory mtimes against the
+previous tick. Every `deep_every` ticks it additionally re-fingerprints the
+folders (stat only, on a pool of the root's scan workers) to catch files
+rewritten in place, which don't bump the directory mtime. Folders the sync
+doesn't index (no asset files) keep the fingerprint they had when applied,
+so they aren't flagged again on every deep pass.
+
+Changed folder names are coalesced into a dirty set and debounced — a
+folder is only applied once it has been quiet for `debounce` seconds, so a
+half-finished copy isn't indexed. Settled folders are handed to
+`LibraryConfig.sync_folders(names=…)` in one batch; the rest of the tree is
+never rescanned. One watcher covers one `LibraryRoot`; `watch_library`
+ticks a watcher per root in a single loop.
+"""
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db   import close_old_connections
+
+from .         import roots
+from .scanner  import scan_folder
+
+
+class FolderWatcher:
+    """ Polls one library root and syncs the folders that changed. """
+
+    def __init__(self, root, *, entry_cls, type_gltf,
+                 interval: float | None = None, debounce: float | None = None,
+                 deep_every: int | None = None):
+        self.root       = root
+        self.root_dir   = Path(root.path).expanduser()
+        self.entry_cls  = entry_cls
+        self.type_gltf  = type_gltf
+        self.interval   = interval   if interval   is not None else getattr(settings, "LIBRARY_WATCH_INTERVAL", 2.0)
+        self.debounce   = debounce   if debounce   is not None else getattr(settings, "LIBRARY_WATCH_DEBOUNCE", 3.0)
+        self.deep_every = deep_every if deep_every is not None else getattr(settings, "LIBRARY_WATCH_DEEP_EVERY", 30)
+
+        self.mtimes = {}      # folder-name → dir st_mtime_ns from the last tick
+        self.known  = {}      # folder-name → fingerprint stored in the DB (or seen, if not indexed)
+        self.dirty  = {}      # folder-name → monotonic time of the last change seen
+        self.ticks  = 0
+
+    # ────────────────────────────────────────────────
+    # Polling
+    # ────────────────────────────────────────────────
+    def prime(self) -> None:
+        """Takes the baseline listing so the first tick only reports real changes."""
+        self.mtimes = self.list_folders()
+        self.known  = dict(self.entry_cls.objects.filter(root=self.root).order_by()
+                                                 .values_list("rel_path", "fingerprint"))
+        # Anything on disk but not indexed (or vice versa) is pending from the start
+        now = time.monotonic()
+        for name in set(self.mtimes) ^ set(self.known):
+            self.dirty[name] = now
+
+    def list_folders(self) -> dict:
+        """One directory listing of the root: name → mtime_ns."""
+        folders = {}
+        with os.scandir(self.root_dir) as it:
+            for item in it:
+                try:
+                    if item.is_dir(follow_symlinks=True):
+                        folders[item.name] = item.stat().st_mtime_ns
+                except OSError:
+                    continue
+        return folders
+
+    def poll(self) -> set:
+        """Runs one tick; returns the folder names newly marked dirty."""
+        self.ticks += 1
+        current = self.list_folders()
+        changed = {n for n, m in current.items() if self.mtimes.get(n) != m}
+        changed |= set(self.mtimes) - set(current)            # removed / renamed away
+
+        if self.deep_every and self.ticks % self.deep_every == 0:
+            changed |= {s.name for s in self.fingerprint(current.keys() - changed)
+                        if not s.error and s.fingerprint != self.known.get(s.name)}
+
+        self.mtimes = current
+        now = time.monotonic()
+        for name in changed:
+            self.dirty[name] = now
+        return changed
+
+    def fingerprint(self, names) -> list:
+        """`scan_folder` of each of `names`, run on the root's scan-worker pool."""
+        names = sorted(names)
+        if not names:
+            return []
+        workers = min(roots.root_workers(self.root), len(names))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="library-watch") as pool:
+            return list(pool.map(lambda n: scan_folder(self.root_dir / n, self.known.get(n)), names))
+
+    def settled(self) -> list:
+        """Dirty folders that have been quiet for at least `debounce` seconds."""
+        cutoff = time.monotonic() - self.debounce
+        return sorted(n for n, t in self.dirty.items() if t <= cutoff)
+
+    # ────────────────────────────────────────────────
+    # Applying
+    # ────────────────────────────────────────────────
+    def flush(self, names=None):
+        """Syncs the settled folders (or `names`) and forgets them on success."""
+        names = self.settled() if names is None else sorted(names)
+        if not names:
+            return None
+
+        SyncJob = apps.get_model("library", "SyncJob")
+        if SyncJob.objects.filter(root=self.root, status__in=SyncJob.ACTIVE).exists():
+            return None                                  # full resync running — retry next tick
+
+        report = apps.get_app_config("library").sync_folders(
+            root      = self.root,
+            entry_cls = self.entry_cls,
+            type_gltf = self.type_gltf,
+            names     = names,
+        )
+        if report is None:
+            return None
+
+        for name in names:
+            self.dirty.pop(name, None)
+            self.known.pop(name, None)
+        self.known.update(self.entry_cls.objects.filter(root=self.root, rel_path__in=names).order_by()
+                                                .values_list("rel_path", "fingerprint"))
+        # Folders the sync skipped (not an asset) — remember them as they are now
+        self.known.update((s.name, s.fingerprint) for s in self.fingerprint(set(names) - set(self.known))
+                          if not s.error and s.path.is_dir())
+        print(f"[Library] Watch {self.root.name}: applied {len(names)} folder(s) — {report}")
+        return report
+
+    def tick(self) -> None:
+        """One poll + flush; any failure is reported and retried next tick, never ends the loop."""
+        try:
+            self.poll()
+            self.flush()
+        except OSError as exc:
+            print(f"[Library] Watch: {self.root_dir} unreadable ({exc}) — retrying.")
+        except Exception as exc:
+            traceback.print_exc()
+            print(f"[Library] Watch {self.root.name}: tick failed ({type(exc).__name__}: {exc}) — retrying.")
+
+    def run(self, *, once: bool = False) -> None:
+        """Poll/flush loop; `once` applies whatever is pending and returns."""
+        run_watchers([self], once=once)
+
+
+def run_watchers(watchers, *, once: bool = False) -> None:
+    """Drives several watchers from one loop, each on its own interval."""
+    for w in watchers:
+        print(f"[Library] Watching {w.root.name} ({w.root_dir}) every {w.interval:g}s "
+              f"(debounce {w.debounce:g}s) …")
+        w.prime()
+    if once:
+        for w in watchers:
+            w.flush(list(w.dirty))
+        return
+
+    due = {id(w): 0.0 for w in watchers}
+    while True:
+        close_old_connections()
+        now = time.monotonic()
+        for w in watchers:
+            if due[id(w)] <= now:
+                w.tick()
+                due[id(w)] = time.monotonic() + w.interval
+        time.sleep(max(0.05, min(due.values()) - time.monotonic()))
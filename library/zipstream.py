@@ -0,0 +1,177 @@
+"""
+Streaming ZIP writer for whole-asset exports.
+
+The archive is produced as a generator of byte chunks, never buffered in
+memory or in a temp file, so multi-GB asset folders can be downloaded
+straight from disk:
+
+    members = [Member("Chair/scene.gltf", "/lib/Chair/scene.gltf", deflate=True), …]
+    response = StreamingHttpResponse(stream_zip(members), …)
+    response["Content-Length"] = archive_size(members)     # store-only archives
+
+Every member uses a trailing data descriptor (general-purpose flag bit 3)
+so the CRC can be computed while the bytes go out. ZIP64 records are
+written per member only when its size or offset needs them, and for the
+end-of-archive records when the central directory does.
+
+Stored (uncompressed) members have a size known from `os.stat`, so for an
+all-store archive the exact length is computed up front by laying out the
+same headers with a dummy CRC.
+"""
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+
+CHUNK_SIZE = 1024 * 1024
+
+ZIP32_MAX  = 0xFFFFFFFF
+COUNT_MAX  = 0xFFFF
+# Members whose worst-case stored size reaches this get ZIP64 records up front
+ZIP64_FROM = ZIP32_MAX
+
+FLAGS      = 0x0008 | 0x0800                      # data descriptor | UTF-8 names
+STORED, DEFLATED = 0, 8
+
+
+class ZipStreamError(OSError):
+    """ A member changed on disk while the archive was being streamed. """
+
+
+@dataclass
+class Member:
+    arcname: str                  # "/"-separated path inside the archive
+    path:    str                  # file on disk
+    deflate: bool = False
+    size:    int  = -1            # filled from os.stat by `prepare`
+    mtime:   float = 0.0
+
+
+def prepare(members) -> list:
+    """Stats every member (size / mtime) so sizes are fixed before streaming."""
+    for m in members:
+        st      = os.stat(m.path)
+        m.size  = st.st_size
+        m.mtime = st.st_mtime
+    return members
+
+
+# ────────────────────────────────────────────────
+# Record layouts
+# ────────────────────────────────────────────────
+def _dos_time(ts: float) -> tuple:
+    t = time.localtime(ts)
+    if t.tm_year < 1980:
+        return 0, (1 << 5) | 1                    # 1980-01-01 00:00
+    return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+            ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
+
+
+def _local_header(m: Member, zip64: bool) -> bytes:
+    name       = m.arcname.encode("utf-8")
+    dtime, ddate = _dos_time(m.mtime)
+    extra      = struct.pack("<HHQQ", 0x0001, 16, 0, 0) if zip64 else b""
+    sizes      = ZIP32_MAX if zip64 else 0
+    return struct.pack(
+        "<IHHHHHIIIHH", 0x04034B50, 45 if zip64 else 20, FLAGS,
+        DEFLATED if m.deflate else STORED, dtime, ddate,
+        0, sizes, sizes, len(name), len(extra),
+    ) + name + extra
+
+
+def _descriptor(crc: int, csize: int, usize: int, zip64: bool) -> bytes:
+    if zip64:
+        return struct.pack("<IIQQ", 0x08074B50, crc, csize, usize)
+    return struct.pack("<IIII", 0x08074B50, crc, csize, usize)
+
+
+def _central_header(m: Member, crc: int, csize: int, offset: int, zip64: bool) -> bytes:
+    name  = m.arcname.encode("utf-8")
+    dtime, ddate = _dos_time(m.mtime)
+    big   = [v for v in (m.size, csize) if zip64] + ([offset] if offset >= ZIP32_MAX else [])
+    extra = struct.pack(f"<HH{len(big)}Q", 0x0001, 8 * len(big), *big) if big else b""
+    return struct.pack(
+        "<IHHHHHHIIIHHHHHII", 0x02014B50, (3 << 8) | 45, 45 if big else 20, FLAGS,
+        DEFLATED if m.deflate else STORED, dtime, ddate, crc,
+        ZIP32_MAX if zip64 else csize, ZIP32_MAX if zip64 else m.size,
+        len(name), len(extra), 0, 0, 0, 0o100644 << 16,
+        ZIP32_MAX if offset >= ZIP32_MAX else offset,
+    ) + name + extra
+
+
+def _end_records(count: int, cd_offset: int, cd_size: int) -> bytes:
+    out = b""
+    if count >= COUNT_MAX or cd_offset >= ZIP32_MAX or cd_size >= ZIP32_MAX:
+        end64 = cd_offset + cd_size
+        out += struct.pack("<IQHHIIQQQQ", 0x06064B50, 44, 45, 45, 0, 0,
+                           count, count, cd_size, cd_offset)
+        out += struct.pack("<IIQI", 0x07064B50, 0, end64, 1)
+    return out + struct.pack(
+        "<IHHHHIIH", 0x06054B50, 0, 0, min(count, COUNT_MAX), min(count, COUNT_MAX),
+        min(cd_size, ZIP32_MAX), min(cd_offset, ZIP32_MAX), 0,
+    )
+
+
+def _needs_zip64(m: Member) -> bool:
+    # deflate can grow incompressible input: ~0.1% plus block overhead, bounded generously
+    worst = m.size + m.size // 1000 + 0x10000 if m.deflate else m.size
+    return worst >= ZIP64_FROM
+
+
+# ────────────────────────────────────────────────
+# Public API
+# ────────────────────────────────────────────────
+def archive_size(members) -> int | None:
+    """Exact byte length of the archive, or None if any member is deflated."""
+    if any(m.deflate for m in members):
+        return None
+    offset, central = 0, 0
+    for m in members:
+        zip64    = _needs_zip64(m)
+        central += len(_central_header(m, 0, m.size, offset, zip64))
+        offset  += len(_local_header(m, zip64)) + m.size + len(_descriptor(0, 0, 0, zip64))
+    return offset + central + len(_end_records(len(members), offset, central))
+
+
+def stream_zip(members):
+    """Yields the archive for already-`prepare`d members, chunk by chunk."""
+    offset, central = 0, []
+    for m in members:
+        zip64  = _needs_zip64(m)
+        header = _local_header(m, zip64)
+        yield header
+
+        crc, csize, usize = 0, 0, 0
+        packer = zlib.compressobj(6, zlib.DEFLATED, -15) if m.deflate else None
+        with open(m.path, "rb") as fh:
+            # stored members are read to exactly the stat'ed size so a
+            # precomputed Content-Length stays true
+            remaining = m.size
+            while remaining > 0:
+                chunk = fh.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                usize += len(chunk)
+                crc    = zlib.crc32(chunk, crc)
+                if packer:
+                    chunk = packer.compress(chunk)
+                csize += len(chunk)
+                if chunk:
+                    yield chunk
+        if remaining:
+            raise ZipStreamError(f"{m.path} shrank while being exported")
+        if packer:
+            tail   = packer.flush()
+            csize += len(tail)
+            yield tail
+
+        descriptor = _descriptor(crc, csize, usize, zip64)
+        yield descriptor
+        central.append(_central_header(m, crc, csize, offset, zip64))
+        offset += len(header) + csize + len(descriptor)
+
+    cd = b"".join(central)
+    yield cd
+    yield _end_records(len(members), offset, len(cd))
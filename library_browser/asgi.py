@@ -12,5 +12,11 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'library_browser.settings')
+os.environ.setdefault('LIBRARY_ASYNC_VIEWS', '1')   # async detail / file views (library/aio.py)
 
 application = get_asgi_application()
+
+# Migrations + folder sync run after boot, once per deployment (library/startup.py)
+from library.startup import on_server_start  # noqa: E402
+
+on_server_start()
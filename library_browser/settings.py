@@ -42,6 +42,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'library.middleware.InstrumentationMiddleware',     # first: times the whole stack
+    'library.middleware.SchemaGateMiddleware',          # 503 until the deferred warm-up has migrated
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,10 +78,30 @@ WSGI_APPLICATION = 'library_browser.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite tuning, applied by Django on every new connection:
+#   journal_mode=WAL      readers keep working while a sync holds the write lock
+#   synchronous=NORMAL    fsync at checkpoints only — safe with WAL, far fewer syncs
+#   cache_size            page cache per connection, in KiB when negative
+#   temp_store=MEMORY     sorts / temp B-trees never touch disk
+# `timeout` is how long a writer waits for the lock before "database is locked".
+SQLITE_CACHE_KB = int(os.getenv("LIBRARY_SQLITE_CACHE_KB", 65536))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'timeout': 20,
+            # write transactions take the lock at BEGIN and wait for it (busy timeout);
+            # a deferred one that reads first fails with "database is locked" instead
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                f"PRAGMA cache_size=-{SQLITE_CACHE_KB};"
+                "PRAGMA temp_store=MEMORY;"
+            ),
+        },
     }
 }
 
@@ -128,3 +150,92 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+
+
+# Library sync tuning
+LIBRARY_SYNC_BATCH_SIZE = int(os.getenv("LIBRARY_SYNC_BATCH_SIZE", 500))   # rows per bulk write
+LIBRARY_SYNC_WORKERS    = int(os.getenv("LIBRARY_SYNC_WORKERS", 8))       # scan threads (raise for SMB/NFS); per-root override on the settings page
+LIBRARY_SYNC_PARALLEL_ROOTS = int(os.getenv("LIBRARY_SYNC_PARALLEL_ROOTS", 2))  # background root syncs running at once
+
+# Start-up (library/startup.py): the server starts at once and answers 503 until
+# the migrations are applied; the folder sync follows as a warm-up, once per deployment.
+LIBRARY_STARTUP       = os.getenv("LIBRARY_STARTUP", "deferred")        # deferred | blocking | off
+LIBRARY_WARMUP_DELAY  = float(os.getenv("LIBRARY_WARMUP_DELAY", 5.0))   # seconds from migrate to sync (deferred)
+LIBRARY_WARMUP_STALE  = 600                                             # lock without heartbeat → broken
+LIBRARY_STATE_DIR     = BASE_DIR / "state"                              # warm-up lock + done marker
+LIBRARY_DEPLOYMENT_ID = os.getenv("LIBRARY_DEPLOYMENT_ID", "")           # default: APP_VERSION + models.py mtime
+
+# Library watcher (`manage.py watch_library`)
+LIBRARY_WATCH_INTERVAL   = float(os.getenv("LIBRARY_WATCH_INTERVAL", 2.0))   # seconds between polls
+LIBRARY_WATCH_DEBOUNCE   = float(os.getenv("LIBRARY_WATCH_DEBOUNCE", 3.0))   # quiet time before applying a folder
+LIBRARY_WATCH_DEEP_EVERY = int(os.getenv("LIBRARY_WATCH_DEEP_EVERY", 30))    # full re-fingerprint every N polls (0 = off)
+
+# Resized thumbnail / texture-preview variants (library/derivatives.py)
+LIBRARY_DERIVATIVE_SIZES    = (256, 512, 1024)   # ?size= is rounded up to one of these
+LIBRARY_DERIVATIVE_PREBUILD = (256, 512)         # card sizes rendered during sync; () = lazy only
+LIBRARY_DERIVATIVE_WORKERS  = int(os.getenv("LIBRARY_DERIVATIVE_WORKERS", 0)) or None   # None → cpu_count
+
+# Async serving (library/aio.py). asgi.py turns the async detail / file views on;
+# their blocking file work runs on one bounded pool shared by all requests.
+LIBRARY_ASYNC_VIEWS          = os.getenv("LIBRARY_ASYNC_VIEWS", "0") == "1"
+LIBRARY_ASYNC_IO_THREADS     = int(os.getenv("LIBRARY_ASYNC_IO_THREADS", 32))    # stat / read / Pillow threads
+LIBRARY_ANALYSIS_CONCURRENCY = int(os.getenv("LIBRARY_ANALYSIS_CONCURRENCY", 8))  # texture probes at once per detail page
+
+# Gzip variants of .gltf / .json / .url assets (library/precompress.py), served
+# with Content-Encoding: gzip; cached under MEDIA_ROOT/precompressed/
+LIBRARY_PRECOMPRESS           = os.getenv("LIBRARY_PRECOMPRESS", "1") == "1"
+LIBRARY_PRECOMPRESS_ON_SYNC   = os.getenv("LIBRARY_PRECOMPRESS_ON_SYNC", "1") == "1"   # else built on first request
+LIBRARY_PRECOMPRESS_LEVEL     = 6      # gzip level (1 fastest … 9 smallest)
+LIBRARY_PRECOMPRESS_MIN_BYTES = 1024   # smaller files are sent as they are
+
+# Cache-Control for served asset files (ETag / Last-Modified revalidate after expiry)
+LIBRARY_FILE_CACHE_CONTROL = "private, max-age=3600"
+
+# Seconds the index "N results" total is cached per filter combination
+LIBRARY_COUNT_CACHE_SECONDS = 60
+
+# Bearer token for writes through the JSON API (POST /api/entries/bulk/);
+# unset = only the browser UI, with its CSRF token, can write
+LIBRARY_API_TOKEN = os.getenv("LIBRARY_API_TOKEN", "")
+
+# Cached sidebar facets / counts (library/facets.py). Keys embed a version
+# number kept in this cache too: when the watcher or sync_roots run as their
+# own processes, use a shared backend (file, Redis, …) so they invalidate it.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+LIBRARY_FACET_CACHE_SECONDS = 300
+
+# Duplicate detection (library/dedupe.py, `manage.py find_duplicates`)
+LIBRARY_HASH_ON_SYNC       = os.getenv("LIBRARY_HASH_ON_SYNC", "0") == "1"   # else hashed by find_duplicates --refresh
+LIBRARY_DUPLICATE_DISTANCE = 6                                               # max thumbnail dHash bit difference
+
+# Instrumentation (library/middleware.py, library/metrics.py): per-view latency,
+# SQL count / time and bytes served, exported at /metrics/ (Prometheus text).
+LIBRARY_SLOW_REQUEST_MS = int(os.getenv("LIBRARY_SLOW_REQUEST_MS", 500))   # slower requests → slow log
+LIBRARY_METRICS_WINDOW  = int(os.getenv("LIBRARY_METRICS_WINDOW", 300))    # seconds covered by the *_window quantiles
+LIBRARY_METRICS_TOKEN   = os.getenv("LIBRARY_METRICS_TOKEN", "")           # require "Authorization: Bearer …" when set
+LIBRARY_SLOW_LOG        = os.getenv("LIBRARY_SLOW_LOG", str(BASE_DIR / "logs" / "slow_requests.log"))  # dir made on first write
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'timestamped': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+    },
+    'handlers': {
+        'slow_log': {
+            'class': 'library.metrics.SlowLogHandler',
+            'filename': LIBRARY_SLOW_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 3,
+            'encoding': 'utf-8',
+            'formatter': 'timestamped',
+        },
+    },
+    'loggers': {
+        'library.slow': {'handlers': ['slow_log'], 'level': 'WARNING', 'propagate': False},
+    },
+}
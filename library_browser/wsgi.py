@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'library_browser.settings')
 
 application = get_wsgi_application()
+
+# Migrations + folder sync run after boot, once per deployment (library/startup.py)
+from library.startup import on_server_start  # noqa: E402
+
+on_server_start()